@@ -0,0 +1,91 @@
+import random
+from dataclasses import dataclass
+
+from src.services.intent_classifier import IntentCategory
+
+
+TEMPLATES: dict[IntentCategory, list[tuple[str, str]]] = {
+    IntentCategory.BILLING_CHARGE_DISPUTE: [
+        ("Charged twice this month", "I see two charges of $49 on my card for the same plan. Can you check?"),
+        ("Unexpected charge", "There's a $120 charge I don't recognize from last Tuesday."),
+    ],
+    IntentCategory.BILLING_REFUND_REQUEST: [
+        ("Refund please", "I cancelled last week but was still billed. I'd like my money back."),
+        ("Requesting a refund", "The annual plan renewed without notice, please refund it."),
+    ],
+    IntentCategory.BILLING_SUBSCRIPTION: [
+        ("Upgrade plan", "How do I move from Starter to Pro? Will I be charged the difference?"),
+        ("Cancel subscription", "I want to cancel at the end of this billing period."),
+    ],
+    IntentCategory.TECHNICAL_BUG_REPORT: [
+        ("App crashes on upload", "Every time I upload a PDF the app freezes and then crashes."),
+        ("Export broken", "The CSV export gives an empty file since yesterday's update."),
+    ],
+    IntentCategory.TECHNICAL_HOW_TO: [
+        ("How to export data", "How do I export all my projects as JSON?"),
+        ("Slack integration", "How do I connect my workspace to Slack? Which permissions are needed?"),
+    ],
+    IntentCategory.TECHNICAL_FEATURE_REQUEST: [
+        ("Dark mode", "It would be great to have a dark mode for the dashboard."),
+        ("API webhooks", "Please add webhooks for project updates."),
+    ],
+    IntentCategory.ACCOUNT_ACCESS_ISSUE: [
+        ("Cannot log in", "I keep getting an invalid password error even after resetting it."),
+        ("2FA lost phone", "I lost my phone and can't get my 2FA codes. How do I get back in?"),
+    ],
+    IntentCategory.ACCOUNT_DELETION: [
+        ("Delete my account", "Please delete my account and all associated data."),
+    ],
+    IntentCategory.ACCOUNT_UPDATE: [
+        ("Change email", "How can I change the email address on my account?"),
+    ],
+    IntentCategory.GENERAL_FEEDBACK: [
+        ("Love the product", "Just wanted to say the new editor is fantastic, thanks!"),
+    ],
+    IntentCategory.GENERAL_OTHER: [
+        ("Office hours", "Do you have support available on weekends?"),
+    ],
+    IntentCategory.UNKNOWN: [
+        ("hello", "asdf not sure what's going on??"),
+    ],
+}
+
+FOLLOW_UPS = [
+    "Thanks, that worked!",
+    "That didn't help, it still happens. Any other ideas?",
+    "Can you explain that step again?",
+]
+
+
+@dataclass
+class SyntheticTicket:
+    customer_id: str
+    subject: str
+    body: str
+    intent: IntentCategory
+    intent_confidence: float
+    follow_ups: list[str]
+
+
+def generate_corpus(size: int, seed: int = 7, follow_up_rate: float = 0.3) -> list[SyntheticTicket]:
+    rng = random.Random(seed)
+    categories = list(TEMPLATES)
+    tickets = []
+    for i in range(size):
+        intent = categories[i % len(categories)]
+        subject, body = rng.choice(TEMPLATES[intent])
+        low = 0.3 if intent == IntentCategory.UNKNOWN else 0.6
+        follow_ups = [rng.choice(FOLLOW_UPS)] if rng.random() < follow_up_rate else []
+        tickets.append(SyntheticTicket(
+            customer_id=f"bench-customer-{rng.randrange(size // 4 + 1)}",
+            subject=f"{subject} [#{i}]",
+            body=body,
+            intent=intent,
+            intent_confidence=round(rng.uniform(low, 0.98), 2),
+            follow_ups=follow_ups,
+        ))
+    return tickets
+
+
+def intent_lookup(tickets: list[SyntheticTicket]) -> dict[str, tuple[str, float]]:
+    return {t.subject: (t.intent.value, t.intent_confidence) for t in tickets}
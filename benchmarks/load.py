@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""End-to-end load benchmark against a stubbed LLM.
+
+Drives the FastAPI app in-process (ASGI) or through a local uvicorn server,
+replays a synthetic ticket corpus across every intent and reports throughput
+plus p50/p95/p99 per endpoint and per pipeline stage.
+
+    python -m benchmarks.load --tickets 500 --concurrency 32
+    python -m benchmarks.load --transport uvicorn --rate-limit 0.02 --json out.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.corpus import SyntheticTicket, generate_corpus, intent_lookup
+from benchmarks.stub_llm import LatencyProfile, StubAnthropic, StubConfig, StubKnowledgeBase
+
+
+def percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(q * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+class LoadRecorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def request(self, client, method: str, endpoint: str, url: str, **kwargs):
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies[endpoint].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.errors[endpoint] += 1
+            return None
+        return response.json()
+
+
+async def replay_ticket(client, recorder: LoadRecorder, ticket: SyntheticTicket, resolve_rate: float, rng: random.Random):
+    created = await recorder.request(
+        client, "POST", "POST /tickets", "/tickets",
+        json={
+            "source": "api",
+            "customer_id": ticket.customer_id,
+            "subject": ticket.subject,
+            "body": ticket.body,
+        },
+    )
+    if created is None:
+        return
+
+    ticket_id = created["ticket_id"]
+    escalated = created["escalated"]
+    for follow_up in ticket.follow_ups:
+        if escalated:
+            break
+        reply = await recorder.request(
+            client, "POST", "POST /tickets/{id}/message", f"/tickets/{ticket_id}/message",
+            json={"content": follow_up},
+        )
+        escalated = reply is None or reply["escalated"]
+
+    await recorder.request(client, "GET", "GET /tickets/{id}", f"/tickets/{ticket_id}")
+
+    if rng.random() < resolve_rate:
+        await recorder.request(
+            client, "POST", "POST /tickets/{id}/resolve", f"/tickets/{ticket_id}/resolve",
+            json={"resolution": "Walked the customer through the fix."},
+        )
+
+
+async def replay(client, corpus: list[SyntheticTicket], concurrency: int, resolve_rate: float, seed: int) -> LoadRecorder:
+    recorder = LoadRecorder()
+    rng = random.Random(seed)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def worker(ticket: SyntheticTicket):
+        async with semaphore:
+            await replay_ticket(client, recorder, ticket, resolve_rate, rng)
+            if rng.random() < 0.05:
+                await recorder.request(client, "GET", "GET /analytics/summary", "/analytics/summary")
+
+    await asyncio.gather(*(worker(t) for t in corpus))
+    return recorder
+
+
+def build_report(recorder: LoadRecorder, elapsed: float, stub: StubAnthropic) -> dict:
+    from src.services.metrics import DB_WRITE_LATENCY, STAGE_LATENCY
+
+    total_requests = sum(len(v) for v in recorder.latencies.values())
+    report = {
+        "elapsed_s": elapsed,
+        "requests": total_requests,
+        "throughput_rps": total_requests / elapsed if elapsed else 0.0,
+        "llm_calls": stub.messages.calls,
+        "llm_rate_limited": stub.messages.rate_limited,
+        "endpoints": {},
+        "stages": {},
+    }
+    for endpoint, samples in sorted(recorder.latencies.items()):
+        report["endpoints"][endpoint] = {
+            "count": len(samples),
+            "errors": recorder.errors.get(endpoint, 0),
+            "p50_ms": percentile(samples, 0.50) * 1000,
+            "p95_ms": percentile(samples, 0.95) * 1000,
+            "p99_ms": percentile(samples, 0.99) * 1000,
+        }
+    for histogram, label in ((STAGE_LATENCY, "stage"), (DB_WRITE_LATENCY, "operation")):
+        for labels in histogram.label_sets():
+            name = labels[label] if label == "stage" else f"db:{labels[label]}"
+            report["stages"][name] = {
+                "count": histogram.count(**labels),
+                "p50_ms": histogram.quantile(0.50, **labels) * 1000,
+                "p95_ms": histogram.quantile(0.95, **labels) * 1000,
+                "p99_ms": histogram.quantile(0.99, **labels) * 1000,
+            }
+    return report
+
+
+def print_report(report: dict) -> None:
+    print(f"\nRequests: {report['requests']} in {report['elapsed_s']:.2f}s "
+          f"({report['throughput_rps']:.1f} req/s)")
+    print(f"LLM calls: {report['llm_calls']} ({report['llm_rate_limited']} rate limited)")
+
+    header = f"{'':32} {'count':>7} {'err':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    print("\nEndpoints\n" + header)
+    for name, row in report["endpoints"].items():
+        print(f"{name:32} {row['count']:>7} {row['errors']:>5} "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f}")
+
+    print("\nStages (estimated from histogram buckets)\n" + header)
+    for name, row in report["stages"].items():
+        print(f"{name:32} {row['count']:>7} {'':>5} "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f}")
+
+
+async def run(args) -> dict:
+    import httpx
+
+    from src.agents.specialists import AgentRouter
+    from src.api import main as api
+    from src.models.database import init_db
+    from src.services.metrics import registry
+
+    corpus = generate_corpus(args.tickets, seed=args.seed, follow_up_rate=args.follow_up_rate)
+    config = StubConfig(
+        classify_latency=LatencyProfile(args.classify_ms, args.classify_ms * 2.5),
+        generate_latency=LatencyProfile(args.generate_ms, args.generate_ms * 2.5, per_token_ms=args.token_ms),
+        rate_limit_probability=args.rate_limit,
+        time_scale=args.time_scale,
+        seed=args.seed,
+    )
+    stub = StubAnthropic(config, intent_lookup(corpus))
+
+    await init_db()
+    if args.real_kb:
+        from src.knowledge import KnowledgeBase
+        api.knowledge_base = KnowledgeBase()
+    else:
+        api.knowledge_base = StubKnowledgeBase(latency_ms=args.kb_ms, time_scale=args.time_scale)
+    api.router = AgentRouter(stub, api.knowledge_base)
+
+    server_task = None
+    if args.transport == "uvicorn":
+        import uvicorn
+
+        server = uvicorn.Server(uvicorn.Config(
+            api.app, host="127.0.0.1", port=args.port, lifespan="off", log_level="warning",
+        ))
+        server_task = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.05)
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=60)
+    else:
+        transport = httpx.ASGITransport(app=api.app, raise_app_exceptions=False)
+        client = httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60)
+
+    try:
+        warmup = generate_corpus(min(20, args.tickets), seed=args.seed + 1, follow_up_rate=0)
+        stub.messages.intent_lookup.update(intent_lookup(warmup))
+        await replay(client, warmup, args.concurrency, 0.0, args.seed)
+        registry.reset()
+        stub.messages.calls = stub.messages.rate_limited = 0
+
+        start = time.perf_counter()
+        recorder = await replay(client, corpus, args.concurrency, args.resolve_rate, args.seed)
+        elapsed = time.perf_counter() - start
+    finally:
+        await client.aclose()
+        if server_task:
+            server.should_exit = True
+            await server_task
+
+    return build_report(recorder, elapsed, stub)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--transport", choices=["asgi", "uvicorn"], default="asgi")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--classify-ms", type=float, default=250, help="Median classification latency")
+    parser.add_argument("--generate-ms", type=float, default=600, help="Median time to first token")
+    parser.add_argument("--token-ms", type=float, default=8, help="Per-token streaming latency")
+    parser.add_argument("--kb-ms", type=float, default=15, help="Stub retrieval latency")
+    parser.add_argument("--real-kb", action="store_true", help="Use the Chroma knowledge base instead of the stub")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Probability of a 429 per LLM call")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Multiply all simulated latencies")
+    parser.add_argument("--follow-up-rate", type=float, default=0.3)
+    parser.add_argument("--resolve-rate", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--json", type=Path, default=None, help="Write the report as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite+aiosqlite:///{tmp}/bench.db"
+        report = asyncio.run(run(args))
+
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
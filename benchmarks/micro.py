@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for per-request CPU hot paths.
+
+Each case is timed at a small and a large input size. Timings are divided by a
+fixed pure-Python reference workload so stored baselines transfer between
+machines; peak allocations are measured with tracemalloc.
+
+    python -m benchmarks.micro                    # report
+    python -m benchmarks.micro --check            # compare with baseline, exit 1 on regression
+    python -m benchmarks.micro --update-baseline  # rewrite benchmarks/micro_baseline.json
+"""
+
+import argparse
+import gc
+import json
+import math
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.agents.specialists import BillingAgent
+from src.agents.specialists.base import RetrievedContext
+from src.knowledge.ingestion import KnowledgeIngester
+from src.models.ticket import AgentResponse, ParsedTicket, TicketSource
+from src.services.confidence_scorer import ConfidenceScorer
+from src.services.intent_classifier import IntentClassifier
+from src.services.sentiment import SentimentAnalyzer
+
+
+BASELINE_PATH = Path(__file__).parent / "micro_baseline.json"
+
+SMALL = 1
+LARGE = 16
+
+FILLER = "Thanks for the details, here is what I found on your account today. "
+
+
+@dataclass
+class Case:
+    name: str
+    build: Callable[[int], Callable[[], object]]
+    max_exponent: float = 1.3
+
+
+def _scorer_case(size: int):
+    scorer = ConfidenceScorer()
+    return lambda: scorer.calculate(
+        intent_confidence=0.8,
+        response_certainty=0.75,
+        sentiment=-0.2,
+        question_count=2,
+    )
+
+
+def _certainty_case(size: int):
+    agent = BillingAgent(client=None)
+    response = FILLER * 4 * size + "I think this might be resolved."
+    context = [RetrievedContext(content="Q: A?\nA: B.", source="faq", relevance_score=0.7)] * 3
+    return lambda: agent._estimate_certainty(response, context)
+
+
+def _escalation_case(size: int):
+    agent = BillingAgent(client=None)
+    ticket = ParsedTicket(
+        source=TicketSource.API,
+        customer_id="bench",
+        subject="Question about my invoice",
+        body=FILLER * 4 * size,
+    )
+    return lambda: agent._check_escalation_triggers(ticket)
+
+
+def _parse_case(size: int):
+    classifier = IntentClassifier(client=None)
+    text = "\n".join(
+        ["CATEGORY: billing.refund_request", "CONFIDENCE: 0.82"]
+        + [f"REASONING: {FILLER}"] * size
+    )
+    return lambda: classifier._parse_response(text)
+
+
+def _markdown_case(size: int):
+    ingester = KnowledgeIngester(knowledge_base=None)
+    section = "## Section\n" + "\n".join([FILLER] * 8) + "\n"
+    document = "# Guide\nIntro text\n" + section * 8 * size
+    return lambda: ingester._split_markdown_sections(document)
+
+
+def _models_case(size: int):
+    body = FILLER * size
+
+    def construct():
+        ticket = ParsedTicket(
+            source=TicketSource.API,
+            customer_id="bench",
+            subject="Refund",
+            body=body,
+            metadata={"channel": "web"},
+        )
+        return ticket, AgentResponse(
+            message=body,
+            confidence=0.8,
+            intent="billing.refund_request",
+            suggested_actions=["Check refunds"],
+        )
+
+    return construct
+
+
+def _sentiment_case(size: int):
+    analyzer = SentimentAnalyzer()
+    body = (FILLER + "This is really frustrating, I can't log in! ") * size
+    return lambda: analyzer.analyze("Locked out of my account", body)
+
+
+CASES = [
+    Case("confidence_scorer.calculate", _scorer_case),
+    Case("base_agent._estimate_certainty", _certainty_case),
+    Case("base_agent._check_escalation_triggers", _escalation_case),
+    Case("intent_classifier._parse_response", _parse_case),
+    Case("ingester._split_markdown_sections", _markdown_case),
+    Case("models.ParsedTicket+AgentResponse", _models_case),
+    Case("sentiment_analyzer.analyze", _sentiment_case),
+]
+
+
+def _reference_workload():
+    total = 0
+    for i in range(2000):
+        total += i * i % 7
+    return total
+
+
+def time_per_call(fn: Callable[[], object], min_time: float = 0.1, repeats: int = 7) -> float:
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= min_time / 10:
+            break
+        number *= 2
+
+    best = math.inf
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            best = min(best, (time.perf_counter() - start) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return best
+
+
+def peak_allocation(fn: Callable[[], object]) -> int:
+    fn()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_cases(cases: list[Case]) -> dict:
+    results = {}
+    for case in cases:
+        small_fn = case.build(SMALL)
+        large_fn = case.build(LARGE)
+        # Re-measure the reference next to each case so drift in CPU
+        # frequency or noisy neighbours affects both sides equally.
+        reference = time_per_call(_reference_workload)
+        small = time_per_call(small_fn)
+        large = time_per_call(large_fn)
+        reference = min(reference, time_per_call(_reference_workload))
+        results[case.name] = {
+            "ns_per_call": small * 1e9,
+            "relative": small / reference,
+            "scaling_exponent": math.log(max(large, 1e-12) / max(small, 1e-12)) / math.log(LARGE / SMALL),
+            "peak_bytes": peak_allocation(small_fn),
+            "peak_bytes_large": peak_allocation(large_fn),
+        }
+    return results
+
+
+def compare(results: dict, baseline: dict, time_tolerance: float, alloc_tolerance: float) -> list[str]:
+    failures = []
+    for case in CASES:
+        current = results[case.name]
+        if current["scaling_exponent"] > case.max_exponent:
+            failures.append(
+                f"{case.name}: cost grows as n^{current['scaling_exponent']:.2f} "
+                f"(limit n^{case.max_exponent})"
+            )
+        stored = baseline.get(case.name)
+        if not stored:
+            continue
+        if current["relative"] > stored["relative"] * time_tolerance:
+            failures.append(
+                f"{case.name}: {current['relative']:.3f}x reference vs baseline "
+                f"{stored['relative']:.3f}x (tolerance {time_tolerance}x)"
+            )
+        for key in ("peak_bytes", "peak_bytes_large"):
+            if current[key] > stored[key] * alloc_tolerance + 1024:
+                failures.append(
+                    f"{case.name}: {key} {current[key]} vs baseline {stored[key]} "
+                    f"(tolerance {alloc_tolerance}x)"
+                )
+    return failures
+
+
+def print_results(results: dict) -> None:
+    print(f"{'case':42} {'ns/call':>10} {'rel':>8} {'exp':>6} {'peak B':>9} {'peak B (16x)':>13}")
+    for name, row in results.items():
+        print(f"{name:42} {row['ns_per_call']:>10.0f} {row['relative']:>8.3f} "
+              f"{row['scaling_exponent']:>6.2f} {row['peak_bytes']:>9} {row['peak_bytes_large']:>13}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="Fail on regressions against the baseline")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--time-tolerance", type=float, default=2.0)
+    parser.add_argument("--alloc-tolerance", type=float, default=1.25)
+    args = parser.parse_args(argv)
+
+    results = run_cases(CASES)
+    print_results(results)
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if args.check:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        failures = compare(results, baseline, args.time_tolerance, args.alloc_tolerance)
+        if failures:
+            print("\nRegressions:")
+            for failure in failures:
+                print(f"  {failure}")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+import asyncio
+import math
+import random
+import re
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Optional
+
+import anthropic
+import httpx
+
+
+@dataclass
+class LatencyProfile:
+    ttft_median_ms: float
+    ttft_p95_ms: float
+    per_token_ms: float = 0.0
+
+    def sample_ttft(self, rng: random.Random) -> float:
+        sigma = math.log(self.ttft_p95_ms / self.ttft_median_ms) / 1.645
+        return rng.lognormvariate(math.log(self.ttft_median_ms), sigma) / 1000
+
+
+@dataclass
+class StubConfig:
+    classify_latency: LatencyProfile = field(
+        default_factory=lambda: LatencyProfile(ttft_median_ms=250, ttft_p95_ms=600)
+    )
+    generate_latency: LatencyProfile = field(
+        default_factory=lambda: LatencyProfile(ttft_median_ms=600, ttft_p95_ms=1500, per_token_ms=8)
+    )
+    rate_limit_probability: float = 0.0
+    hedge_probability: float = 0.2
+    time_scale: float = 1.0
+    seed: int = 42
+
+
+RESPONSE_TEMPLATES = [
+    "Thanks for reaching out. I've looked into this and here is what you can do: "
+    "open Settings, review the relevant section, and apply the change. "
+    "The update takes effect immediately and you'll receive a confirmation email.",
+    "I understand how frustrating this is. Based on your account, the fastest fix is "
+    "to sign out, clear your browser cache, and sign back in. If anything still looks "
+    "wrong afterwards, reply here with a screenshot and we'll take it from there.",
+    "Good question! You can find this under Settings > Billing. Each charge lists the "
+    "date, amount and plan so you can match it against your statement.",
+]
+
+HEDGES = ["I think", "it might be", "possibly", "I'm not sure, but"]
+
+_SUBJECT_RE = re.compile(r"^Subject: (.*)$", re.MULTILINE)
+
+
+class _StubStream:
+    def __init__(self, messages: "_StubMessages", text: str, latency: LatencyProfile):
+        self._messages = messages
+        self._text = text
+        self._latency = latency
+
+    async def __aenter__(self) -> "_StubStream":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+    @property
+    def text_stream(self):
+        return self._iter_text()
+
+    async def _iter_text(self):
+        scale = self._messages.config.time_scale
+        await asyncio.sleep(self._latency.sample_ttft(self._messages.rng) * scale)
+        for token in _tokenize(self._text):
+            await asyncio.sleep(self._latency.per_token_ms / 1000 * scale)
+            yield token
+
+    async def get_final_message(self):
+        return _message(self._text)
+
+
+class _StubMessages:
+    def __init__(self, config: StubConfig, intent_lookup: dict[str, tuple[str, float]]):
+        self.config = config
+        self.intent_lookup = intent_lookup
+        self.rng = random.Random(config.seed)
+        self.calls = 0
+        self.rate_limited = 0
+
+    async def create(self, model: str, max_tokens: int, messages: list[dict], system: Optional[str] = None):
+        text, latency = self._prepare(model, messages, system)
+        scale = self.config.time_scale
+        delay = latency.sample_ttft(self.rng) + len(_tokenize(text)) * latency.per_token_ms / 1000
+        await asyncio.sleep(delay * scale)
+        return _message(text)
+
+    def stream(self, model: str, max_tokens: int, messages: list[dict], system: Optional[str] = None):
+        text, latency = self._prepare(model, messages, system)
+        return _StubStream(self, text, latency)
+
+    def _prepare(self, model: str, messages: list[dict], system: Optional[str]) -> tuple[str, LatencyProfile]:
+        self.calls += 1
+        if self.rng.random() < self.config.rate_limit_probability:
+            self.rate_limited += 1
+            request = httpx.Request("POST", "http://stub-llm/v1/messages")
+            raise anthropic.RateLimitError(
+                "Stub rate limit",
+                response=httpx.Response(429, request=request),
+                body=None,
+            )
+
+        prompt = messages[-1]["content"]
+        if system is None and "CATEGORIES:" in prompt:
+            return self._classification(prompt), self.config.classify_latency
+        return self._generation(), self.config.generate_latency
+
+    def _classification(self, prompt: str) -> str:
+        match = _SUBJECT_RE.search(prompt)
+        subject = match.group(1).strip() if match else ""
+        category, confidence = self.intent_lookup.get(subject, ("unknown", 0.4))
+        return (
+            f"CATEGORY: {category}\n"
+            f"CONFIDENCE: {confidence:.2f}\n"
+            "REASONING: Stubbed classification."
+        )
+
+    def _generation(self) -> str:
+        text = self.rng.choice(RESPONSE_TEMPLATES)
+        if self.rng.random() < self.config.hedge_probability:
+            text = f"{self.rng.choice(HEDGES)} {text[0].lower()}{text[1:]}"
+        return text
+
+
+class StubAnthropic:
+    def __init__(
+        self,
+        config: Optional[StubConfig] = None,
+        intent_lookup: Optional[dict[str, tuple[str, float]]] = None,
+    ):
+        self.messages = _StubMessages(config or StubConfig(), intent_lookup or {})
+
+
+class StubKnowledgeBase:
+    def __init__(self, latency_ms: float = 15.0, time_scale: float = 1.0):
+        self.latency_ms = latency_ms
+        self.time_scale = time_scale
+
+    async def search(self, collection: str, query: str, top_k: int = 3, where: Optional[dict] = None) -> list[dict]:
+        await asyncio.sleep(self.latency_ms / 1000 * self.time_scale)
+        return [
+            {
+                "content": f"Q: Stub FAQ {i} for {collection}\nA: Stub answer.",
+                "source": f"faq:{collection}",
+                "score": 0.75,
+                "metadata": {},
+            }
+            for i in range(top_k)
+        ]
+
+    def list_collections(self) -> list[str]:
+        return []
+
+    async def get_collection_count(self, name: str) -> int:
+        return 0
+
+
+def _tokenize(text: str) -> list[str]:
+    return re.findall(r"\S+\s*", text)
+
+
+def _message(text: str):
+    return SimpleNamespace(content=[SimpleNamespace(type="text", text=text)])
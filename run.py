@@ -1,9 +1,22 @@
+import argparse
+
 import uvicorn
 
+from src.api.server import PreforkServer, ServerConfig
+
 if __name__ == "__main__":
-    uvicorn.run(
-        "src.api.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-    )
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, help="Serve with N pre-forked workers instead of the reloader")
+    args = parser.parse_args()
+
+    if args.workers:
+        config = ServerConfig.from_env()
+        config.workers = args.workers
+        PreforkServer(config).run()
+    else:
+        uvicorn.run(
+            "src.api.main:app",
+            host="0.0.0.0",
+            port=8000,
+            reload=True,
+        )
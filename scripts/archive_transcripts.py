@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Move conversations of long-resolved tickets into compressed archive segments."""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+import os
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from src.models.archive import TranscriptArchive, archive_resolved
+from src.models.database import async_session, engine, init_db
+
+
+async def main(args):
+    await init_db()
+    archive = TranscriptArchive(args.archive_dir)
+    cutoff = datetime.utcnow() - timedelta(days=args.days)
+
+    total = 0
+    while True:
+        async with async_session() as session:
+            archived = await archive_resolved(session, archive, cutoff, batch_size=args.batch_size)
+        if not archived:
+            break
+        total += archived
+        print(f"Archived {total} tickets...", end="\r")
+    print(f"Archived {total} tickets resolved before {cutoff:%Y-%m-%d} to {args.archive_dir}")
+
+    if args.vacuum and total:
+        async with engine.connect() as conn:
+            await conn.execute(text("VACUUM"))
+        print("Vacuumed database")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=90, help="Archive tickets resolved more than this many days ago")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--archive-dir", type=Path, default=Path(os.getenv("ARCHIVE_DIR", "./archive")))
+    parser.add_argument("--vacuum", action="store_true", help="Reclaim freed pages afterwards")
+    sys.exit(asyncio.run(main(parser.parse_args())))
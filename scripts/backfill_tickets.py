@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Import historical tickets from CSV or JSONL into the ticket database."""
+
+import argparse
+import asyncio
+import os
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import anthropic
+
+from src.agents.specialists import AgentRouter
+from src.knowledge import KnowledgeBase
+from src.models.database import async_session, init_db
+from src.services.backfill import BackfillCheckpoint, TicketBackfill, read_tickets
+from src.services.similarity import SimilarTicketIndex
+
+
+def resolution_indexer(similar: SimilarTicketIndex):
+    async def index(imported) -> None:
+        await similar.add_resolutions([
+            (ticket.id, ticket.subject, ticket.body, ticket.resolution, classification.domain, ticket.resolved_at)
+            for ticket, classification in imported
+            if ticket.status == "resolved" and ticket.resolution
+        ])
+    return index
+
+
+async def main(args):
+    await init_db()
+
+    knowledge_base = KnowledgeBase(persist_directory=os.getenv("CHROMA_PERSIST_DIR", "./chroma_data"))
+    router = None
+    if not args.no_classify:
+        client = anthropic.AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        router = AgentRouter(client, knowledge_base)
+
+    on_chunk = None
+    if args.index_similar:
+        similar = SimilarTicketIndex(knowledge_base)
+        await similar.load()
+        on_chunk = resolution_indexer(similar)
+
+    checkpoint_path = args.checkpoint or args.input.with_name(args.input.name + ".checkpoint")
+    checkpoint = BackfillCheckpoint.load(checkpoint_path)
+    if checkpoint.rows_done:
+        print(f"Resuming after {checkpoint.rows_done} rows ({checkpoint.imported} imported)")
+
+    backfill = TicketBackfill(
+        async_session,
+        router=router,
+        generate=not args.skip_generation,
+        concurrency=args.concurrency,
+        on_chunk=on_chunk,
+    )
+    started = time.perf_counter()
+    imported = await backfill.run(read_tickets(args.input), chunk_size=args.chunk_size, checkpoint=checkpoint)
+    elapsed = time.perf_counter() - started
+    print(f"Imported {imported} tickets in {elapsed:.1f}s ({imported / max(elapsed, 1e-9):.0f}/s)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("input", type=Path, help="CSV or JSONL file of historical tickets")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per bulk insert and checkpoint")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent classification requests")
+    parser.add_argument("--skip-generation", action="store_true", help="Classify intent only, no agent replies")
+    parser.add_argument("--no-classify", action="store_true", help="Use the intent column as-is, no LLM calls")
+    parser.add_argument("--index-similar", action="store_true", help="Add resolved tickets to the similar-ticket index")
+    parser.add_argument("--checkpoint", type=Path, help="Checkpoint file (default: <input>.checkpoint)")
+    sys.exit(asyncio.run(main(parser.parse_args())))
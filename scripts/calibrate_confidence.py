@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Fit a confidence calibration table from resolved and escalated tickets."""
+
+import argparse
+import asyncio
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from src.models.database import async_session
+from src.models.outcomes import load_outcomes
+from src.services.calibration import fit_isotonic, fit_platt
+
+
+async def main(args):
+    async with async_session() as session:
+        scores, outcomes = await load_outcomes(session)
+
+    if len(scores) < args.min_samples:
+        print(f"Only {len(scores)} labelled turns found (need {args.min_samples}), not fitting.")
+        return 1
+
+    fit = fit_isotonic if args.method == "isotonic" else fit_platt
+    table = fit(scores, outcomes, resolution=args.resolution)
+    table.save(args.output)
+
+    calibrated = table.apply_batch(scores)
+    print(f"Fitted {table.method} calibration on {len(scores)} turns "
+          f"({outcomes.mean():.1%} resolved without human takeover)")
+    print(f"Brier score: raw {np.mean((scores - outcomes) ** 2):.4f} "
+          f"-> calibrated {np.mean((calibrated - outcomes) ** 2):.4f}")
+    print(f"Written to {args.output}; set CONFIDENCE_CALIBRATION_PATH to enable it.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--method", choices=["isotonic", "platt"], default="isotonic")
+    parser.add_argument("--resolution", type=int, default=101)
+    parser.add_argument("--min-samples", type=int, default=200)
+    parser.add_argument("--output", type=Path, default=Path("calibration.json"))
+    sys.exit(asyncio.run(main(parser.parse_args())))
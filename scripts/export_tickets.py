@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Stream tickets with their conversations and escalations to an NDJSON file."""
+
+import argparse
+import asyncio
+from datetime import datetime
+import json
+import os
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models.archive import TranscriptArchive
+from src.models.database import async_session
+from src.models.repository import TicketFilter
+from src.services.export import export_ndjson
+
+
+def last_cursor(path: Path) -> str | None:
+    cursor = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.endswith("\n"):
+                cursor = json.loads(line)["cursor"]
+    return cursor
+
+
+def truncate_partial_line(path: Path) -> None:
+    with open(path, "rb+") as f:
+        data = f.read()
+        f.truncate(data.rfind(b"\n") + 1)
+
+
+async def main(args):
+    filters = TicketFilter(
+        status=args.status,
+        routed_to=args.routed_to,
+        created_after=args.since,
+        created_before=args.until,
+    )
+    cursor = args.cursor
+    mode = "w"
+    if args.resume and args.output and args.output.exists():
+        truncate_partial_line(args.output)
+        cursor = last_cursor(args.output) or cursor
+        mode = "a"
+
+    out = open(args.output, mode, encoding="utf-8") if args.output else sys.stdout
+    count = 0
+    try:
+        async with async_session() as session:
+            async for line in export_ndjson(
+                session, filters, cursor, archive=TranscriptArchive(args.archive_dir), chunk_size=args.chunk_size
+            ):
+                out.write(line)
+                count += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Exported {count} tickets", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--status")
+    parser.add_argument("--routed-to")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Created at or after (ISO date)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="Created before (ISO date)")
+    parser.add_argument("--cursor", help="Resume after the ticket with this export cursor")
+    parser.add_argument("--output", type=Path, help="Write to this file instead of stdout")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted export into --output")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--archive-dir", type=Path, default=Path(os.getenv("ARCHIVE_DIR", "./archive")))
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -1,46 +1,62 @@
 #!/usr/bin/env python3
 """Seed the knowledge base with FAQ data."""
 
+import argparse
 import asyncio
 from pathlib import Path
 import sys
+import time
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.knowledge import KnowledgeBase, KnowledgeIngester
 
 
-async def main():
+async def main(args):
     print("Initializing knowledge base...")
     kb = KnowledgeBase(persist_directory="./chroma_data")
-    ingester = KnowledgeIngester(kb)
 
-    data_dir = Path(__file__).parent.parent / "data"
+    if args.restore:
+        started = time.perf_counter()
+        count = await kb.restore_snapshot(args.restore)
+        print(f"Restored {count} documents from {args.restore} in {time.perf_counter() - started:.1f}s")
+    else:
+        ingester = KnowledgeIngester(kb)
 
-    faq_files = [
-        ("billing_faq.json", "billing_knowledge"),
-        ("technical_faq.json", "technical_knowledge"),
-        ("account_faq.json", "account_knowledge"),
-    ]
+        data_dir = Path(__file__).parent.parent / "data"
 
-    total_docs = 0
+        faq_files = [
+            ("billing_faq.json", "billing_knowledge"),
+            ("technical_faq.json", "technical_knowledge"),
+            ("account_faq.json", "account_knowledge"),
+        ]
 
-    for filename, collection in faq_files:
-        file_path = data_dir / filename
-        if not file_path.exists():
-            print(f"Warning: {filename} not found, skipping...")
-            continue
+        total_docs = 0
 
-        count = await ingester.ingest_faq_file(file_path, collection)
-        print(f"Ingested {count} documents from {filename} into {collection}")
-        total_docs += count
+        for filename, collection in faq_files:
+            file_path = data_dir / filename
+            if not file_path.exists():
+                print(f"Warning: {filename} not found, skipping...")
+                continue
+
+            count = await ingester.ingest_faq_file(file_path, collection)
+            print(f"Ingested {count} documents from {filename} into {collection}")
+            total_docs += count
+
+        print(f"\nTotal documents ingested: {total_docs}")
 
-    print(f"\nTotal documents ingested: {total_docs}")
     print("\nCollection stats:")
     for collection in kb.list_collections():
         count = await kb.get_collection_count(collection)
         print(f"  {collection}: {count} documents")
 
+    if args.snapshot:
+        written = await kb.snapshot(args.snapshot)
+        print(f"\nWrote {written} collection snapshots to {args.snapshot}")
+
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--snapshot", type=Path, help="Also write mmap-able collection snapshots to this directory")
+    parser.add_argument("--restore", type=Path, help="Load collections from a snapshot instead of embedding the FAQ files")
+    asyncio.run(main(parser.parse_args()))
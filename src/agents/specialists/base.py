@@ -1,9 +1,15 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-import anthropic
+from typing import TYPE_CHECKING
 
 from src.models.ticket import ParsedTicket, AgentResponse
+from src.services.calibration import load_default_calibration
 from src.services.confidence_scorer import ConfidenceScorer
+from src.services.metrics import STAGE_LATENCY, LLM_ERRORS
+from src.services.uncertainty import HedgeDetector, HedgeScan, default_detector
+
+if TYPE_CHECKING:
+    import anthropic
 
 
 @dataclass
@@ -17,15 +23,17 @@ class BaseSpecialistAgent(ABC):
     domain: str
     escalation_keywords: list[str] = []
     max_turns: int = 3
+    model: str = "claude-3-5-sonnet-20241022"
+    hedge_detector: HedgeDetector = default_detector
 
     def __init__(
         self,
-        client: anthropic.AsyncAnthropic,
+        client: "anthropic.AsyncAnthropic",
         knowledge_base=None,
     ):
         self.client = client
         self.knowledge_base = knowledge_base
-        self.scorer = ConfidenceScorer()
+        self.scorer = ConfidenceScorer(calibration=load_default_calibration())
 
     @property
     @abstractmethod
@@ -41,26 +49,30 @@ class BaseSpecialistAgent(ABC):
         ticket: ParsedTicket,
         conversation_history: list[dict] | None = None,
     ) -> AgentResponse:
-        retrieved_context = await self._retrieve_context(ticket)
+        with STAGE_LATENCY.time(stage="retrieval"):
+            retrieved_context = await self._retrieve_context(ticket)
 
-        should_force_escalate = self._check_escalation_triggers(ticket)
+        with STAGE_LATENCY.time(stage="escalation_check"):
+            should_force_escalate = self._check_escalation_triggers(ticket)
         if should_force_escalate:
             return self._create_escalation_response(
                 "Detected keywords requiring human specialist attention"
             )
 
-        response_text, certainty = await self._generate_response(
-            ticket, retrieved_context, conversation_history
-        )
+        with STAGE_LATENCY.time(stage="generation"):
+            response_text, certainty = await self._generate_response(
+                ticket, retrieved_context, conversation_history
+            )
 
-        confidence = self.scorer.calculate(
-            intent_confidence=ticket.intent_confidence,
-            response_certainty=certainty,
-            sentiment=ticket.sentiment,
-            question_count=ticket.body.count("?"),
-        )
+        with STAGE_LATENCY.time(stage="scoring"):
+            confidence = self.scorer.calculate(
+                intent_confidence=ticket.intent_confidence,
+                response_certainty=certainty,
+                sentiment=ticket.sentiment,
+                question_count=ticket.body.count("?"),
+            )
+            should_escalate = self.scorer.should_escalate(confidence)
 
-        should_escalate = self.scorer.should_escalate(confidence)
         final_response = self._prepare_response(response_text, confidence, should_escalate)
 
         return AgentResponse(
@@ -98,7 +110,7 @@ class BaseSpecialistAgent(ABC):
         context: list[RetrievedContext],
         conversation_history: list[dict] | None,
     ) -> tuple[str, float]:
-        system = self._build_system_prompt(context)
+        system = self._build_system_prompt(context, ticket.customer_context)
 
         messages = []
         if conversation_history:
@@ -107,21 +119,36 @@ class BaseSpecialistAgent(ABC):
         user_message = f"Subject: {ticket.subject}\n\n{ticket.body}"
         messages.append({"role": "user", "content": user_message})
 
-        response = await self.client.messages.create(
-            model="claude-3-5-sonnet-20241022",
-            max_tokens=1000,
-            system=system,
-            messages=messages,
-        )
+        import anthropic
+
+        try:
+            response = await self.client.messages.create(
+                model=self.model,
+                max_tokens=1000,
+                system=system,
+                messages=messages,
+            )
+        except anthropic.APIError as exc:
+            LLM_ERRORS.inc(model=self.model, error=type(exc).__name__)
+            raise
 
         response_text = response.content[0].text
         certainty = self._estimate_certainty(response_text, context)
 
         return response_text, certainty
 
-    def _build_system_prompt(self, context: list[RetrievedContext]) -> str:
+    def _build_system_prompt(self, context: list[RetrievedContext], customer: dict | None = None) -> str:
         base = self.system_prompt
 
+        if customer and customer.get("ticket_count"):
+            base += (
+                "\n\n---\nCUSTOMER HISTORY:\n"
+                f"Previous tickets: {customer['ticket_count']} "
+                f"({customer.get('open_tickets', 0)} open, {customer.get('escalation_count', 0)} escalated)\n"
+                f"Recent topics: {', '.join(customer.get('recent_intents') or []) or 'none'}\n"
+                "---\n\nAcknowledge repeat contacts and avoid re-asking for details already covered."
+            )
+
         if context:
             context_block = "\n\n---\nRELEVANT KNOWLEDGE BASE INFORMATION:\n"
             for ctx in context:
@@ -135,6 +162,7 @@ class BaseSpecialistAgent(ABC):
         self,
         response: str,
         context: list[RetrievedContext],
+        hedges: HedgeScan | None = None,
     ) -> float:
         base_certainty = 0.8
 
@@ -145,12 +173,7 @@ class BaseSpecialistAgent(ABC):
             elif avg_relevance < 0.5:
                 base_certainty -= 0.1
 
-        uncertain_phrases = [
-            "i'm not sure", "i don't know", "i cannot", "unable to",
-            "might be", "could be", "possibly", "i think", "i believe",
-        ]
-        lower_response = response.lower()
-        uncertainty_count = sum(1 for p in uncertain_phrases if p in lower_response)
+        uncertainty_count = hedges.count if hedges is not None else self.hedge_detector.count(response)
         base_certainty -= uncertainty_count * 0.1
 
         return max(0.3, min(1.0, base_certainty))
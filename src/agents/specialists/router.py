@@ -1,12 +1,16 @@
-import anthropic
+from typing import TYPE_CHECKING
 
 from src.models.ticket import ParsedTicket, AgentResponse
 from src.services.intent_classifier import IntentClassifier, IntentCategory
+from src.services.metrics import STAGE_LATENCY
 from .base import BaseSpecialistAgent
 from .billing_agent import BillingAgent
 from .technical_agent import TechnicalAgent
 from .account_agent import AccountAgent
 
+if TYPE_CHECKING:
+    import anthropic
+
 
 DOMAIN_MAPPING = {
     IntentCategory.BILLING_CHARGE_DISPUTE: "billing",
@@ -27,7 +31,7 @@ DOMAIN_MAPPING = {
 class AgentRouter:
     def __init__(
         self,
-        client: anthropic.AsyncAnthropic,
+        client: "anthropic.AsyncAnthropic",
         knowledge_base=None,
     ):
         self.client = client
@@ -75,7 +79,8 @@ Guidelines:
         ticket: ParsedTicket,
         conversation_history: list[dict] | None = None,
     ) -> tuple[AgentResponse, str]:
-        intent = await self.classifier.classify(ticket.subject, ticket.body)
+        with STAGE_LATENCY.time(stage="classification"):
+            intent = await self.classifier.classify(ticket.subject, ticket.body)
 
         ticket.intent = intent.category.value
         ticket.intent_confidence = intent.confidence
@@ -1,7 +1,13 @@
-import anthropic
+from typing import TYPE_CHECKING
+
 from src.models.ticket import ParsedTicket, AgentResponse
 from src.services.intent_classifier import IntentClassifier, Intent
+from src.services.calibration import load_default_calibration
 from src.services.confidence_scorer import ConfidenceScorer, ConfidenceBreakdown
+from src.services.uncertainty import default_detector
+
+if TYPE_CHECKING:
+    import anthropic
 
 
 SYSTEM_PROMPT = """You are a helpful customer support agent. Your role is to assist customers with their inquiries professionally and efficiently.
@@ -21,10 +27,10 @@ Respond directly to the customer. Do not include any metadata or confidence scor
 
 
 class SupportAgent:
-    def __init__(self, client: anthropic.AsyncAnthropic):
+    def __init__(self, client: "anthropic.AsyncAnthropic"):
         self.client = client
         self.classifier = IntentClassifier(client)
-        self.scorer = ConfidenceScorer()
+        self.scorer = ConfidenceScorer(calibration=load_default_calibration())
 
     async def handle_ticket(
         self,
@@ -86,20 +92,7 @@ class SupportAgent:
     def _estimate_response_certainty(self, response: str, intent: Intent) -> float:
         base_certainty = 0.8
 
-        uncertain_phrases = [
-            "i'm not sure",
-            "i don't know",
-            "i cannot",
-            "unable to",
-            "might be",
-            "could be",
-            "possibly",
-            "i think",
-            "i believe",
-        ]
-
-        lower_response = response.lower()
-        uncertainty_count = sum(1 for phrase in uncertain_phrases if phrase in lower_response)
+        uncertainty_count = default_detector.count(response)
 
         certainty_penalty = uncertainty_count * 0.1
         certainty = max(0.3, base_certainty - certainty_penalty)
@@ -1,44 +1,198 @@
+import asyncio
 from contextlib import asynccontextmanager
-from datetime import datetime
+from datetime import datetime, timedelta
+import importlib
+import logging
 import os
-from typing import Optional
-import anthropic
-from fastapi import FastAPI, HTTPException, Depends
+from typing import Literal, Optional
+from fastapi import FastAPI, HTTPException, Depends, Query
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import func, select
 from dotenv import load_dotenv
 
-from src.models.database import init_db, get_db, Ticket, Conversation, Escalation
+from src.models.database import (
+    init_db,
+    get_db,
+    async_session,
+    commit_write,
+    storage_config,
+    start_group_writer,
+    stop_group_writer,
+    Ticket,
+    Conversation,
+    Escalation,
+)
+from src.models.archive import TranscriptArchive
+from src.models.repository import TicketFilter, TicketRepository, decode_cursor
+from src.models.storage import WRITE_BEHIND_WORKERS_ERROR
 from src.models.ticket import (
     TicketCreate,
     ParsedTicket,
     TicketStatus,
     ConversationMessage,
+    ticket_priority,
 )
 from src.agents.specialists import AgentRouter
-from src.knowledge import KnowledgeBase
+from src.knowledge import KnowledgeBase, KnowledgeIngester, Resolution, ResolutionPipeline
+from src.knowledge.vector_store import preload_embedding_model
+from src.services import analytics, search
+from src.services.export import export_ndjson
+from src.services.sentiment import default_analyzer as sentiment_analyzer
+from src.services.customers import ProfileEvent, profile_cache
+from src.services.escalation import EscalationManager, QueueEntry
+from src.services.journal import WriteBehindWriter, WriteJournal
+from src.services.resolution_feed import ResolutionFeed
+from src.services.similarity import SimilarTicketIndex
+from src.services.warmup import Warmup, WarmupStep
+from src.services.writes import WriteRecord
+from src.services.metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    DB_WRITE_LATENCY,
+    ESCALATIONS,
+    MultiprocessMetrics,
+    registry as metrics_registry,
+)
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 knowledge_base: Optional[KnowledgeBase] = None
 router: Optional[AgentRouter] = None
+similar_tickets: Optional[SimilarTicketIndex] = None
+resolution_pipeline: Optional[ResolutionPipeline] = None
+escalation_manager: Optional[EscalationManager] = None
+write_behind: Optional[WriteBehindWriter] = None
+transcript_archive: Optional[TranscriptArchive] = None
+warmup: Optional[Warmup] = None
+resolution_feed: Optional[ResolutionFeed] = None
+shared_metrics: Optional[MultiprocessMetrics] = None
+# Set when this process is one of several pre-forked workers (see
+# src/api/server.py): per-process caches would diverge, so the escalation
+# queue and customer profiles are read from SQLite and Chroma is left to the
+# supervisor's single writer process.
+multi_worker = False
+
+
+async def load_knowledge_base() -> None:
+    global knowledge_base
+    kb = KnowledgeBase(persist_directory=os.getenv("CHROMA_PERSIST_DIR", "./chroma_data"))
+    if os.getenv("KNOWLEDGE_INDEX_DIR"):
+        kb.attach_snapshot(os.environ["KNOWLEDGE_INDEX_DIR"])
+    # Chroma is still needed for similar tickets and new resolutions; open
+    # it here, off the event loop, rather than on the first request.
+    await asyncio.to_thread(getattr, kb, "client")
+    knowledge_base = kb
+
+
+async def load_router() -> None:
+    global router
+    anthropic = await asyncio.to_thread(importlib.import_module, "anthropic")
+    client = anthropic.AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+    router = AgentRouter(client, knowledge_base)
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    global knowledge_base, router
+async def load_similar_tickets() -> None:
+    global similar_tickets
+    index = SimilarTicketIndex(knowledge_base)
+    await index.load()
+    similar_tickets = index
 
-    await init_db()
 
-    knowledge_base = KnowledgeBase(
-        persist_directory=os.getenv("CHROMA_PERSIST_DIR", "./chroma_data")
-    )
+async def start_resolution_pipeline() -> None:
+    # The pipeline already exists (see lifespan) and may hold resolutions
+    # submitted during warm-up; they are processed once it starts.
+    resolution_pipeline.ingester = KnowledgeIngester(knowledge_base)
+    resolution_pipeline.similar_tickets = similar_tickets
+    await resolution_pipeline.start()
 
-    client = anthropic.AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-    router = AgentRouter(client, knowledge_base)
 
+async def start_resolution_feed() -> None:
+    global resolution_feed
+    if similar_tickets is None:
+        raise RuntimeError("similar-ticket index unavailable")
+    index = similar_tickets
+
+    async def add(resolutions: list[Resolution]) -> None:
+        await index.add_resolutions(
+            [(r.ticket_id, r.subject, r.body, r.resolution, r.domain, r.resolved_at) for r in resolutions],
+            persist=False,
+        )
+
+    feed = ResolutionFeed(async_session, add, since=index.latest_resolved_at() or datetime.utcnow())
+    await feed.start()
+    resolution_feed = feed
+
+
+async def warm_embedder() -> None:
+    if not await asyncio.to_thread(preload_embedding_model):
+        raise RuntimeError("embedding model unavailable")
+    await knowledge_base.embed(["warm-up"])
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global escalation_manager, write_behind, transcript_archive, warmup
+    global multi_worker, resolution_pipeline, shared_metrics
+
+    await init_db()
+    multi_worker = int(os.getenv("PREFORK_WORKERS", "1")) > 1
+    if multi_worker:
+        profile_cache.max_size = 0
+        if os.getenv("METRICS_DIR"):
+            shared_metrics = MultiprocessMetrics(os.environ["METRICS_DIR"])
+            await shared_metrics.start()
+    else:
+        resolution_pipeline = ResolutionPipeline(None)
+    transcript_archive = TranscriptArchive(os.getenv("ARCHIVE_DIR", "./archive"))
+
+    if storage_config.write_behind:
+        if multi_worker:
+            raise RuntimeError(WRITE_BEHIND_WORKERS_ERROR)
+        journal = WriteJournal(
+            storage_config.journal_dir,
+            segment_bytes=storage_config.journal_segment_bytes,
+            fsync=storage_config.journal_fsync,
+        )
+        write_behind = WriteBehindWriter(
+            journal, async_session, flush_timeout_ms=storage_config.journal_flush_timeout_ms
+        )
+        await write_behind.start()
+        profile_cache.before_load = flush_customer_writes
+
+    escalation_manager = EscalationManager()
+    async with async_session() as session:
+        await escalation_manager.load(session)
+
+    await start_group_writer()
+
+    # Everything that needs Chroma, the Anthropic SDK or the embedding model
+    # loads in the background; /health answers at once and /ready flips when
+    # the ticket endpoints can serve.
+    warmup = Warmup([
+        WarmupStep("knowledge_base", load_knowledge_base),
+        WarmupStep("router", load_router),
+        WarmupStep("similar_tickets", load_similar_tickets, required=False),
+        WarmupStep("resolution_pipeline", start_resolution_pipeline, required=False)
+        if not multi_worker
+        else WarmupStep("resolution_feed", start_resolution_feed, required=False),
+        WarmupStep("embedder", warm_embedder, required=False),
+    ])
+    warmup.start()
     yield
+    await warmup.stop()
+    await stop_group_writer()
+    if write_behind is not None:
+        profile_cache.before_load = None
+        await write_behind.stop()
+    if resolution_pipeline is not None:
+        await resolution_pipeline.stop()
+    if resolution_feed is not None:
+        await resolution_feed.stop()
+    if shared_metrics is not None:
+        await shared_metrics.stop()
 
 
 app = FastAPI(
@@ -75,6 +229,35 @@ class EscalateRequest(BaseModel):
     reason: str
 
 
+class EscalateResponse(BaseModel):
+    status: str
+    ticket_id: str
+    escalation_id: str
+    queue_position: Optional[int]
+
+
+class ClaimRequest(BaseModel):
+    assignee: str
+    domain: Optional[str] = None
+
+
+class QueuedEscalation(BaseModel):
+    position: int
+    ticket_id: str
+    escalation_id: str
+    domain: str
+    priority: int
+    score: float
+    wait_seconds: float
+
+
+class EscalationBacklog(BaseModel):
+    total: int
+    by_domain: dict[str, int]
+    oldest_wait_seconds: float
+    entries: list[QueuedEscalation]
+
+
 class ResolveRequest(BaseModel):
     resolution: str
     feedback: Optional[str] = None
@@ -90,27 +273,180 @@ class AnalyticsSummary(BaseModel):
     tickets_by_domain: dict
 
 
+class TrendPoint(BaseModel):
+    start: datetime
+    tickets_created: int
+    messages: int
+    escalations: int
+    resolutions: int
+    escalation_rate: float
+    avg_confidence: Optional[float]
+    avg_resolution_seconds: Optional[float]
+
+
+class AnalyticsTrends(BaseModel):
+    start: datetime
+    end: datetime
+    bucket_hours: int
+    points: list[TrendPoint]
+
+
+class TicketSummary(BaseModel):
+    id: str
+    customer_id: str
+    subject: str
+    intent: Optional[str]
+    status: str
+    urgency: str
+    priority: int
+    routed_to: Optional[str]
+    assigned_to: Optional[str]
+    created_at: datetime
+
+
+class TicketListResponse(BaseModel):
+    tickets: list[TicketSummary]
+    next_cursor: Optional[str]
+
+
+class SearchResult(BaseModel):
+    ticket_id: str
+    kind: str
+    subject: str
+    snippet: str
+    rank: float
+    status: str
+    role: Optional[str]
+    created_at: datetime
+
+
+class SearchResponse(BaseModel):
+    query: str
+    results: list[SearchResult]
+    next_offset: Optional[int]
+
+
 class KnowledgeBaseStats(BaseModel):
     collections: list[str]
     document_counts: dict
 
 
+def require_router() -> AgentRouter:
+    if router is None:
+        raise HTTPException(status_code=503, detail="Service is warming up")
+    return router
+
+
+async def find_similar_resolutions(text: str, domain: str, exclude: Optional[str] = None) -> list[dict]:
+    if similar_tickets is None:
+        return []
+    try:
+        matches = await similar_tickets.similar(text, k=3, domain=domain, exclude=exclude)
+    except Exception:
+        logger.warning("Similar ticket lookup failed", exc_info=True)
+        return []
+    return [match.to_context() for match in matches]
+
+
+async def flush_ticket_writes(ticket_id: str) -> None:
+    await flush_writes(f"ticket:{ticket_id}")
+
+
+async def flush_customer_writes(customer_id: str) -> None:
+    await flush_writes(f"customer:{customer_id}")
+
+
+async def flush_writes(*keys: str) -> None:
+    if write_behind is None:
+        return
+    try:
+        await write_behind.flush(*keys)
+    except asyncio.TimeoutError:
+        # Reading now would miss writes that were already acknowledged.
+        raise HTTPException(status_code=503, detail="Pending writes are not yet committed, retry shortly")
+
+
+async def save(
+    db: AsyncSession,
+    record: WriteRecord,
+    profile_event: ProfileEvent,
+    deferrable: bool = False,
+) -> None:
+    with DB_WRITE_LATENCY.time(operation=record.kind), profile_cache.writing(profile_event):
+        if deferrable and write_behind is not None:
+            await write_behind.submit(record)
+        else:
+            await commit_write(db, record.apply)
+
+
+async def shared_escalation_queue(db: AsyncSession) -> Optional[EscalationManager]:
+    if escalation_manager is not None and multi_worker:
+        await escalation_manager.reload(db)
+    return escalation_manager
+
+
+async def enqueue_escalation(
+    db: AsyncSession,
+    escalation_id: str,
+    ticket_id: str,
+    domain: str,
+    priority: int,
+    created_at: datetime,
+) -> Optional[int]:
+    if escalation_manager is None:
+        return None
+    if multi_worker:
+        # Rank against SQLite instead of reloading the whole queue on every
+        # write; claim and backlog reload it when they need the entries.
+        return await escalation_manager.queue_position(db, escalation_id)
+    return escalation_manager.add(QueueEntry(
+        escalation_id=escalation_id,
+        ticket_id=ticket_id,
+        domain=domain,
+        priority=priority,
+        created_at=created_at,
+    ))
+
+
 @app.post("/tickets", response_model=TicketResponse)
 async def create_ticket(
     ticket_data: TicketCreate,
     db: AsyncSession = Depends(get_db),
 ):
+    analysis = sentiment_analyzer.analyze(ticket_data.subject, ticket_data.body)
+    customer = await profile_cache.get(db, ticket_data.customer_id)
     parsed = ParsedTicket(
         source=ticket_data.source,
         customer_id=ticket_data.customer_id,
         subject=ticket_data.subject,
         body=ticket_data.body,
+        sentiment=analysis.sentiment,
+        urgency=analysis.urgency,
         metadata=ticket_data.metadata,
+        customer_context=customer.to_context() if customer.ticket_count else None,
     )
 
-    response, domain = await router.route(parsed)
+    response, domain = await require_router().route(parsed)
+    responded_at = datetime.utcnow()
+
+    status = TicketStatus.ESCALATED.value if response.should_escalate else TicketStatus.IN_PROGRESS.value
+    priority = ticket_priority(parsed.urgency, parsed.sentiment)
+    escalation_id = parsed.id + "-esc"
+    similar = []
+    if response.should_escalate:
+        similar = await find_similar_resolutions(f"{parsed.subject}\n{parsed.body}", domain)
+    profile_event = ProfileEvent(
+        customer_id=parsed.customer_id,
+        at=parsed.created_at,
+        tickets_created=1,
+        escalations=int(response.should_escalate),
+        intent=response.intent,
+        sentiment=parsed.sentiment,
+    )
 
-    db_ticket = Ticket(
+    record = WriteRecord("create_ticket").touch(ticket=parsed.id)
+    record.insert(
+        Ticket,
         id=parsed.id,
         source=parsed.source.value,
         customer_id=parsed.customer_id,
@@ -120,13 +456,15 @@ async def create_ticket(
         urgency=parsed.urgency.value,
         intent=response.intent,
         intent_confidence=response.confidence,
-        status=TicketStatus.ESCALATED.value if response.should_escalate else TicketStatus.IN_PROGRESS.value,
+        status=status,
         assigned_to=f"{domain}_agent" if not response.should_escalate else None,
+        routed_to=domain,
+        priority=priority,
         metadata_={"routed_to": domain, **parsed.metadata},
+        created_at=parsed.created_at,
     )
-    db.add(db_ticket)
-
-    customer_msg = Conversation(
+    record.insert(
+        Conversation,
         id=ConversationMessage(
             ticket_id=parsed.id,
             role="customer",
@@ -135,10 +473,10 @@ async def create_ticket(
         ticket_id=parsed.id,
         role="customer",
         content=f"Subject: {parsed.subject}\n\n{parsed.body}",
+        created_at=parsed.created_at,
     )
-    db.add(customer_msg)
-
-    agent_msg = Conversation(
+    record.insert(
+        Conversation,
         id=ConversationMessage(
             ticket_id=parsed.id,
             role="agent",
@@ -149,12 +487,12 @@ async def create_ticket(
         role="agent",
         content=response.message,
         confidence=response.confidence,
+        created_at=responded_at,
     )
-    db.add(agent_msg)
-
     if response.should_escalate:
-        escalation = Escalation(
-            id=parsed.id + "-esc",
+        record.insert(
+            Escalation,
+            id=escalation_id,
             ticket_id=parsed.id,
             reason=response.escalation_reason or "Low confidence",
             context_package={
@@ -162,15 +500,31 @@ async def create_ticket(
                 "confidence": response.confidence,
                 "routed_to": domain,
                 "suggested_actions": response.suggested_actions,
+                "similar_resolved_tickets": similar,
+                "customer": parsed.customer_context,
             },
+            created_at=parsed.created_at,
         )
-        db.add(escalation)
+    record.profile_event(profile_event)
+    record.analytics_event(
+        at=parsed.created_at,
+        domain=domain,
+        intent=response.intent,
+        status=status,
+        tickets_created=1,
+        escalations=int(response.should_escalate),
+        confidence=response.confidence,
+    )
 
-    await db.commit()
+    await save(db, record, profile_event, deferrable=True)
+
+    if response.should_escalate:
+        ESCALATIONS.inc(domain=domain, trigger="auto")
+        await enqueue_escalation(db, escalation_id, parsed.id, domain, priority, parsed.created_at)
 
     return TicketResponse(
         ticket_id=parsed.id,
-        status=db_ticket.status,
+        status=status,
         assigned_agent=f"{domain}_agent" if not response.should_escalate else "pending_human",
         response=response.message,
         confidence=response.confidence,
@@ -180,25 +534,96 @@ async def create_ticket(
     )
 
 
-@app.get("/tickets/{ticket_id}")
-async def get_ticket(ticket_id: str, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Ticket).where(Ticket.id == ticket_id))
-    ticket = result.scalar_one_or_none()
+def _ticket_list_response(page) -> TicketListResponse:
+    return TicketListResponse(
+        tickets=[
+            TicketSummary(
+                id=t.id,
+                customer_id=t.customer_id,
+                subject=t.subject,
+                intent=t.intent,
+                status=t.status,
+                urgency=t.urgency,
+                priority=t.priority,
+                routed_to=t.routed_to,
+                assigned_to=t.assigned_to,
+                created_at=t.created_at,
+            )
+            for t in page.tickets
+        ],
+        next_cursor=page.next_cursor,
+    )
 
-    if not ticket:
-        raise HTTPException(status_code=404, detail="Ticket not found")
 
-    conv_result = await db.execute(
-        select(Conversation)
-        .where(Conversation.ticket_id == ticket_id)
-        .order_by(Conversation.created_at)
+@app.get("/tickets", response_model=TicketListResponse)
+async def list_tickets(
+    status: Optional[TicketStatus] = None,
+    routed_to: Optional[str] = None,
+    customer_id: Optional[str] = None,
+    intent: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    filters = TicketFilter(
+        status=status.value if status else None,
+        routed_to=routed_to,
+        customer_id=customer_id,
+        intent=intent,
+        created_after=created_after,
+        created_before=created_before,
     )
-    conversations = conv_result.scalars().all()
+    try:
+        page = await TicketRepository(db).list_tickets(filters, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _ticket_list_response(page)
+
+
+@app.get("/escalations/queue", response_model=TicketListResponse)
+async def escalation_queue(
+    routed_to: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        page = await TicketRepository(db).escalation_queue(routed_to=routed_to, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _ticket_list_response(page)
 
-    esc_result = await db.execute(
-        select(Escalation).where(Escalation.ticket_id == ticket_id)
-    )
-    escalation = esc_result.scalar_one_or_none()
+
+@app.get("/tickets/{ticket_id}")
+async def get_ticket(
+    ticket_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    await flush_ticket_writes(ticket_id)
+    try:
+        page = await TicketRepository(db).get_with_conversations(
+            ticket_id, limit=limit, cursor=cursor, archive=transcript_archive
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not page:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+
+    ticket = page.ticket
+    escalations = [
+        {
+            "reason": e.reason,
+            "suggested_actions": e.context_package.get("suggested_actions", []),
+            "similar_resolved_tickets": e.context_package.get("similar_resolved_tickets", []),
+            "created_at": e.created_at.isoformat(),
+        }
+        for e in page.escalations
+    ]
 
     return {
         "ticket": {
@@ -210,7 +635,8 @@ async def get_ticket(ticket_id: str, db: AsyncSession = Depends(get_db)):
             "intent": ticket.intent,
             "status": ticket.status,
             "assigned_to": ticket.assigned_to,
-            "routed_to": ticket.metadata_.get("routed_to", "unknown"),
+            "routed_to": ticket.routed_to or ticket.metadata_.get("routed_to", "unknown"),
+            "priority": ticket.priority,
             "created_at": ticket.created_at.isoformat(),
         },
         "conversations": [
@@ -220,13 +646,11 @@ async def get_ticket(ticket_id: str, db: AsyncSession = Depends(get_db)):
                 "confidence": c.confidence,
                 "created_at": c.created_at.isoformat(),
             }
-            for c in conversations
+            for c in page.conversations
         ],
-        "escalation": {
-            "reason": escalation.reason,
-            "suggested_actions": escalation.context_package.get("suggested_actions", []),
-            "created_at": escalation.created_at.isoformat(),
-        } if escalation else None,
+        "next_cursor": page.next_cursor,
+        "escalation": escalations[-1] if escalations else None,
+        "escalations": escalations,
     }
 
 
@@ -236,6 +660,8 @@ async def send_message(
     message: MessageRequest,
     db: AsyncSession = Depends(get_db),
 ):
+    received_at = datetime.utcnow()
+    await flush_ticket_writes(ticket_id)
     result = await db.execute(select(Ticket).where(Ticket.id == ticket_id))
     ticket = result.scalar_one_or_none()
 
@@ -245,41 +671,58 @@ async def send_message(
     if ticket.status == TicketStatus.ESCALATED.value:
         raise HTTPException(status_code=400, detail="Ticket is escalated to human agent")
 
-    conv_result = await db.execute(
-        select(Conversation)
-        .where(Conversation.ticket_id == ticket_id)
-        .order_by(Conversation.created_at)
-    )
-    conversations = conv_result.scalars().all()
+    conversations = await TicketRepository(db).conversations(ticket_id, archive=transcript_archive)
 
     history = []
     for conv in conversations:
         role = "user" if conv.role == "customer" else "assistant"
         history.append({"role": role, "content": conv.content})
 
+    analysis = sentiment_analyzer.analyze(ticket.subject, message.content)
+    customer = await profile_cache.get(db, ticket.customer_id)
     parsed = ParsedTicket(
         id=ticket.id,
         source=ticket.source,
         customer_id=ticket.customer_id,
         subject=ticket.subject,
         body=message.content,
+        sentiment=analysis.sentiment,
+        urgency=analysis.urgency,
         intent=ticket.intent,
         intent_confidence=ticket.intent_confidence,
+        customer_context=customer.to_context(),
     )
 
     domain = ticket.metadata_.get("routed_to", "general")
-    agent = router.get_agent_for_domain(domain)
+    agent = require_router().get_agent_for_domain(domain)
     response = await agent.handle(parsed, history)
 
-    customer_msg = Conversation(
+    status = TicketStatus.ESCALATED.value if response.should_escalate else ticket.status
+    now = datetime.utcnow()
+    escalation_id = ticket_id + f"-esc-{now.timestamp()}"
+    similar = []
+    if response.should_escalate:
+        similar = await find_similar_resolutions(
+            f"{ticket.subject}\n{message.content}", domain, exclude=ticket_id
+        )
+    profile_event = ProfileEvent(
+        customer_id=ticket.customer_id,
+        at=now,
+        escalations=int(response.should_escalate),
+        sentiment=analysis.sentiment,
+    )
+
+    record = WriteRecord("send_message").touch(ticket=ticket_id)
+    record.insert(
+        Conversation,
         id=ConversationMessage(ticket_id=ticket_id, role="customer", content=message.content).id,
         ticket_id=ticket_id,
         role="customer",
         content=message.content,
+        created_at=received_at,
     )
-    db.add(customer_msg)
-
-    agent_msg = Conversation(
+    record.insert(
+        Conversation,
         id=ConversationMessage(
             ticket_id=ticket_id,
             role="agent",
@@ -290,13 +733,13 @@ async def send_message(
         role="agent",
         content=response.message,
         confidence=response.confidence,
+        created_at=now,
     )
-    db.add(agent_msg)
-
     if response.should_escalate:
-        ticket.status = TicketStatus.ESCALATED.value
-        escalation = Escalation(
-            id=ticket_id + f"-esc-{datetime.utcnow().timestamp()}",
+        record.update(Ticket, ticket_id, status=status)
+        record.insert(
+            Escalation,
+            id=escalation_id,
             ticket_id=ticket_id,
             reason=response.escalation_reason or "Low confidence during conversation",
             context_package={
@@ -305,11 +748,27 @@ async def send_message(
                 "routed_to": domain,
                 "suggested_actions": response.suggested_actions,
                 "conversation_length": len(conversations) + 2,
+                "similar_resolved_tickets": similar,
+                "customer": parsed.customer_context,
             },
+            created_at=now,
         )
-        db.add(escalation)
+    record.profile_event(profile_event)
+    record.analytics_event(
+        at=now,
+        domain=domain,
+        intent=ticket.intent,
+        status=status,
+        messages=1,
+        escalations=int(response.should_escalate),
+        confidence=response.confidence,
+    )
+
+    await save(db, record, profile_event, deferrable=True)
 
-    await db.commit()
+    if response.should_escalate:
+        ESCALATIONS.inc(domain=domain, trigger="auto")
+        await enqueue_escalation(db, escalation_id, ticket_id, domain, ticket.priority, now)
 
     return MessageResponse(
         response=response.message,
@@ -319,30 +778,111 @@ async def send_message(
     )
 
 
-@app.post("/tickets/{ticket_id}/escalate")
+@app.post("/tickets/{ticket_id}/escalate", response_model=EscalateResponse)
 async def escalate_ticket(
     ticket_id: str,
     request: EscalateRequest,
     db: AsyncSession = Depends(get_db),
 ):
+    await flush_ticket_writes(ticket_id)
     result = await db.execute(select(Ticket).where(Ticket.id == ticket_id))
     ticket = result.scalar_one_or_none()
 
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
 
-    ticket.status = TicketStatus.ESCALATED.value
-
-    escalation = Escalation(
-        id=ticket_id + f"-esc-manual-{datetime.utcnow().timestamp()}",
+    domain = ticket.metadata_.get("routed_to", "unknown")
+    intent = ticket.intent
+    priority = ticket.priority
+    now = datetime.utcnow()
+    escalation_id = ticket_id + f"-esc-manual-{now.timestamp()}"
+    customer = await profile_cache.get(db, ticket.customer_id)
+    profile_event = ProfileEvent(customer_id=ticket.customer_id, at=now, escalations=1)
+
+    record = WriteRecord("escalate_ticket").touch(ticket=ticket_id)
+    record.update(Ticket, ticket_id, status=TicketStatus.ESCALATED.value)
+    record.insert(
+        Escalation,
+        id=escalation_id,
         ticket_id=ticket_id,
         reason=f"Manual escalation: {request.reason}",
-        context_package={"manual": True},
+        context_package={"manual": True, "customer": customer.to_context()},
+        created_at=now,
+    )
+    record.profile_event(profile_event)
+    record.analytics_event(
+        at=now,
+        domain=domain,
+        intent=intent,
+        status=TicketStatus.ESCALATED.value,
+        escalations=1,
+    )
+
+    await save(db, record, profile_event)
+    ESCALATIONS.inc(domain=domain, trigger="manual")
+    queue_position = await enqueue_escalation(db, escalation_id, ticket_id, domain, priority, now)
+
+    return EscalateResponse(
+        status="escalated",
+        ticket_id=ticket_id,
+        escalation_id=escalation_id,
+        queue_position=queue_position,
+    )
+
+
+@app.post("/escalations/claim", response_model=QueuedEscalation)
+async def claim_escalation(request: ClaimRequest, db: AsyncSession = Depends(get_db)):
+    if escalation_manager is None:
+        raise HTTPException(status_code=503, detail="Escalation queue not loaded")
+
+    await flush_writes()
+    await shared_escalation_queue(db)
+    now = datetime.utcnow()
+    entry = await escalation_manager.claim(db, request.assignee, domain=request.domain)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="No escalations waiting")
+
+    return QueuedEscalation(
+        position=1,
+        ticket_id=entry.ticket_id,
+        escalation_id=entry.escalation_id,
+        domain=entry.domain,
+        priority=entry.priority,
+        score=escalation_manager.score(entry, now),
+        wait_seconds=entry.wait_seconds(now),
     )
-    db.add(escalation)
-    await db.commit()
 
-    return {"status": "escalated", "ticket_id": ticket_id}
+
+@app.get("/escalations/backlog", response_model=EscalationBacklog)
+async def escalation_backlog(
+    domain: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+):
+    if await shared_escalation_queue(db) is None:
+        raise HTTPException(status_code=503, detail="Escalation queue not loaded")
+
+    now = datetime.utcnow()
+    entries = escalation_manager.entries(limit=limit, domain=domain)
+    depth = escalation_manager.depth_by_domain()
+
+    return EscalationBacklog(
+        total=depth.get(domain, 0) if domain else len(escalation_manager),
+        by_domain=depth,
+        oldest_wait_seconds=escalation_manager.oldest_wait_seconds(domain, now),
+        entries=[
+            QueuedEscalation(
+                position=position,
+                ticket_id=e.ticket_id,
+                escalation_id=e.escalation_id,
+                domain=e.domain,
+                priority=e.priority,
+                score=escalation_manager.score(e, now),
+                wait_seconds=e.wait_seconds(now),
+            )
+            for position, e in enumerate(entries, start=1)
+        ],
+    )
 
 
 @app.post("/tickets/{ticket_id}/resolve")
@@ -351,16 +891,28 @@ async def resolve_ticket(
     request: ResolveRequest,
     db: AsyncSession = Depends(get_db),
 ):
+    await flush_ticket_writes(ticket_id)
     result = await db.execute(select(Ticket).where(Ticket.id == ticket_id))
     ticket = result.scalar_one_or_none()
 
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
 
-    ticket.status = TicketStatus.RESOLVED.value
-    ticket.resolved_at = datetime.utcnow()
+    domain = ticket.metadata_.get("routed_to", "unknown")
+    intent = ticket.intent
+    subject, body = ticket.subject, ticket.body
+    created_at = ticket.created_at
+    resolved_at = datetime.utcnow()
+    profile_event = ProfileEvent(
+        customer_id=ticket.customer_id,
+        at=resolved_at,
+        tickets_resolved=int(ticket.status != TicketStatus.RESOLVED.value),
+    )
 
-    resolution_msg = Conversation(
+    record = WriteRecord("resolve_ticket").touch(ticket=ticket_id)
+    record.update(Ticket, ticket_id, status=TicketStatus.RESOLVED.value, resolved_at=resolved_at)
+    record.insert(
+        Conversation,
         id=ConversationMessage(
             ticket_id=ticket_id,
             role="human",
@@ -369,19 +921,50 @@ async def resolve_ticket(
         ticket_id=ticket_id,
         role="human",
         content=f"[RESOLVED] {request.resolution}",
+        created_at=resolved_at,
     )
-    db.add(resolution_msg)
-    await db.commit()
+    record.analytics_event(
+        at=resolved_at,
+        domain=domain,
+        intent=intent,
+        status=TicketStatus.RESOLVED.value,
+        resolutions=1,
+        resolution_seconds=(resolved_at - created_at).total_seconds(),
+    )
+    record.profile_event(profile_event)
+
+    await save(db, record, profile_event)
+
+    if escalation_manager is not None:
+        escalation_manager.remove(ticket_id)
+
+    if resolution_pipeline is not None:
+        resolution_pipeline.submit(Resolution(
+            ticket_id=ticket_id,
+            domain=domain,
+            subject=subject,
+            body=body,
+            resolution=request.resolution,
+            intent=intent,
+            resolved_at=resolved_at,
+        ))
 
     return {"status": "resolved", "ticket_id": ticket_id}
 
 
 @app.get("/analytics/summary", response_model=AnalyticsSummary)
 async def get_analytics(db: AsyncSession = Depends(get_db)):
-    total_result = await db.execute(select(Ticket))
-    all_tickets = total_result.scalars().all()
+    result = await db.execute(
+        select(
+            Ticket.status,
+            Ticket.routed_to,
+            func.count(),
+            func.coalesce(func.sum(Ticket.intent_confidence), 0.0),
+        ).group_by(Ticket.status, Ticket.routed_to)
+    )
+    groups = result.all()
 
-    total = len(all_tickets)
+    total = sum(count for _, _, count, _ in groups)
     if total == 0:
         return AnalyticsSummary(
             total_tickets=0,
@@ -393,37 +976,128 @@ async def get_analytics(db: AsyncSession = Depends(get_db)):
             tickets_by_domain={},
         )
 
-    open_count = sum(1 for t in all_tickets if t.status == TicketStatus.OPEN.value)
-    resolved_count = sum(1 for t in all_tickets if t.status == TicketStatus.RESOLVED.value)
-    escalated_count = sum(1 for t in all_tickets if t.status == TicketStatus.ESCALATED.value)
-
-    resolved_without_escalation = sum(
-        1 for t in all_tickets
-        if t.status == TicketStatus.RESOLVED.value
-    )
-
-    auto_resolved_rate = resolved_without_escalation / total if total > 0 else 0.0
-    avg_confidence = sum(t.intent_confidence for t in all_tickets) / total
+    status_counts: dict[str, int] = {}
+    domain_counts: dict[str, int] = {}
+    confidence_sum = 0.0
+    for status, routed_to, count, confidence in groups:
+        status_counts[status] = status_counts.get(status, 0) + count
+        domain = routed_to or "unknown"
+        domain_counts[domain] = domain_counts.get(domain, 0) + count
+        confidence_sum += confidence
 
-    domain_counts = {}
-    for t in all_tickets:
-        domain = t.metadata_.get("routed_to", "unknown")
-        domain_counts[domain] = domain_counts.get(domain, 0) + 1
+    resolved_count = status_counts.get(TicketStatus.RESOLVED.value, 0)
 
     return AnalyticsSummary(
         total_tickets=total,
-        open_tickets=open_count,
+        open_tickets=status_counts.get(TicketStatus.OPEN.value, 0),
         resolved_tickets=resolved_count,
-        escalated_tickets=escalated_count,
-        auto_resolved_rate=auto_resolved_rate,
-        avg_confidence=avg_confidence,
+        escalated_tickets=status_counts.get(TicketStatus.ESCALATED.value, 0),
+        auto_resolved_rate=resolved_count / total,
+        avg_confidence=confidence_sum / total,
         tickets_by_domain=domain_counts,
     )
 
 
+@app.get("/analytics/trends", response_model=AnalyticsTrends)
+async def get_analytics_trends(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    bucket_hours: int = Query(1, ge=1, le=24 * 31),
+    domain: Optional[str] = None,
+    intent: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(hours=24)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    buckets = await analytics.trends(db, start, end, bucket_hours, domain=domain, intent=intent)
+
+    return AnalyticsTrends(
+        start=start,
+        end=end,
+        bucket_hours=bucket_hours,
+        points=[
+            TrendPoint(
+                start=b.start,
+                tickets_created=b.tickets_created,
+                messages=b.messages,
+                escalations=b.escalations,
+                resolutions=b.resolutions,
+                escalation_rate=b.escalation_rate,
+                avg_confidence=b.avg_confidence,
+                avg_resolution_seconds=b.avg_resolution_seconds,
+            )
+            for b in buckets
+        ],
+    )
+
+
+@app.get("/search", response_model=SearchResponse)
+async def search_tickets(
+    q: str = Query(..., min_length=1),
+    kind: Optional[Literal["ticket", "conversation"]] = None,
+    status: Optional[TicketStatus] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db),
+):
+    hits = await search.search(
+        db,
+        q,
+        kind=kind,
+        status=status.value if status else None,
+        limit=limit + 1,
+        offset=offset,
+    )
+    return SearchResponse(
+        query=q,
+        results=[SearchResult(**vars(hit)) for hit in hits[:limit]],
+        next_offset=offset + limit if len(hits) > limit else None,
+    )
+
+
+@app.get("/export/tickets")
+async def export_tickets(
+    status: Optional[TicketStatus] = None,
+    routed_to: Optional[str] = None,
+    intent: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    filters = TicketFilter(
+        status=status.value if status else None,
+        routed_to=routed_to,
+        intent=intent,
+        created_after=created_after,
+        created_before=created_before,
+    )
+    # The request session is closed before the body streams, so the export
+    # opens its own on the same engine.
+    session_factory = async_sessionmaker(db.bind, expire_on_commit=False)
+
+    async def body():
+        async with session_factory() as session:
+            async for line in export_ndjson(session, filters, cursor, archive=transcript_archive):
+                yield line
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
 @app.get("/knowledge/stats", response_model=KnowledgeBaseStats)
 async def get_knowledge_stats():
-    collections = knowledge_base.list_collections()
+    if knowledge_base is None:
+        raise HTTPException(status_code=503, detail="Service is warming up")
+    collections = await asyncio.to_thread(knowledge_base.list_collections)
     counts = {}
     for coll in collections:
         counts[coll] = await knowledge_base.get_collection_count(coll)
@@ -434,6 +1108,24 @@ async def get_knowledge_stats():
     )
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    if shared_metrics is not None:
+        # Totals across every pre-forked worker, not just the one scraped.
+        text = await asyncio.to_thread(shared_metrics.render)
+    else:
+        text = metrics_registry.render()
+    return PlainTextResponse(text, media_type=METRICS_CONTENT_TYPE)
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "version": "0.2.0"}
+
+
+@app.get("/ready")
+async def readiness_check():
+    if warmup is None:
+        return JSONResponse({"ready": False, "progress": "0/0", "steps": {}}, status_code=503)
+    status = warmup.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
@@ -0,0 +1,304 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+import logging
+import os
+from pathlib import Path
+import random
+import shutil
+import signal
+import socket
+import time
+from typing import Optional
+
+import uvicorn
+
+from src.models.storage import WRITE_BEHIND_WORKERS_ERROR, StorageConfig
+from src.services.metrics import reset_metrics_directory, retire_worker_metrics
+
+
+logger = logging.getLogger(__name__)
+
+APP = "src.api.main:app"
+
+# Slot of the process that owns Chroma writes when there are several workers.
+WRITER_SLOT = -1
+
+
+@dataclass
+class ServerConfig:
+    host: str = "0.0.0.0"
+    port: int = 8000
+    workers: int = os.cpu_count() or 1
+    max_requests: int = 10_000
+    max_requests_jitter: int = 1_000
+    graceful_timeout: float = 30.0
+    index_dir: str = "./knowledge_index"
+    snapshot_dir: Optional[str] = None
+    metrics_dir: str = "./metrics"
+
+    @classmethod
+    def from_env(cls) -> "ServerConfig":
+        defaults = cls()
+        return cls(
+            host=os.getenv("HOST", defaults.host),
+            port=int(os.getenv("PORT", defaults.port)),
+            workers=int(os.getenv("WEB_WORKERS", defaults.workers)),
+            max_requests=int(os.getenv("WORKER_MAX_REQUESTS", defaults.max_requests)),
+            max_requests_jitter=int(os.getenv("WORKER_MAX_REQUESTS_JITTER", defaults.max_requests_jitter)),
+            graceful_timeout=float(os.getenv("WORKER_GRACEFUL_TIMEOUT", defaults.graceful_timeout)),
+            index_dir=os.getenv("KNOWLEDGE_INDEX_ROOT", defaults.index_dir),
+            snapshot_dir=os.getenv("KNOWLEDGE_SNAPSHOT_DIR") or None,
+            metrics_dir=os.getenv("METRICS_DIR", defaults.metrics_dir),
+        )
+
+
+@dataclass
+class Worker:
+    slot: int
+    pid: int
+    started: float
+
+
+# Pre-fork supervisor: the parent imports the app, loads the embedding model
+# and exports the knowledge collections as mmap-able indexes, then forks one
+# uvicorn server per slot on a shared listening socket. Workers are replaced
+# when they exit (uvicorn's max-requests recycling or a crash) and rolled one
+# at a time on SIGHUP, after the indexes have been rebuilt. With more than one
+# worker, a separate writer process is the only one writing to Chroma (see
+# _write_knowledge) and workers keep no state that another could change.
+class PreforkServer:
+    def __init__(self, config: ServerConfig, app: str = APP):
+        self.config = config
+        self.app = app
+        self.workers: dict[int, Worker] = {}
+        self.generation = 0
+        self._socket: Optional[socket.socket] = None
+        self._stopping = False
+        self._reload = False
+
+    def slots(self) -> list[int]:
+        slots = list(range(self.config.workers))
+        if self.config.workers > 1:
+            slots.append(WRITER_SLOT)
+        return slots
+
+    def run(self) -> None:
+        if self.config.workers > 1 and StorageConfig.from_env().write_behind:
+            # Checked before forking so workers don't crash and respawn in a loop.
+            raise RuntimeError(WRITE_BEHIND_WORKERS_ERROR)
+        # Read by each worker's lifespan to switch to multi-worker mode.
+        os.environ["PREFORK_WORKERS"] = str(self.config.workers)
+        if self.config.workers > 1:
+            os.environ["METRICS_DIR"] = self.config.metrics_dir
+            reset_metrics_directory(self.config.metrics_dir)
+        self._socket = self._bind()
+        self.preload()
+        self.export_indexes()
+
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+
+        for slot in self.slots():
+            self._spawn(slot)
+        logger.info("Serving on %s:%d with %d workers", self.config.host, self.config.port, self.config.workers)
+
+        while not self._stopping:
+            if self._reload:
+                self._reload = False
+                self.export_indexes()
+                for slot in list(self.workers):
+                    if self._stopping:
+                        break
+                    self._stop_worker(self.workers[slot])
+                    self._spawn(slot)
+            self._reap()
+            time.sleep(0.2)
+
+        for worker in list(self.workers.values()):
+            self._signal(worker, signal.SIGTERM)
+        deadline = time.monotonic() + self.config.graceful_timeout
+        while self.workers and time.monotonic() < deadline:
+            self._reap(respawn=False)
+            time.sleep(0.1)
+        for worker in list(self.workers.values()):
+            self._signal(worker, signal.SIGKILL)
+            os.waitpid(worker.pid, 0)
+        self._socket.close()
+
+    def preload(self) -> None:
+        # Imported before forking so the modules, and the model weights read
+        # below, are shared copy-on-write by every worker. The app itself
+        # defers these heavy imports to its warm-up task.
+        import anthropic  # noqa: F401
+        import chromadb  # noqa: F401
+        import src.api.main  # noqa: F401
+        from src.knowledge.vector_store import preload_embedding_model
+        from src.models.database import engine, init_db
+
+        # Tables and migrations are set up once here rather than raced by
+        # every worker's lifespan.
+        asyncio.run(init_db())
+        asyncio.run(engine.dispose())
+        preload_embedding_model()
+
+    def export_indexes(self) -> None:
+        if self.config.snapshot_dir:
+            # A prebuilt snapshot is served as shipped; replacing it and
+            # sending SIGHUP rolls the workers onto the new files.
+            os.environ["KNOWLEDGE_INDEX_DIR"] = self.config.snapshot_dir
+            return
+
+        self.generation += 1
+        target = Path(self.config.index_dir) / f"gen-{self.generation}"
+
+        # Chroma is opened in a short-lived child so the supervisor never
+        # holds its SQLite connection or threads across later forks.
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                code = 0 if _export(target) is not None else 1
+            finally:
+                os._exit(code)
+        _, status = os.waitpid(pid, 0)
+        if os.waitstatus_to_exitcode(status) != 0:
+            logger.warning("Knowledge index export failed, workers will query Chroma")
+            os.environ.pop("KNOWLEDGE_INDEX_DIR", None)
+            return
+        os.environ["KNOWLEDGE_INDEX_DIR"] = str(target)
+        logger.info("Exported knowledge indexes to %s", target)
+
+        # Workers still on the previous generation keep their mappings until
+        # they are rolled; anything older is unused.
+        for old in Path(self.config.index_dir).glob("gen-*"):
+            if old.name not in (target.name, f"gen-{self.generation - 1}"):
+                shutil.rmtree(old, ignore_errors=True)
+
+    def _bind(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET6 if ":" in self.config.host else socket.AF_INET)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.config.host, self.config.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+
+    def _spawn(self, slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                self._serve(slot)
+            finally:
+                os._exit(0)
+        self.workers[slot] = Worker(slot=slot, pid=pid, started=time.monotonic())
+
+    def _serve(self, slot: int) -> None:
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(sig, signal.SIG_DFL)
+
+        if slot == WRITER_SLOT:
+            self._socket.close()
+            asyncio.run(_write_knowledge())
+            return
+
+        limit = self.config.max_requests
+        if limit and self.config.max_requests_jitter:
+            limit += random.randint(0, self.config.max_requests_jitter)
+        config = uvicorn.Config(
+            self.app,
+            lifespan="on",
+            limit_max_requests=limit or None,
+            timeout_graceful_shutdown=int(self.config.graceful_timeout),
+        )
+        uvicorn.Server(config).run(sockets=[self._socket])
+
+    def _reap(self, respawn: bool = True) -> None:
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = next((w for w in self.workers.values() if w.pid == pid), None)
+            if worker is None:
+                continue
+            del self.workers[worker.slot]
+            self._retire(worker)
+            code = os.waitstatus_to_exitcode(status)
+            if code not in (0, -signal.SIGTERM):
+                logger.warning("Worker %d (pid %d) exited with %d", worker.slot, pid, code)
+            if respawn and not self._stopping:
+                if time.monotonic() - worker.started < 1.0:
+                    time.sleep(1.0)
+                self._spawn(worker.slot)
+
+    def _stop_worker(self, worker: Worker) -> None:
+        self._signal(worker, signal.SIGTERM)
+        deadline = time.monotonic() + self.config.graceful_timeout
+        while time.monotonic() < deadline:
+            pid, _ = os.waitpid(worker.pid, os.WNOHANG)
+            if pid:
+                break
+            time.sleep(0.1)
+        else:
+            self._signal(worker, signal.SIGKILL)
+            os.waitpid(worker.pid, 0)
+        del self.workers[worker.slot]
+        self._retire(worker)
+
+    def _retire(self, worker: Worker) -> None:
+        if self.config.workers > 1:
+            retire_worker_metrics(self.config.metrics_dir, worker.pid)
+
+    def _signal(self, worker: Worker, sig: int) -> None:
+        try:
+            os.kill(worker.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _on_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def _on_reload(self, signum, frame) -> None:
+        self._reload = True
+
+
+async def _write_knowledge() -> None:
+    # Follows resolved tickets in SQLite and feeds them to the resolution
+    # pipeline: similar-ticket embeddings and distilled knowledge documents
+    # go to Chroma from this one process only. Workers see new knowledge
+    # documents after the next SIGHUP re-export.
+    from src.knowledge import KnowledgeBase, KnowledgeIngester, ResolutionPipeline
+    from src.models.database import async_session
+    from src.services.resolution_feed import ResolutionFeed
+    from src.services.similarity import SimilarTicketIndex
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stopping.set)
+
+    kb = KnowledgeBase(persist_directory=os.getenv("CHROMA_PERSIST_DIR", "./chroma_data"))
+    similar = SimilarTicketIndex(kb)
+    await similar.load()
+    pipeline = ResolutionPipeline(KnowledgeIngester(kb), similar_tickets=similar)
+    feed = ResolutionFeed(
+        async_session, pipeline.process_batch, since=similar.latest_resolved_at() or datetime.utcnow()
+    )
+    await feed.start()
+    logger.info("Knowledge writer following resolutions")
+    await stopping.wait()
+    await feed.stop()
+
+
+def _export(target: Path) -> Optional[int]:
+    from src.knowledge import KnowledgeBase
+
+    try:
+        kb = KnowledgeBase(persist_directory=os.getenv("CHROMA_PERSIST_DIR", "./chroma_data"))
+        return asyncio.run(kb.snapshot(target))
+    except Exception:
+        logger.exception("Knowledge index export to %s failed", target)
+        return None
@@ -1,4 +1,5 @@
 from .vector_store import KnowledgeBase
 from .ingestion import KnowledgeIngester
+from .resolutions import Resolution, ResolutionPipeline
 
-__all__ = ["KnowledgeBase", "KnowledgeIngester"]
+__all__ = ["KnowledgeBase", "KnowledgeIngester", "Resolution", "ResolutionPipeline"]
@@ -4,6 +4,8 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
+import numpy as np
+
 from .vector_store import KnowledgeBase
 
 
@@ -24,14 +26,7 @@ class KnowledgeIngester:
         hash_input = f"{source}:{content[:100]}"
         return hashlib.sha256(hash_input.encode()).hexdigest()[:16]
 
-    async def ingest_documents(
-        self,
-        documents: list[Document],
-        collection: str,
-    ) -> int:
-        if not documents:
-            return 0
-
+    def _prepare(self, documents: list[Document]) -> tuple[list[str], list[str], list[dict]]:
         texts = []
         metadatas = []
         ids = []
@@ -47,6 +42,17 @@ class KnowledgeIngester:
                 **(doc.metadata or {}),
             })
 
+        return ids, texts, metadatas
+
+    async def ingest_documents(
+        self,
+        documents: list[Document],
+        collection: str,
+    ) -> int:
+        if not documents:
+            return 0
+
+        ids, texts, metadatas = self._prepare(documents)
         await self.kb.add_documents(
             collection=collection,
             documents=texts,
@@ -56,6 +62,26 @@ class KnowledgeIngester:
 
         return len(documents)
 
+    async def upsert_documents(
+        self,
+        documents: list[Document],
+        collection: str,
+        embeddings: np.ndarray,
+    ) -> int:
+        if not documents:
+            return 0
+
+        ids, texts, metadatas = self._prepare(documents)
+        await self.kb.upsert_embeddings(
+            collection,
+            ids=ids,
+            embeddings=embeddings,
+            documents=texts,
+            metadatas=metadatas,
+        )
+
+        return len(documents)
+
     async def ingest_faq_file(
         self,
         file_path: Path,
@@ -0,0 +1,156 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+import logging
+from typing import Any, Optional
+
+import numpy as np
+
+from .ingestion import Document, KnowledgeIngester
+
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_CHARS = 1000
+
+
+@dataclass
+class Resolution:
+    ticket_id: str
+    domain: str
+    subject: str
+    body: str
+    resolution: str
+    intent: Optional[str] = None
+    resolved_at: Optional[datetime] = None
+
+    @property
+    def collection(self) -> str:
+        return f"{self.domain}_knowledge"
+
+    def to_document(self) -> Document:
+        body = self.body.strip()
+        if len(body) > MAX_BODY_CHARS:
+            body = body[:MAX_BODY_CHARS].rsplit(" ", 1)[0] + "…"
+        return Document(
+            content=f"Q: {self.subject.strip()}\n{body}\nA: {self.resolution.strip()}",
+            source=f"resolution:{self.ticket_id}",
+            category=self.intent or self.domain,
+            title=self.subject[:100],
+            metadata={"ticket_id": self.ticket_id, "origin": "human_resolution"},
+        )
+
+
+class ResolutionPipeline:
+    def __init__(
+        self,
+        ingester: Optional[KnowledgeIngester],
+        batch_size: int = 16,
+        max_delay: float = 1.0,
+        duplicate_threshold: float = 0.92,
+        max_pending: int = 1000,
+        similar_tickets: Optional[Any] = None,
+    ):
+        # May be None until start(): submissions made before then, e.g.
+        # while the knowledge base is still loading, wait in the queue.
+        self.ingester = ingester
+        # A SimilarTicketIndex, if one is loaded: every batch is also added
+        # there, so resolving a ticket never waits on embedding or Chroma.
+        self.similar_tickets = similar_tickets
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.duplicate_threshold = duplicate_threshold
+        self.ingested = 0
+        self.duplicates = 0
+        self.failed = 0
+        self._queue: asyncio.Queue[Resolution] = asyncio.Queue(maxsize=max_pending)
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def submit(self, resolution: Resolution) -> bool:
+        try:
+            self._queue.put_nowait(resolution)
+        except asyncio.QueueFull:
+            logger.warning("Resolution queue full, dropping ticket %s", resolution.ticket_id)
+            return False
+        return True
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self.process_batch(batch)
+            except Exception:
+                self.failed += len(batch)
+                logger.exception("Failed to ingest %d resolutions", len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def process_batch(self, batch: list[Resolution]) -> int:
+        if self.similar_tickets is not None:
+            try:
+                await self.similar_tickets.add_resolutions([
+                    (r.ticket_id, r.subject, r.body, r.resolution, r.domain, r.resolved_at) for r in batch
+                ])
+            except Exception:
+                logger.warning("Failed to index %d resolved tickets", len(batch), exc_info=True)
+
+        by_collection: dict[str, list[Resolution]] = {}
+        for resolution in batch:
+            # Tickets that were never routed still count as similar-ticket
+            # context but have no knowledge collection to feed.
+            if resolution.domain != "unknown":
+                by_collection.setdefault(resolution.collection, []).append(resolution)
+
+        ingested = 0
+        for collection, resolutions in by_collection.items():
+            documents = [r.to_document() for r in resolutions]
+            embeddings = await self.ingester.kb.embed([d.content for d in documents])
+            keep = self._novel(embeddings, await self.ingester.kb.nearest_scores(collection, embeddings))
+            self.duplicates += len(documents) - len(keep)
+            if keep:
+                ingested += await self.ingester.upsert_documents(
+                    [documents[i] for i in keep], collection, embeddings[keep]
+                )
+
+        self.ingested += ingested
+        return ingested
+
+    def _novel(self, embeddings: np.ndarray, existing_scores: list[float]) -> list[int]:
+        # Drop entries close to something already in the collection, then
+        # near-duplicates within the batch itself (first one wins).
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        unit = embeddings / np.where(norms == 0, 1.0, norms)
+        keep: list[int] = []
+        for i, score in enumerate(existing_scores):
+            if score >= self.duplicate_threshold:
+                continue
+            if keep and float(np.max(unit[keep] @ unit[i])) >= self.duplicate_threshold:
+                continue
+            keep.append(i)
+        return keep
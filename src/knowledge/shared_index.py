@@ -0,0 +1,207 @@
+from collections.abc import Sequence
+import json
+import os
+from pathlib import Path
+import shutil
+from typing import Any, Callable, Collection, Iterable, Optional
+
+import numpy as np
+
+
+FORMAT_VERSION = 1
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def _result(document: str, metadata: dict, score: float) -> dict:
+    return {
+        "content": document,
+        "source": metadata.get("source", "unknown"),
+        "score": score,
+        "metadata": metadata,
+    }
+
+
+def _matches(metadata: dict, where: Optional[dict]) -> bool:
+    return not where or all(metadata.get(k) == v for k, v in where.items())
+
+
+# Variable-length strings packed end to end in one UTF-8 blob, with an int64
+# offsets array marking where each one starts (n + 1 entries). Both files are
+# memory-mapped and entries are decoded on access, so opening costs the same
+# for ten strings or ten million.
+class StringTable(Sequence):
+    def __init__(self, data: np.ndarray, offsets: np.ndarray, decode: Optional[Callable[[str], Any]] = None):
+        self.data = data
+        self.offsets = offsets
+        self.decode = decode
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        value = self.data[self.offsets[index]:self.offsets[index + 1]].tobytes().decode()
+        return self.decode(value) if self.decode else value
+
+    @staticmethod
+    def write(path: Path, strings: Iterable[str]) -> None:
+        offsets = [0]
+        with open(path.with_suffix(".strings"), "wb") as f:
+            for value in strings:
+                offsets.append(offsets[-1] + f.write(value.encode()))
+        np.save(path.with_suffix(".offsets.npy"), np.asarray(offsets, dtype=np.int64))
+
+    @classmethod
+    def open(cls, path: Path, decode: Optional[Callable[[str], Any]] = None) -> "StringTable":
+        offsets = np.load(path.with_suffix(".offsets.npy"), mmap_mode="r")
+        if offsets[-1] == 0:
+            # np.memmap refuses empty files.
+            data = np.empty(0, dtype=np.uint8)
+        else:
+            data = np.memmap(path.with_suffix(".strings"), dtype=np.uint8, mode="r")
+        return cls(data, offsets, decode)
+
+
+# Read-only snapshot of one collection: the float32 embedding matrix and
+# its row norms as .npy files, and ids, documents and metadata as string
+# tables. Everything is opened with mmap, so loading takes milliseconds and
+# every worker forked from the same parent reads the same page-cache pages.
+class SharedIndex:
+    def __init__(
+        self,
+        ids: Sequence[str],
+        documents: Sequence[str],
+        metadatas: Sequence[dict],
+        vectors: np.ndarray,
+        norms: Optional[np.ndarray] = None,
+    ):
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self.vectors = vectors
+        if norms is None:
+            norms = np.linalg.norm(vectors, axis=1) if len(vectors) else np.empty(0, dtype=np.float32)
+        self.norms = norms
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def write(
+        directory: str | Path,
+        ids: list[str],
+        embeddings: np.ndarray,
+        documents: list[Optional[str]],
+        metadatas: list[Optional[dict]],
+    ) -> None:
+        directory = Path(directory)
+        staging = directory.with_name(directory.name + ".tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+
+        vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1)
+        np.save(staging / "embeddings.npy", vectors)
+        np.save(staging / "norms.npy", np.linalg.norm(vectors, axis=1).astype(np.float32))
+        StringTable.write(staging / "ids", ids)
+        StringTable.write(staging / "documents", (doc or "" for doc in documents))
+        StringTable.write(
+            staging / "metadatas",
+            (json.dumps(meta or {}, ensure_ascii=False, separators=(",", ":")) for meta in metadatas),
+        )
+        with open(staging / "manifest.json", "w") as f:
+            json.dump({"version": FORMAT_VERSION, "count": len(ids), "dim": vectors.shape[1]}, f)
+
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(staging, directory)
+
+    @staticmethod
+    def exists(directory: str | Path) -> bool:
+        return (Path(directory) / "manifest.json").exists()
+
+    @classmethod
+    def open(cls, directory: str | Path) -> "SharedIndex":
+        directory = Path(directory)
+        with open(directory / "manifest.json") as f:
+            manifest = json.load(f)
+        if manifest["version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {manifest['version']} in {directory}")
+        return cls(
+            StringTable.open(directory / "ids"),
+            StringTable.open(directory / "documents"),
+            StringTable.open(directory / "metadatas", decode=json.loads),
+            np.load(directory / "embeddings.npy", mmap_mode="r"),
+            np.load(directory / "norms.npy", mmap_mode="r"),
+        )
+
+    def search(
+        self,
+        query: np.ndarray,
+        top_k: int = 3,
+        where: Optional[dict] = None,
+        exclude: Collection[str] = (),
+    ) -> list[dict]:
+        if not len(self) or top_k <= 0:
+            return []
+        query = _normalize(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+        scores = (self.vectors @ query) / np.where(self.norms == 0, 1.0, self.norms)
+        if where:
+            keep = np.array([_matches(meta, where) for meta in self.metadatas])
+            scores = np.where(keep, scores, -np.inf)
+        # Excluded ids are dropped from the candidates rather than masked, so
+        # their ids are only decoded for the few rows near the top.
+        k = min(top_k + len(exclude), len(self))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        results = []
+        for i in top:
+            if scores[i] == -np.inf or (exclude and self.ids[i] in exclude):
+                continue
+            results.append(_result(self.documents[i], self.metadatas[i], float(scores[i])))
+        return results[:top_k]
+
+
+# Records upserted into a collection after its snapshot was attached. They are
+# kept in memory and searched alongside the snapshot, replacing snapshot rows
+# with the same id, until the next export folds them into a new snapshot.
+class IndexDelta:
+    def __init__(self):
+        self._rows: dict[str, tuple[np.ndarray, str, dict]] = {}
+        self._unit: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def ids(self) -> Collection[str]:
+        return self._rows.keys()
+
+    def upsert(self, ids: list[str], embeddings: np.ndarray, documents: list[str], metadatas: list[dict]) -> None:
+        vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1)
+        for item_id, vector, document, metadata in zip(ids, vectors, documents, metadatas):
+            self._rows[item_id] = (vector, document or "", metadata or {})
+        self._unit = None
+
+    def search(self, query: np.ndarray, top_k: int = 3, where: Optional[dict] = None) -> list[dict]:
+        if not self._rows or top_k <= 0:
+            return []
+        rows = list(self._rows.values())
+        if self._unit is None:
+            self._unit = _normalize(np.stack([vector for vector, _, _ in rows]))
+        query = _normalize(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+        scores = self._unit @ query
+        results = [
+            _result(document, metadata, float(score))
+            for (_, document, metadata), score in zip(rows, scores)
+            if _matches(metadata, where)
+        ]
+        results.sort(key=lambda r: -r["score"])
+        return results[:top_k]
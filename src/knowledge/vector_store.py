@@ -1,8 +1,51 @@
-import chromadb
-from chromadb.config import Settings
-from typing import Optional
+import asyncio
+import logging
+import numpy as np
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 import os
 
+from src.services.metrics import CACHE_HITS, CACHE_MISSES
+from .shared_index import IndexDelta, SharedIndex
+
+if TYPE_CHECKING:
+    import chromadb
+
+
+logger = logging.getLogger(__name__)
+
+_embedding_function = None
+
+
+def get_embedding_function():
+    # Chroma's default model, held directly: DefaultEmbeddingFunction builds
+    # a fresh instance (tokenizer and ONNX session) on every call. One per
+    # process, so a model loaded before forking workers is inherited.
+    global _embedding_function
+    if _embedding_function is None:
+        from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+
+        _embedding_function = ONNXMiniLM_L6_V2()
+    return _embedding_function
+
+
+def preload_embedding_model() -> bool:
+    # Downloads the model and reads its weights and tokenizer into memory.
+    # The ONNX session itself is created lazily in each process: its thread
+    # pool does not survive fork().
+    ef = get_embedding_function()
+    try:
+        ef._download_model_if_not_exists()
+        ef.tokenizer
+        model_path = Path(ef.DOWNLOAD_PATH) / ef.EXTRACTED_FOLDER_NAME / "model.onnx"
+        with open(model_path, "rb") as f:
+            while f.read(1 << 20):
+                pass
+    except Exception:
+        logger.warning("Could not preload the embedding model", exc_info=True)
+        return False
+    return True
+
 
 class KnowledgeBase:
     def __init__(self, persist_directory: Optional[str] = None):
@@ -10,21 +53,46 @@ class KnowledgeBase:
             "CHROMA_PERSIST_DIR", "./chroma_data"
         )
 
-        self.client = chromadb.PersistentClient(
-            path=self.persist_directory,
-            settings=Settings(anonymized_telemetry=False),
-        )
+        self._client = None
+        self._collections: dict[str, "chromadb.Collection"] = {}
+        self._shared: dict[str, SharedIndex] = {}
+        self._deltas: dict[str, IndexDelta] = {}
+
+    @property
+    def client(self) -> "chromadb.ClientAPI":
+        # chromadb takes about a second to import and opens its SQLite store
+        # on creation; both wait until a collection is actually needed, so
+        # a node serving from a snapshot never pays for them.
+        if self._client is None:
+            import chromadb
+            from chromadb.config import Settings
 
-        self._collections: dict[str, chromadb.Collection] = {}
+            self._client = chromadb.PersistentClient(
+                path=self.persist_directory,
+                settings=Settings(anonymized_telemetry=False),
+            )
+        return self._client
 
-    def get_or_create_collection(self, name: str) -> chromadb.Collection:
+    def get_or_create_collection(self, name: str) -> "chromadb.Collection":
         if name not in self._collections:
+            CACHE_MISSES.inc(cache="collection")
             self._collections[name] = self.client.get_or_create_collection(
                 name=name,
                 metadata={"hnsw:space": "cosine"},
             )
+        else:
+            CACHE_HITS.inc(cache="collection")
         return self._collections[name]
 
+    async def _collection(self, name: str) -> "chromadb.Collection":
+        # Chroma is synchronous (SQLite plus the HNSW index), so every call
+        # made from a coroutine runs in a worker thread, including the first
+        # lookup of a collection, which may open the client.
+        if name in self._collections:
+            CACHE_HITS.inc(cache="collection")
+            return self._collections[name]
+        return await asyncio.to_thread(self.get_or_create_collection, name)
+
     async def add_documents(
         self,
         collection: str,
@@ -32,13 +100,113 @@ class KnowledgeBase:
         metadatas: list[dict],
         ids: list[str],
     ) -> None:
-        coll = self.get_or_create_collection(collection)
-        coll.add(
+        if collection in self._shared:
+            # Embedded here rather than by Chroma so the snapshot's delta
+            # gets the same vectors.
+            await self.upsert_embeddings(collection, ids, await self.embed(documents), documents, metadatas)
+            return
+        coll = await self._collection(collection)
+        await asyncio.to_thread(
+            coll.add,
             documents=documents,
             metadatas=metadatas,
             ids=ids,
         )
 
+    async def upsert_embeddings(
+        self,
+        collection: str,
+        ids: list[str],
+        embeddings: np.ndarray,
+        documents: list[str],
+        metadatas: list[dict],
+    ) -> None:
+        coll = await self._collection(collection)
+        await asyncio.to_thread(
+            coll.upsert,
+            ids=ids,
+            embeddings=embeddings,
+            documents=documents,
+            metadatas=metadatas,
+        )
+        if collection in self._shared:
+            self._deltas.setdefault(collection, IndexDelta()).upsert(ids, embeddings, documents, metadatas)
+
+    async def get_embeddings(self, collection: str) -> tuple[list[str], np.ndarray, list[dict]]:
+        coll = await self._collection(collection)
+        results = await asyncio.to_thread(coll.get, include=["embeddings", "metadatas"])
+        embeddings = results["embeddings"]
+        if embeddings is None or len(embeddings) == 0:
+            return [], np.empty((0, 0), dtype=np.float32), []
+        return results["ids"], np.asarray(embeddings, dtype=np.float32), results["metadatas"]
+
+    async def get_records(self, collection: str) -> tuple[list[str], np.ndarray, list[str], list[dict]]:
+        coll = await self._collection(collection)
+        results = await asyncio.to_thread(coll.get, include=["embeddings", "documents", "metadatas"])
+        embeddings = results["embeddings"]
+        if embeddings is None or len(embeddings) == 0:
+            return [], np.empty((0, 0), dtype=np.float32), [], []
+        return (
+            results["ids"],
+            np.asarray(embeddings, dtype=np.float32),
+            results["documents"],
+            [meta or {} for meta in results["metadatas"]],
+        )
+
+    async def snapshot(self, directory: str | Path, collections: Optional[list[str]] = None) -> int:
+        written = 0
+        for name in collections or await asyncio.to_thread(self.list_collections):
+            ids, embeddings, documents, metadatas = await self.get_records(name)
+            if ids:
+                await asyncio.to_thread(SharedIndex.write, Path(directory) / name, ids, embeddings, documents, metadatas)
+                written += 1
+        return written
+
+    def attach_snapshot(self, directory: str | Path) -> list[str]:
+        # Searches on the attached collections are answered from the mmap'd
+        # snapshot plus an in-memory delta of anything upserted since; writes
+        # still go to Chroma as well.
+        if not Path(directory).is_dir():
+            return []
+        for path in sorted(Path(directory).iterdir()):
+            if SharedIndex.exists(path):
+                self._shared[path.name] = SharedIndex.open(path)
+                self._deltas.pop(path.name, None)
+        return list(self._shared)
+
+    async def restore_snapshot(self, directory: str | Path, batch_size: int = 1000) -> int:
+        restored = 0
+        for path in sorted(Path(directory).iterdir()):
+            if not SharedIndex.exists(path):
+                continue
+            index = SharedIndex.open(path)
+            for start in range(0, len(index), batch_size):
+                end = min(start + batch_size, len(index))
+                await self.upsert_embeddings(
+                    path.name,
+                    index.ids[start:end],
+                    np.asarray(index.vectors[start:end]),
+                    index.documents[start:end],
+                    index.metadatas[start:end],
+                )
+            restored += len(index)
+        return restored
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        # Same model Chroma uses for query_texts, so vectors are comparable
+        # with the stored knowledge collections.
+        vectors = await asyncio.to_thread(get_embedding_function(), texts)
+        return np.asarray(vectors, dtype=np.float32)
+
+    async def nearest_scores(self, collection: str, embeddings: np.ndarray) -> list[float]:
+        if len(embeddings) == 0:
+            return []
+        coll = await self._collection(collection)
+        if await asyncio.to_thread(coll.count) == 0:
+            return [0.0] * len(embeddings)
+        results = await asyncio.to_thread(coll.query, query_embeddings=embeddings, n_results=1, include=["distances"])
+        return [1 - distances[0] if distances else 0.0 for distances in results["distances"]]
+
     async def search(
         self,
         collection: str,
@@ -46,9 +214,20 @@ class KnowledgeBase:
         top_k: int = 3,
         where: Optional[dict] = None,
     ) -> list[dict]:
-        coll = self.get_or_create_collection(collection)
+        shared = self._shared.get(collection)
+        if shared is not None:
+            vector = (await self.embed([query]))[0]
+            delta = self._deltas.get(collection)
+            if not delta:
+                return shared.search(vector, top_k, where)
+            results = shared.search(vector, top_k, where, exclude=delta.ids) + delta.search(vector, top_k, where)
+            results.sort(key=lambda r: -r["score"])
+            return results[:top_k]
+
+        coll = await self._collection(collection)
 
-        results = coll.query(
+        results = await asyncio.to_thread(
+            coll.query,
             query_texts=[query],
             n_results=top_k,
             where=where,
@@ -72,13 +251,16 @@ class KnowledgeBase:
         ]
 
     async def delete_collection(self, name: str) -> None:
-        self.client.delete_collection(name)
+        client = await asyncio.to_thread(getattr, self, "client")
+        await asyncio.to_thread(client.delete_collection, name)
         if name in self._collections:
             del self._collections[name]
+        self._shared.pop(name, None)
+        self._deltas.pop(name, None)
 
     def list_collections(self) -> list[str]:
         return [c.name for c in self.client.list_collections()]
 
     async def get_collection_count(self, name: str) -> int:
-        coll = self.get_or_create_collection(name)
-        return coll.count()
+        coll = await self._collection(name)
+        return await asyncio.to_thread(coll.count)
@@ -1,5 +1,7 @@
 from .ticket import ParsedTicket, TicketCreate, AgentResponse, ConversationMessage
-from .database import Base, Ticket, Conversation, get_db, init_db
+from .database import Base, Ticket, Conversation, Escalation, AnalyticsRollup, CustomerProfile, ArchivedTranscript, get_db, init_db
+from .archive import TranscriptArchive
+from .repository import TicketRepository, TicketPage, TicketFilter, TicketList
 
 __all__ = [
     "ParsedTicket",
@@ -9,6 +11,15 @@ __all__ = [
     "Base",
     "Ticket",
     "Conversation",
+    "Escalation",
+    "AnalyticsRollup",
+    "CustomerProfile",
+    "ArchivedTranscript",
+    "TranscriptArchive",
     "get_db",
     "init_db",
+    "TicketRepository",
+    "TicketPage",
+    "TicketFilter",
+    "TicketList",
 ]
@@ -0,0 +1,145 @@
+import asyncio
+from datetime import datetime
+import gzip
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import delete, exists, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import ArchivedTranscript, Conversation, Ticket
+from .ticket import TicketStatus
+
+
+def to_turn(conversation: Conversation) -> dict:
+    return {
+        "id": conversation.id,
+        "role": conversation.role,
+        "content": conversation.content,
+        "confidence": conversation.confidence,
+        "created_at": conversation.created_at.isoformat(),
+    }
+
+
+def from_turn(ticket_id: str, turn: dict) -> Conversation:
+    return Conversation(
+        id=turn["id"],
+        ticket_id=ticket_id,
+        role=turn["role"],
+        content=turn["content"],
+        confidence=turn["confidence"],
+        created_at=datetime.fromisoformat(turn["created_at"]),
+    )
+
+
+# Append-only gzip segments. Each transcript is written as its own gzip
+# member, so one can be read back by offset without inflating the segment,
+# while the whole file still decompresses as a single NDJSON stream.
+class TranscriptArchive:
+    def __init__(self, directory: str | Path, segment_bytes: int = 64 * 1024 * 1024, fsync: bool = True):
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+
+    def segments(self) -> list[int]:
+        return sorted(int(p.name.split("-")[1].split(".")[0]) for p in self.directory.glob("transcripts-*.ndjson.gz"))
+
+    def path(self, segment: int) -> Path:
+        return self.directory / f"transcripts-{segment:06d}.ndjson.gz"
+
+    def append(self, transcripts: list[tuple[str, list[dict]]]) -> list[tuple[int, int, int]]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        segment = max(self.segments(), default=1)
+        if self.path(segment).exists() and self.path(segment).stat().st_size >= self.segment_bytes:
+            segment += 1
+
+        locations = []
+        with open(self.path(segment), "ab") as f:
+            for _, turns in transcripts:
+                payload = "".join(json.dumps(turn, separators=(",", ":")) + "\n" for turn in turns)
+                member = gzip.compress(payload.encode(), mtime=0)
+                locations.append((segment, f.tell(), len(member)))
+                f.write(member)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        return locations
+
+    def read(self, segment: int, offset: int, length: int) -> list[dict]:
+        with open(self.path(segment), "rb") as f:
+            f.seek(offset)
+            payload = gzip.decompress(f.read(length))
+        return [json.loads(line) for line in payload.decode().splitlines()]
+
+    async def load(self, entry: ArchivedTranscript) -> list[Conversation]:
+        turns = await asyncio.to_thread(self.read, entry.segment, entry.offset, entry.length)
+        return [from_turn(entry.ticket_id, turn) for turn in turns]
+
+
+async def archive_resolved(
+    session: AsyncSession,
+    archive: TranscriptArchive,
+    resolved_before: datetime,
+    batch_size: int = 100,
+) -> int:
+    ticket_ids = list((await session.execute(
+        select(Ticket.id)
+        .where(
+            Ticket.status == TicketStatus.RESOLVED.value,
+            Ticket.resolved_at < resolved_before,
+            ~exists().where(ArchivedTranscript.ticket_id == Ticket.id),
+            exists().where(Conversation.ticket_id == Ticket.id),
+        )
+        .order_by(Ticket.resolved_at)
+        .limit(batch_size)
+    )).scalars())
+    if not ticket_ids:
+        return 0
+
+    conversations = (await session.execute(
+        select(Conversation)
+        .where(Conversation.ticket_id.in_(ticket_ids))
+        .order_by(Conversation.ticket_id, Conversation.created_at, Conversation.id)
+    )).scalars().all()
+    transcripts: dict[str, list[dict]] = {ticket_id: [] for ticket_id in ticket_ids}
+    for conversation in conversations:
+        transcripts[conversation.ticket_id].append(to_turn(conversation))
+
+    # Segments are written and synced before the rows are deleted; a crash
+    # in between only leaves unreferenced bytes behind.
+    locations = await asyncio.to_thread(archive.append, list(transcripts.items()))
+    for (ticket_id, turns), (segment, offset, length) in zip(transcripts.items(), locations):
+        session.add(ArchivedTranscript(
+            ticket_id=ticket_id, segment=segment, offset=offset, length=length, turns=len(turns)
+        ))
+
+    conversation_ids = [c.id for c in conversations]
+    # Keep archived turns searchable: their FTS rows are copied below the
+    # lowest rowid in use (live rows are never negative, and conversation
+    # rowids can be reused once deleted) before the delete trigger drops the
+    # originals.
+    await session.execute(
+        text(
+            "INSERT INTO search_index (rowid, subject, content, ticket_id, kind) "
+            "SELECT COALESCE((SELECT MIN(rowid, 0) FROM (SELECT rowid FROM search_index ORDER BY rowid LIMIT 1)), 0) "
+            "- ROW_NUMBER() OVER (ORDER BY rowid), '', content, ticket_id, 'conversation' "
+            "FROM conversations WHERE id IN (SELECT value FROM json_each(:ids))"
+        ),
+        {"ids": json.dumps(conversation_ids)},
+    )
+    await session.execute(delete(Conversation).where(Conversation.id.in_(conversation_ids)))
+    await session.commit()
+    return len(ticket_ids)
+
+
+async def load_transcript(
+    session: AsyncSession,
+    archive: Optional[TranscriptArchive],
+    ticket_id: str,
+) -> list[Conversation]:
+    entry = await session.get(ArchivedTranscript, ticket_id)
+    if entry is None or archive is None:
+        return []
+    return await archive.load(entry)
@@ -1,10 +1,13 @@
 from datetime import datetime
 from typing import AsyncGenerator
-from sqlalchemy import String, Float, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import String, Float, Integer, Text, DateTime, ForeignKey, Index, JSON, text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 import os
 
+from .migrations import run_migrations
+from .storage import GroupCommitWriter, StorageConfig, WriteFn, configure_engine
+
 
 class Base(DeclarativeBase):
     pass
@@ -12,6 +15,16 @@ class Base(DeclarativeBase):
 
 class Ticket(Base):
     __tablename__ = "tickets"
+    __table_args__ = (
+        Index("ix_tickets_status_created", "status", "created_at", "id"),
+        Index("ix_tickets_customer_created", "customer_id", "created_at", "id"),
+        Index("ix_tickets_routed_created", "routed_to", "created_at", "id"),
+        Index("ix_tickets_intent_created", "intent", "created_at", "id"),
+        Index("ix_tickets_created", "created_at", "id"),
+        Index("ix_tickets_status_priority", "status", text("priority DESC"), "created_at", "id"),
+        Index("ix_tickets_status_routed", "status", "routed_to", "intent_confidence"),
+        Index("ix_tickets_status_resolved", "status", "resolved_at", "id"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     source: Mapped[str] = mapped_column(String(50))
@@ -24,15 +37,22 @@ class Ticket(Base):
     intent_confidence: Mapped[float] = mapped_column(Float, default=0.0)
     status: Mapped[str] = mapped_column(String(50), default="open")
     assigned_to: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    routed_to: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    priority: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
     metadata_: Mapped[dict] = mapped_column("metadata", JSON, default=dict)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     resolved_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
     conversations: Mapped[list["Conversation"]] = relationship(back_populates="ticket")
+    escalations: Mapped[list["Escalation"]] = relationship(back_populates="ticket")
+    archive: Mapped["ArchivedTranscript | None"] = relationship(back_populates="ticket")
 
 
 class Conversation(Base):
     __tablename__ = "conversations"
+    __table_args__ = (
+        Index("ix_conversations_ticket_created", "ticket_id", "created_at"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     ticket_id: Mapped[str] = mapped_column(ForeignKey("tickets.id"))
@@ -46,6 +66,9 @@ class Conversation(Base):
 
 class Escalation(Base):
     __tablename__ = "escalations"
+    __table_args__ = (
+        Index("ix_escalations_ticket", "ticket_id"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     ticket_id: Mapped[str] = mapped_column(ForeignKey("tickets.id"))
@@ -56,15 +79,99 @@ class Escalation(Base):
     feedback_captured: Mapped[bool] = mapped_column(default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
+    ticket: Mapped["Ticket"] = relationship(back_populates="escalations")
+
+
+class AnalyticsRollup(Base):
+    __tablename__ = "analytics_rollups"
+
+    hour: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    domain: Mapped[str] = mapped_column(String(50), primary_key=True)
+    intent: Mapped[str] = mapped_column(String(100), primary_key=True)
+    status: Mapped[str] = mapped_column(String(50), primary_key=True)
+    tickets_created: Mapped[int] = mapped_column(Integer, default=0)
+    messages: Mapped[int] = mapped_column(Integer, default=0)
+    escalations: Mapped[int] = mapped_column(Integer, default=0)
+    resolutions: Mapped[int] = mapped_column(Integer, default=0)
+    confidence_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    confidence_count: Mapped[int] = mapped_column(Integer, default=0)
+    resolution_seconds_sum: Mapped[float] = mapped_column(Float, default=0.0)
+
+
+class CustomerProfile(Base):
+    __tablename__ = "customer_profiles"
+
+    customer_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    ticket_count: Mapped[int] = mapped_column(Integer, default=0)
+    open_tickets: Mapped[int] = mapped_column(Integer, default=0)
+    resolved_tickets: Mapped[int] = mapped_column(Integer, default=0)
+    escalation_count: Mapped[int] = mapped_column(Integer, default=0)
+    recent_intents: Mapped[list] = mapped_column(JSON, default=list)
+    last_sentiment: Mapped[float | None] = mapped_column(Float, nullable=True)
+    last_contact_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+class ArchivedTranscript(Base):
+    __tablename__ = "archived_transcripts"
+
+    ticket_id: Mapped[str] = mapped_column(ForeignKey("tickets.id"), primary_key=True)
+    segment: Mapped[int] = mapped_column(Integer)
+    offset: Mapped[int] = mapped_column(Integer)
+    length: Mapped[int] = mapped_column(Integer)
+    turns: Mapped[int] = mapped_column(Integer)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    ticket: Mapped["Ticket"] = relationship(back_populates="archive")
+
+
+class AppliedWrite(Base):
+    __tablename__ = "applied_writes"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    applied_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./support.db")
+storage_config = StorageConfig.from_env()
 engine = create_async_engine(DATABASE_URL, echo=False)
+configure_engine(engine, storage_config)
 async_session = async_sessionmaker(engine, expire_on_commit=False)
+group_writer: GroupCommitWriter | None = None
 
 
-async def init_db():
-    async with engine.begin() as conn:
+async def init_db(bind: AsyncEngine = engine):
+    async with bind.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(run_migrations)
+
+
+async def start_group_writer() -> None:
+    global group_writer
+    if storage_config.group_commit and group_writer is None:
+        group_writer = GroupCommitWriter(
+            async_session,
+            max_batch=storage_config.group_commit_max_batch,
+            max_delay_ms=storage_config.group_commit_max_delay_ms,
+        )
+        await group_writer.start()
+
+
+async def stop_group_writer() -> None:
+    global group_writer
+    if group_writer is not None:
+        await group_writer.stop()
+        group_writer = None
+
+
+async def commit_write(db: AsyncSession, write: WriteFn) -> None:
+    if group_writer is None:
+        await write(db)
+        await db.commit()
+        return
+    # Release the request's read snapshot before handing the write to the
+    # shared writer; loaded attributes stay readable on detached objects.
+    await db.close()
+    await group_writer.submit(write)
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
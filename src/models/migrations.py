@@ -0,0 +1,226 @@
+from dataclasses import dataclass
+from datetime import datetime
+import json
+from typing import Callable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def sql(*statements: str) -> Callable[[Connection], None]:
+    def upgrade(conn: Connection) -> None:
+        for statement in statements:
+            conn.execute(text(statement))
+    return upgrade
+
+
+def column_exists(conn: Connection, table: str, column: str) -> bool:
+    rows = conn.execute(text(f"PRAGMA table_info({table})")).all()
+    return any(row[1] == column for row in rows)
+
+
+def add_column(conn: Connection, table: str, column: str, ddl: str) -> None:
+    if not column_exists(conn, table, column):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def add_routing_columns(conn: Connection) -> None:
+    add_column(conn, "tickets", "routed_to", "VARCHAR(50)")
+    add_column(conn, "tickets", "priority", "INTEGER NOT NULL DEFAULT 0")
+    conn.execute(text(
+        "UPDATE tickets SET routed_to = json_extract(metadata, '$.routed_to') WHERE routed_to IS NULL"
+    ))
+    conn.execute(text(
+        "UPDATE tickets SET priority = "
+        "(CASE urgency WHEN 'critical' THEN 30 WHEN 'high' THEN 20 WHEN 'low' THEN 0 ELSE 10 END) "
+        "+ CAST(MAX(0.0, -COALESCE(sentiment, 0.0)) * 9 + 0.5 AS INTEGER)"
+    ))
+    sql(
+        "DROP INDEX IF EXISTS ix_tickets_status_created",
+        "DROP INDEX IF EXISTS ix_tickets_customer_created",
+        "CREATE INDEX ix_tickets_status_created ON tickets (status, created_at, id)",
+        "CREATE INDEX ix_tickets_customer_created ON tickets (customer_id, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_tickets_routed_created ON tickets (routed_to, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_tickets_intent_created ON tickets (intent, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_tickets_created ON tickets (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_tickets_status_priority ON tickets (status, priority DESC, created_at, id)",
+    )(conn)
+
+
+# Full-text index over ticket subject/body and conversation turns. FTS rowids
+# are derived from the source rowid (even for tickets, odd for conversations)
+# so the sync triggers can update and delete by rowid.
+SEARCH_INDEX_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+    "subject, content, ticket_id UNINDEXED, kind UNINDEXED, tokenize = 'unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS tickets_search_insert AFTER INSERT ON tickets BEGIN "
+    "INSERT INTO search_index (rowid, subject, content, ticket_id, kind) "
+    "VALUES (new.rowid * 2, new.subject, new.body, new.id, 'ticket'); END",
+    "CREATE TRIGGER IF NOT EXISTS tickets_search_update AFTER UPDATE OF subject, body ON tickets BEGIN "
+    "DELETE FROM search_index WHERE rowid = old.rowid * 2; "
+    "INSERT INTO search_index (rowid, subject, content, ticket_id, kind) "
+    "VALUES (new.rowid * 2, new.subject, new.body, new.id, 'ticket'); END",
+    "CREATE TRIGGER IF NOT EXISTS tickets_search_delete AFTER DELETE ON tickets BEGIN "
+    "DELETE FROM search_index WHERE rowid = old.rowid * 2; END",
+    "CREATE TRIGGER IF NOT EXISTS conversations_search_insert AFTER INSERT ON conversations BEGIN "
+    "INSERT INTO search_index (rowid, subject, content, ticket_id, kind) "
+    "VALUES (new.rowid * 2 + 1, '', new.content, new.ticket_id, 'conversation'); END",
+    "CREATE TRIGGER IF NOT EXISTS conversations_search_update AFTER UPDATE OF content ON conversations BEGIN "
+    "DELETE FROM search_index WHERE rowid = old.rowid * 2 + 1; "
+    "INSERT INTO search_index (rowid, subject, content, ticket_id, kind) "
+    "VALUES (new.rowid * 2 + 1, '', new.content, new.ticket_id, 'conversation'); END",
+    "CREATE TRIGGER IF NOT EXISTS conversations_search_delete AFTER DELETE ON conversations BEGIN "
+    "DELETE FROM search_index WHERE rowid = old.rowid * 2 + 1; END",
+)
+
+
+def create_search_index(conn: Connection) -> None:
+    sql(*SEARCH_INDEX_DDL)(conn)
+    conn.execute(text(
+        "INSERT INTO search_index (rowid, subject, content, ticket_id, kind) "
+        "SELECT rowid * 2, subject, body, id, 'ticket' FROM tickets"
+    ))
+    conn.execute(text(
+        "INSERT INTO search_index (rowid, subject, content, ticket_id, kind) "
+        "SELECT rowid * 2 + 1, '', content, ticket_id, 'conversation' FROM conversations"
+    ))
+
+
+def backfill_customer_profiles(conn: Connection, customer_ids: Optional[list[str]] = None) -> None:
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS customer_profiles ("
+        "customer_id VARCHAR(100) PRIMARY KEY, ticket_count INTEGER NOT NULL, open_tickets INTEGER NOT NULL, "
+        "resolved_tickets INTEGER NOT NULL, escalation_count INTEGER NOT NULL, recent_intents JSON NOT NULL, "
+        "last_sentiment FLOAT, last_contact_at DATETIME)"
+    ))
+    only = " AND t.customer_id IN (SELECT value FROM json_each(:ids))" if customer_ids is not None else ""
+    conn.execute(text(
+        "INSERT OR IGNORE INTO customer_profiles "
+        "SELECT t.customer_id, COUNT(*), "
+        "SUM(t.status != 'resolved'), SUM(t.status = 'resolved'), "
+        "(SELECT COUNT(*) FROM escalations e JOIN tickets t2 ON t2.id = e.ticket_id "
+        " WHERE t2.customer_id = t.customer_id), "
+        "(SELECT json_group_array(intent) FROM (SELECT intent FROM tickets t3 "
+        " WHERE t3.customer_id = t.customer_id AND intent IS NOT NULL ORDER BY created_at DESC LIMIT 5)), "
+        "(SELECT sentiment FROM tickets t4 WHERE t4.customer_id = t.customer_id ORDER BY created_at DESC LIMIT 1), "
+        "MAX(t.created_at) "
+        f"FROM tickets t WHERE t.customer_id IS NOT NULL{only} GROUP BY t.customer_id"
+    ), {"ids": json.dumps(customer_ids)} if customer_ids is not None else {})
+
+
+# Rebuilds hourly rollups for history recorded before rollups existed. Only
+# hours earlier than the first live rollup are filled, so events already
+# counted by record_event are not counted twice.
+ROLLUP_BACKFILL_SQL = (
+    "WITH events (at, domain, intent, status, tickets_created, messages, escalations, resolutions, "
+    "confidence_sum, confidence_count, resolution_seconds_sum) AS ("
+    "SELECT t.created_at, t.routed_to, t.intent, "
+    "CASE WHEN EXISTS (SELECT 1 FROM escalations e WHERE e.ticket_id = t.id AND e.created_at = t.created_at) "
+    "THEN 'escalated' ELSE 'in_progress' END, "
+    "1, 0, 0, 0, COALESCE(t.intent_confidence, 0.0), t.intent_confidence IS NOT NULL, 0.0 FROM tickets t "
+    "UNION ALL "
+    "SELECT c.created_at, t.routed_to, t.intent, 'in_progress', 0, 1, 0, 0, 0.0, 0, 0.0 "
+    "FROM conversations c JOIN tickets t ON t.id = c.ticket_id "
+    "WHERE c.role = 'customer' AND c.created_at > t.created_at "
+    "UNION ALL "
+    "SELECT e.created_at, t.routed_to, t.intent, 'escalated', 0, 0, 1, 0, 0.0, 0, 0.0 "
+    "FROM escalations e JOIN tickets t ON t.id = e.ticket_id "
+    "UNION ALL "
+    "SELECT t.resolved_at, t.routed_to, t.intent, 'resolved', 0, 0, 0, 1, 0.0, 0, "
+    "(julianday(t.resolved_at) - julianday(t.created_at)) * 86400.0 FROM tickets t WHERE t.resolved_at IS NOT NULL"
+    ") "
+    "INSERT INTO analytics_rollups (hour, domain, intent, status, tickets_created, messages, escalations, "
+    "resolutions, confidence_sum, confidence_count, resolution_seconds_sum) "
+    "SELECT strftime('%Y-%m-%d %H\\:00\\:00.000000', at) AS bucket, COALESCE(domain, 'general'), "
+    "COALESCE(intent, 'unknown'), status, SUM(tickets_created), SUM(messages), SUM(escalations), "
+    "SUM(resolutions), SUM(confidence_sum), SUM(confidence_count), SUM(resolution_seconds_sum) "
+    "FROM events WHERE at IS NOT NULL "
+    "AND strftime('%Y-%m-%d %H\\:00\\:00.000000', at) < "
+    "(SELECT COALESCE(MIN(hour), '9999-12-31') FROM analytics_rollups) "
+    "GROUP BY 1, 2, 3, 4"
+)
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(
+        1,
+        "Index conversations by ticket and creation time",
+        sql("CREATE INDEX IF NOT EXISTS ix_conversations_ticket_created ON conversations (ticket_id, created_at)"),
+    ),
+    Migration(
+        2,
+        "Index escalations by ticket",
+        sql("CREATE INDEX IF NOT EXISTS ix_escalations_ticket ON escalations (ticket_id)"),
+    ),
+    Migration(
+        3,
+        "Index tickets by status and by customer",
+        sql(
+            "CREATE INDEX IF NOT EXISTS ix_tickets_status_created ON tickets (status, created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_tickets_customer_created ON tickets (customer_id, created_at)",
+        ),
+    ),
+    Migration(
+        4,
+        "Promote routed domain and queue priority to indexed ticket columns",
+        add_routing_columns,
+    ),
+    Migration(
+        5,
+        "Add FTS5 search index over tickets and conversations",
+        create_search_index,
+    ),
+    Migration(
+        6,
+        "Backfill per-customer profiles from ticket history",
+        backfill_customer_profiles,
+    ),
+    Migration(
+        7,
+        "Cover the analytics summary with a (status, routed_to) index",
+        sql(
+            "CREATE INDEX IF NOT EXISTS ix_tickets_status_routed "
+            "ON tickets (status, routed_to, intent_confidence)"
+        ),
+    ),
+    Migration(
+        8,
+        "Index tickets by resolution time for the multi-worker resolution feed",
+        sql("CREATE INDEX IF NOT EXISTS ix_tickets_status_resolved ON tickets (status, resolved_at, id)"),
+    ),
+    Migration(
+        9,
+        "Backfill hourly analytics rollups from ticket history",
+        sql(ROLLUP_BACKFILL_SQL),
+    ),
+]
+
+
+def current_version(conn: Connection) -> int:
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "version INTEGER PRIMARY KEY, description TEXT NOT NULL, applied_at DATETIME NOT NULL)"
+    ))
+    return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_version")).scalar_one()
+
+
+def run_migrations(conn: Connection, migrations: list[Migration] = MIGRATIONS) -> list[int]:
+    version = current_version(conn)
+    applied = []
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version <= version:
+            continue
+        migration.upgrade(conn)
+        conn.execute(
+            text("INSERT INTO schema_version (version, description, applied_at) VALUES (:v, :d, :t)"),
+            {"v": migration.version, "d": migration.description, "t": datetime.utcnow()},
+        )
+        applied.append(migration.version)
+    return applied
@@ -0,0 +1,27 @@
+import numpy as np
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import Conversation, Escalation, Ticket
+from .ticket import TicketStatus
+
+
+# Labelled (confidence, outcome) pairs for fitting a calibration table: an
+# agent turn counts as a success when its ticket was resolved without a human
+# stepping in.
+async def load_outcomes(session: AsyncSession) -> tuple[np.ndarray, np.ndarray]:
+    escalated = exists().where(Escalation.ticket_id == Ticket.id)
+    result = await session.execute(
+        select(Conversation.confidence, (Ticket.status == TicketStatus.RESOLVED.value) & ~escalated)
+        .join(Ticket, Conversation.ticket_id == Ticket.id)
+        .where(
+            Conversation.role == "agent",
+            Conversation.confidence > 0,
+            Ticket.status.in_([TicketStatus.RESOLVED.value, TicketStatus.ESCALATED.value]),
+        )
+    )
+    rows = result.all()
+    if not rows:
+        return np.empty(0), np.empty(0)
+    data = np.asarray(rows, dtype=np.float64)
+    return data[:, 0], data[:, 1]
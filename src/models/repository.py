@@ -0,0 +1,212 @@
+import base64
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Select, and_, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, contains_eager
+
+from .archive import TranscriptArchive, load_transcript
+from .database import Conversation, Escalation, Ticket
+from .ticket import TicketStatus
+
+
+def _pack(*parts: str) -> str:
+    return base64.urlsafe_b64encode("|".join(parts).encode()).decode().rstrip("=")
+
+
+def _unpack(cursor: str, count: int) -> list[str]:
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    parts = raw.split("|", count - 1)
+    if len(parts) != count:
+        raise ValueError("wrong number of cursor fields")
+    return parts
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    return _pack(created_at.isoformat(), row_id)
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        created_at, row_id = _unpack(cursor, 2)
+        return datetime.fromisoformat(created_at), row_id
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def encode_queue_cursor(priority: int, created_at: datetime, row_id: str) -> str:
+    return _pack(str(priority), created_at.isoformat(), row_id)
+
+
+def decode_queue_cursor(cursor: str) -> tuple[int, datetime, str]:
+    try:
+        priority, created_at, row_id = _unpack(cursor, 3)
+        return int(priority), datetime.fromisoformat(created_at), row_id
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+@dataclass
+class TicketFilter:
+    status: Optional[str] = None
+    routed_to: Optional[str] = None
+    customer_id: Optional[str] = None
+    intent: Optional[str] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+
+def filter_tickets(query: Select, filters: TicketFilter) -> Select:
+    for column, value in (
+        (Ticket.status, filters.status),
+        (Ticket.routed_to, filters.routed_to),
+        (Ticket.customer_id, filters.customer_id),
+        (Ticket.intent, filters.intent),
+    ):
+        if value is not None:
+            query = query.where(column == value)
+    if filters.created_after is not None:
+        query = query.where(Ticket.created_at >= filters.created_after)
+    if filters.created_before is not None:
+        query = query.where(Ticket.created_at < filters.created_before)
+    return query
+
+
+@dataclass
+class TicketList:
+    tickets: list[Ticket]
+    next_cursor: Optional[str]
+
+
+@dataclass
+class TicketPage:
+    ticket: Ticket
+    conversations: list[Conversation]
+    escalations: list[Escalation]
+    next_cursor: Optional[str]
+
+
+class TicketRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_with_conversations(
+        self,
+        ticket_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        archive: Optional[TranscriptArchive] = None,
+    ) -> Optional[TicketPage]:
+        after = decode_cursor(cursor) if cursor else None
+        page = (
+            select(Conversation)
+            .where(Conversation.ticket_id == ticket_id)
+            .order_by(Conversation.created_at, Conversation.id)
+            .limit(limit + 1)
+        )
+        if after:
+            after_created, after_id = after
+            page = page.where(or_(
+                Conversation.created_at > after_created,
+                and_(Conversation.created_at == after_created, Conversation.id > after_id),
+            ))
+        turn = aliased(Conversation, page.subquery())
+
+        # One statement: the ticket row joined to its escalations and to a
+        # single page of turns, fanned back out into the relationships.
+        result = await self.session.execute(
+            select(Ticket)
+            .where(Ticket.id == ticket_id)
+            .outerjoin(Ticket.escalations)
+            .outerjoin(Ticket.archive)
+            .outerjoin(turn, Ticket.conversations.of_type(turn))
+            .options(
+                contains_eager(Ticket.escalations),
+                contains_eager(Ticket.archive),
+                contains_eager(Ticket.conversations.of_type(turn)),
+            )
+            .order_by(turn.created_at, turn.id, Escalation.created_at)
+            .execution_options(populate_existing=True)
+        )
+        ticket = result.unique().scalar_one_or_none()
+        if ticket is None:
+            return None
+
+        conversations = list(ticket.conversations)
+        if ticket.archive is not None and archive is not None:
+            # Archived turns all predate anything still in the hot table.
+            archived = [
+                c for c in await archive.load(ticket.archive)
+                if after is None or (c.created_at, c.id) > after
+            ]
+            conversations = archived[:limit + 1] + conversations
+        next_cursor = None
+        if len(conversations) > limit:
+            conversations = conversations[:limit]
+            last = conversations[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+
+        return TicketPage(
+            ticket=ticket,
+            conversations=conversations,
+            escalations=sorted(ticket.escalations, key=lambda e: e.created_at),
+            next_cursor=next_cursor,
+        )
+
+    async def conversations(self, ticket_id: str, archive: Optional[TranscriptArchive] = None) -> list[Conversation]:
+        result = await self.session.execute(
+            select(Conversation)
+            .where(Conversation.ticket_id == ticket_id)
+            .order_by(Conversation.created_at, Conversation.id)
+        )
+        return await load_transcript(self.session, archive, ticket_id) + list(result.scalars())
+
+    async def list_tickets(
+        self,
+        filters: Optional[TicketFilter] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> TicketList:
+        query = select(Ticket).order_by(Ticket.created_at.desc(), Ticket.id.desc()).limit(limit + 1)
+        query = filter_tickets(query, filters or TicketFilter())
+        if cursor:
+            query = query.where(tuple_(Ticket.created_at, Ticket.id) < tuple_(*decode_cursor(cursor)))
+
+        tickets = list((await self.session.execute(query)).scalars())
+        if len(tickets) <= limit:
+            return TicketList(tickets=tickets, next_cursor=None)
+        tickets = tickets[:limit]
+        return TicketList(tickets=tickets, next_cursor=encode_cursor(tickets[-1].created_at, tickets[-1].id))
+
+    async def escalation_queue(
+        self,
+        routed_to: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> TicketList:
+        query = (
+            select(Ticket)
+            .where(Ticket.status == TicketStatus.ESCALATED.value)
+            .order_by(Ticket.priority.desc(), Ticket.created_at, Ticket.id)
+            .limit(limit + 1)
+        )
+        if routed_to is not None:
+            query = query.where(Ticket.routed_to == routed_to)
+        if cursor:
+            priority, created_at, row_id = decode_queue_cursor(cursor)
+            query = query.where(or_(
+                Ticket.priority < priority,
+                and_(
+                    Ticket.priority == priority,
+                    tuple_(Ticket.created_at, Ticket.id) > tuple_(created_at, row_id),
+                ),
+            ))
+
+        tickets = list((await self.session.execute(query)).scalars())
+        if len(tickets) <= limit:
+            return TicketList(tickets=tickets, next_cursor=None)
+        tickets = tickets[:limit]
+        last = tickets[-1]
+        return TicketList(tickets=tickets, next_cursor=encode_queue_cursor(last.priority, last.created_at, last.id))
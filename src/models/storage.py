@@ -0,0 +1,180 @@
+import asyncio
+from dataclasses import dataclass
+import logging
+import os
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+
+logger = logging.getLogger(__name__)
+
+WriteFn = Callable[[AsyncSession], Awaitable[None]]
+
+# A write acknowledged from one worker's journal is invisible to the flushes
+# of every other worker, so reads routed elsewhere would miss it.
+WRITE_BEHIND_WORKERS_ERROR = "DB_WRITE_BEHIND=1 requires a single worker; unset it or run with --workers 1"
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass
+class StorageConfig:
+    journal_mode: str = "wal"
+    synchronous: str = "normal"
+    mmap_size: int = 256 * 1024 * 1024
+    busy_timeout_ms: int = 5000
+    cache_size_kib: int = 16 * 1024
+    group_commit: bool = False
+    group_commit_max_batch: int = 64
+    group_commit_max_delay_ms: float = 2.0
+    write_behind: bool = False
+    journal_dir: str = "./journal"
+    journal_segment_bytes: int = 16 * 1024 * 1024
+    journal_fsync: bool = True
+    journal_flush_timeout_ms: float = 5000.0
+
+    @classmethod
+    def from_env(cls) -> "StorageConfig":
+        defaults = cls()
+        return cls(
+            journal_mode=os.getenv("SQLITE_JOURNAL_MODE", defaults.journal_mode),
+            synchronous=os.getenv("SQLITE_SYNCHRONOUS", defaults.synchronous),
+            mmap_size=int(os.getenv("SQLITE_MMAP_SIZE", defaults.mmap_size)),
+            busy_timeout_ms=int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", defaults.busy_timeout_ms)),
+            cache_size_kib=int(os.getenv("SQLITE_CACHE_SIZE_KIB", defaults.cache_size_kib)),
+            group_commit=_env_flag("DB_GROUP_COMMIT", defaults.group_commit),
+            group_commit_max_batch=int(os.getenv("DB_GROUP_COMMIT_MAX_BATCH", defaults.group_commit_max_batch)),
+            group_commit_max_delay_ms=float(
+                os.getenv("DB_GROUP_COMMIT_MAX_DELAY_MS", defaults.group_commit_max_delay_ms)
+            ),
+            write_behind=_env_flag("DB_WRITE_BEHIND", defaults.write_behind),
+            journal_dir=os.getenv("DB_JOURNAL_DIR", defaults.journal_dir),
+            journal_segment_bytes=int(os.getenv("DB_JOURNAL_SEGMENT_BYTES", defaults.journal_segment_bytes)),
+            journal_fsync=_env_flag("DB_JOURNAL_FSYNC", defaults.journal_fsync),
+            journal_flush_timeout_ms=float(
+                os.getenv("DB_JOURNAL_FLUSH_TIMEOUT_MS", defaults.journal_flush_timeout_ms)
+            ),
+        )
+
+    def pragmas(self) -> list[str]:
+        return [
+            f"PRAGMA journal_mode={self.journal_mode}",
+            f"PRAGMA synchronous={self.synchronous}",
+            f"PRAGMA mmap_size={self.mmap_size}",
+            f"PRAGMA busy_timeout={self.busy_timeout_ms}",
+            f"PRAGMA cache_size=-{self.cache_size_kib}",
+        ]
+
+
+def configure_engine(engine: AsyncEngine, config: StorageConfig) -> None:
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in config.pragmas():
+            cursor.execute(pragma)
+        cursor.close()
+
+
+class GroupCommitWriter:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        max_batch: int = 64,
+        max_delay_ms: float = 2.0,
+    ):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self.commits = 0
+        self._queue: asyncio.Queue[tuple[WriteFn, asyncio.Future]] = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def submit(self, write: WriteFn) -> None:
+        if self._task is None:
+            raise RuntimeError("GroupCommitWriter is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((write, future))
+        await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._commit_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _commit_batch(self, batch: list[tuple[WriteFn, asyncio.Future]]) -> None:
+        try:
+            await self._commit([write for write, _ in batch])
+        except Exception as exc:
+            if len(batch) == 1:
+                _settle(batch[0][1], exc)
+                return
+            logger.warning("Group commit of %d writes failed, retrying individually", len(batch))
+        else:
+            for _, future in batch:
+                _settle(future)
+            return
+
+        # Write functions build fresh ORM objects on every call, so each one
+        # can be replayed on its own session to isolate the failing write.
+        for write, future in batch:
+            try:
+                await self._commit([write])
+            except Exception as exc:
+                _settle(future, exc)
+            else:
+                _settle(future)
+
+    async def _commit(self, writes: list[WriteFn]) -> None:
+        async with self.session_factory() as session:
+            for write in writes:
+                await write(session)
+            await session.commit()
+        self.commits += 1
+
+
+def _settle(future: asyncio.Future, exc: Optional[BaseException] = None) -> None:
+    if future.done():
+        return
+    if exc is None:
+        future.set_result(None)
+    else:
+        future.set_exception(exc)
@@ -26,6 +26,19 @@ class Urgency(str, Enum):
     CRITICAL = "critical"
 
 
+URGENCY_PRIORITY = {
+    Urgency.LOW: 0,
+    Urgency.MEDIUM: 1,
+    Urgency.HIGH: 2,
+    Urgency.CRITICAL: 3,
+}
+
+
+def ticket_priority(urgency: Urgency | str, sentiment: float) -> int:
+    # Urgency dominates; within a level, angrier customers sort first.
+    return URGENCY_PRIORITY[Urgency(urgency)] * 10 + int(max(0.0, -sentiment) * 9 + 0.5)
+
+
 class TicketCreate(BaseModel):
     source: TicketSource = TicketSource.API
     customer_id: str
@@ -47,6 +60,7 @@ class ParsedTicket(BaseModel):
     status: TicketStatus = TicketStatus.OPEN
     assigned_to: Optional[str] = None
     metadata: dict = Field(default_factory=dict)
+    customer_context: Optional[dict] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     resolved_at: Optional[datetime] = None
 
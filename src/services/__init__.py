@@ -1,4 +1,4 @@
 from .intent_classifier import IntentClassifier, Intent
-from .confidence_scorer import ConfidenceScorer
+from .confidence_scorer import ConfidenceScorer, ConfidenceBatch
 
-__all__ = ["IntentClassifier", "Intent", "ConfidenceScorer"]
+__all__ = ["IntentClassifier", "Intent", "ConfidenceScorer", "ConfidenceBatch"]
@@ -0,0 +1,144 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.database import AnalyticsRollup
+
+
+COUNTER_COLUMNS = (
+    "tickets_created",
+    "messages",
+    "escalations",
+    "resolutions",
+    "confidence_sum",
+    "confidence_count",
+    "resolution_seconds_sum",
+)
+
+
+@dataclass
+class TrendBucket:
+    start: datetime
+    tickets_created: int = 0
+    messages: int = 0
+    escalations: int = 0
+    resolutions: int = 0
+    confidence_sum: float = 0.0
+    confidence_count: int = 0
+    resolution_seconds_sum: float = 0.0
+
+    @property
+    def escalation_rate(self) -> float:
+        return self.escalations / self.tickets_created if self.tickets_created else 0.0
+
+    @property
+    def avg_confidence(self) -> Optional[float]:
+        return self.confidence_sum / self.confidence_count if self.confidence_count else None
+
+    @property
+    def avg_resolution_seconds(self) -> Optional[float]:
+        return self.resolution_seconds_sum / self.resolutions if self.resolutions else None
+
+
+def hour_bucket(timestamp: datetime) -> datetime:
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+async def record_event(
+    session: AsyncSession,
+    *,
+    at: datetime,
+    domain: str,
+    intent: Optional[str],
+    status: str,
+    tickets_created: int = 0,
+    messages: int = 0,
+    escalations: int = 0,
+    resolutions: int = 0,
+    confidence: Optional[float] = None,
+    resolution_seconds: float = 0.0,
+) -> None:
+    increments = {
+        "tickets_created": tickets_created,
+        "messages": messages,
+        "escalations": escalations,
+        "resolutions": resolutions,
+        "confidence_sum": confidence or 0.0,
+        "confidence_count": 1 if confidence is not None else 0,
+        "resolution_seconds_sum": resolution_seconds,
+    }
+    stmt = insert(AnalyticsRollup).values(
+        hour=hour_bucket(at),
+        domain=domain,
+        intent=intent or "unknown",
+        status=status,
+        **increments,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["hour", "domain", "intent", "status"],
+        set_={name: getattr(AnalyticsRollup, name) + stmt.excluded[name] for name in increments},
+    )
+    await session.execute(stmt)
+
+
+async def record_events(session: AsyncSession, events: list[dict]) -> None:
+    # Bulk form of record_event for imports: events are folded per rollup row
+    # in memory and upserted with a single executemany.
+    rows: dict[tuple, dict] = {}
+    for event in events:
+        key = (hour_bucket(event["at"]), event["domain"], event.get("intent") or "unknown", event["status"])
+        row = rows.get(key)
+        if row is None:
+            row = rows[key] = dict(zip(("hour", "domain", "intent", "status"), key), **dict.fromkeys(COUNTER_COLUMNS, 0))
+        confidence = event.get("confidence")
+        row["tickets_created"] += event.get("tickets_created", 0)
+        row["messages"] += event.get("messages", 0)
+        row["escalations"] += event.get("escalations", 0)
+        row["resolutions"] += event.get("resolutions", 0)
+        row["confidence_sum"] += confidence or 0.0
+        row["confidence_count"] += 1 if confidence is not None else 0
+        row["resolution_seconds_sum"] += event.get("resolution_seconds", 0.0)
+    if not rows:
+        return
+
+    stmt = insert(AnalyticsRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["hour", "domain", "intent", "status"],
+        set_={name: getattr(AnalyticsRollup, name) + stmt.excluded[name] for name in COUNTER_COLUMNS},
+    )
+    await session.execute(stmt, list(rows.values()))
+
+
+async def trends(
+    session: AsyncSession,
+    start: datetime,
+    end: datetime,
+    bucket_hours: int = 1,
+    domain: Optional[str] = None,
+    intent: Optional[str] = None,
+) -> list[TrendBucket]:
+    query = (
+        select(AnalyticsRollup.hour, *(func.sum(getattr(AnalyticsRollup, c)) for c in COUNTER_COLUMNS))
+        .where(AnalyticsRollup.hour >= hour_bucket(start), AnalyticsRollup.hour < end)
+        .group_by(AnalyticsRollup.hour)
+        .order_by(AnalyticsRollup.hour)
+    )
+    if domain:
+        query = query.where(AnalyticsRollup.domain == domain)
+    if intent:
+        query = query.where(AnalyticsRollup.intent == intent)
+
+    origin = hour_bucket(start)
+    width = timedelta(hours=bucket_hours)
+    buckets: dict[datetime, TrendBucket] = {}
+    for hour, *sums in (await session.execute(query)).all():
+        bucket_start = origin + ((hour - origin) // width) * width
+        bucket = buckets.setdefault(bucket_start, TrendBucket(start=bucket_start))
+        for name, value in zip(COUNTER_COLUMNS, sums):
+            setattr(bucket, name, getattr(bucket, name) + (value or 0))
+
+    return [buckets[k] for k in sorted(buckets)]
@@ -0,0 +1,346 @@
+import asyncio
+import csv
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+import json
+import os
+from pathlib import Path
+from typing import Awaitable, Callable, Iterable, Iterator, Optional
+import uuid
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.agents.specialists.router import DOMAIN_MAPPING
+from src.models.database import Conversation, CustomerProfile, Escalation, Ticket
+from src.models.migrations import backfill_customer_profiles
+from src.models.ticket import ParsedTicket, TicketSource, TicketStatus, ticket_priority
+from src.services import analytics
+from src.services.intent_classifier import IntentCategory
+from src.services.sentiment import SentimentAnalyzer, default_analyzer
+
+
+# Namespace for ids derived from row contents, so rows without an id get the
+# same one on every run and re-imports still skip them.
+IMPORT_NAMESPACE = uuid.UUID("6f1c3a52-8d4e-4b7a-9c0e-2f5d7e9a1b34")
+
+
+def _parse_datetime(value) -> Optional[datetime]:
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00")).replace(tzinfo=None)
+
+
+def _row_id(row: dict) -> str:
+    key = "\x1f".join(str(row.get(k) or "") for k in ("customer_id", "created_at", "subject", "body"))
+    return str(uuid.uuid5(IMPORT_NAMESPACE, key))
+
+
+def _parse_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in ("1", "true", "yes", "y")
+
+
+@dataclass
+class HistoricalTicket:
+    id: str
+    customer_id: str
+    subject: str
+    body: str
+    created_at: datetime
+    source: str = TicketSource.EMAIL.value
+    status: str = TicketStatus.RESOLVED.value
+    resolved_at: Optional[datetime] = None
+    intent: Optional[str] = None
+    escalated: bool = False
+    escalation_reason: Optional[str] = None
+    resolution: Optional[str] = None
+    conversations: list[dict] = field(default_factory=list)
+
+    @classmethod
+    def from_row(cls, row: dict) -> "HistoricalTicket":
+        conversations = row.get("conversations") or []
+        if isinstance(conversations, str):
+            conversations = json.loads(conversations)
+        status = row.get("status") or TicketStatus.RESOLVED.value
+        return cls(
+            id=str(row.get("id") or _row_id(row)),
+            customer_id=str(row["customer_id"]),
+            subject=row.get("subject") or "",
+            body=row.get("body") or "",
+            created_at=_parse_datetime(row["created_at"]),
+            source=row.get("source") or TicketSource.EMAIL.value,
+            status=TicketStatus(status).value,
+            resolved_at=_parse_datetime(row.get("resolved_at")),
+            intent=row.get("intent") or None,
+            escalated=_parse_bool(row.get("escalated")) or status == TicketStatus.ESCALATED.value,
+            escalation_reason=row.get("escalation_reason") or None,
+            resolution=row.get("resolution") or None,
+            conversations=conversations,
+        )
+
+
+def read_tickets(path: Path) -> Iterator[HistoricalTicket]:
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.suffix.lower() == ".csv":
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for row in rows:
+            yield HistoricalTicket.from_row(row)
+
+
+@dataclass
+class BackfillCheckpoint:
+    path: Path
+    rows_done: int = 0
+    imported: int = 0
+
+    @classmethod
+    def load(cls, path: Path) -> "BackfillCheckpoint":
+        if not path.exists():
+            return cls(path)
+        data = json.loads(path.read_text())
+        return cls(path, rows_done=data["rows_done"], imported=data["imported"])
+
+    def save(self) -> None:
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps({"rows_done": self.rows_done, "imported": self.imported}))
+        os.replace(tmp, self.path)
+
+
+@dataclass
+class Classification:
+    intent: str
+    confidence: float
+    domain: str
+    reply: Optional[str] = None
+    reply_confidence: Optional[float] = None
+
+
+class TicketBackfill:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        router=None,
+        generate: bool = True,
+        concurrency: int = 8,
+        analyzer: SentimentAnalyzer = default_analyzer,
+        on_chunk: Optional[Callable[[list[tuple[HistoricalTicket, Classification]]], Awaitable[None]]] = None,
+    ):
+        self.session_factory = session_factory
+        self.router = router
+        self.generate = generate
+        self.analyzer = analyzer
+        self.on_chunk = on_chunk
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(
+        self,
+        tickets: Iterable[HistoricalTicket],
+        chunk_size: int = 1000,
+        checkpoint: Optional[BackfillCheckpoint] = None,
+    ) -> int:
+        imported = 0
+        chunk: list[HistoricalTicket] = []
+        for ticket in islice(tickets, checkpoint.rows_done if checkpoint else 0, None):
+            chunk.append(ticket)
+            if len(chunk) >= chunk_size:
+                imported += await self._import(chunk, checkpoint)
+                chunk = []
+        if chunk:
+            imported += await self._import(chunk, checkpoint)
+        return imported
+
+    async def _import(self, chunk: list[HistoricalTicket], checkpoint: Optional[BackfillCheckpoint]) -> int:
+        count = await self.import_chunk(chunk)
+        if checkpoint is not None:
+            checkpoint.rows_done += len(chunk)
+            checkpoint.imported += count
+            checkpoint.save()
+        return count
+
+    async def import_chunk(self, chunk: list[HistoricalTicket]) -> int:
+        # Rows already in the database (a chunk committed just before a
+        # crash, or a re-run) are dropped first, so the import is idempotent
+        # and never pays for classifying them again.
+        async with self.session_factory() as session:
+            existing = set((await session.execute(
+                select(Ticket.id).where(Ticket.id.in_([t.id for t in chunk]))
+            )).scalars())
+        fresh = []
+        for ticket in chunk:
+            if ticket.id not in existing:
+                existing.add(ticket.id)
+                fresh.append(ticket)
+        chunk = fresh
+        if not chunk:
+            return 0
+
+        sentiments = self.analyzer.analyze_batch([(t.subject, t.body) for t in chunk])
+        classifications = await asyncio.gather(*(self.classify(t) for t in chunk))
+
+        tickets, conversations, escalations, events = [], [], [], []
+        for ticket, analysis, classification in zip(chunk, sentiments, classifications):
+            tickets.append({
+                "id": ticket.id,
+                "source": ticket.source,
+                "customer_id": ticket.customer_id,
+                "subject": ticket.subject,
+                "body": ticket.body,
+                "sentiment": analysis.sentiment,
+                "urgency": analysis.urgency.value,
+                "intent": classification.intent,
+                "intent_confidence": classification.confidence,
+                "status": ticket.status,
+                "assigned_to": None,
+                "routed_to": classification.domain,
+                "priority": ticket_priority(analysis.urgency, analysis.sentiment),
+                "metadata": {"routed_to": classification.domain, "imported": True},
+                "created_at": ticket.created_at,
+                "resolved_at": ticket.resolved_at,
+            })
+            conversations.extend(self._turns(ticket, classification))
+            if ticket.escalated:
+                escalations.append(self._escalation(ticket, classification))
+            events.extend(self._events(ticket, classification))
+
+        async with self.session_factory() as session:
+            await session.execute(insert(Ticket.__table__), tickets)
+            await session.execute(insert(Conversation.__table__), conversations)
+            if escalations:
+                await session.execute(insert(Escalation.__table__), escalations)
+            await analytics.record_events(session, events)
+            await rebuild_customer_profiles(session, {t.customer_id for t in chunk})
+            await session.commit()
+
+        if self.on_chunk is not None:
+            await self.on_chunk(list(zip(chunk, classifications)))
+        return len(tickets)
+
+    async def classify(self, ticket: HistoricalTicket) -> Classification:
+        if self.router is None or (ticket.intent and not self.generate):
+            intent = ticket.intent or IntentCategory.UNKNOWN.value
+            return Classification(intent=intent, confidence=1.0 if ticket.intent else 0.0, domain=_domain(intent))
+
+        async with self._semaphore:
+            if not self.generate:
+                result = await self.router.classifier.classify(ticket.subject, ticket.body)
+                return Classification(result.category.value, result.confidence, _domain(result.category.value))
+
+            parsed = ParsedTicket(
+                id=ticket.id,
+                source=ticket.source if ticket.source in _SOURCES else TicketSource.EMAIL,
+                customer_id=ticket.customer_id,
+                subject=ticket.subject,
+                body=ticket.body,
+                created_at=ticket.created_at,
+            )
+            response, domain = await self.router.route(parsed)
+            return Classification(
+                intent=parsed.intent or response.intent,
+                confidence=parsed.intent_confidence,
+                domain=domain,
+                reply=response.message,
+                reply_confidence=response.confidence,
+            )
+
+    def _turns(self, ticket: HistoricalTicket, classification: Classification) -> list[dict]:
+        turns = ticket.conversations or [{
+            "role": "customer",
+            "content": f"Subject: {ticket.subject}\n\n{ticket.body}",
+            "created_at": ticket.created_at,
+        }]
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "ticket_id": ticket.id,
+                "role": turn["role"],
+                "content": turn["content"],
+                "confidence": turn.get("confidence"),
+                "created_at": _parse_datetime(turn.get("created_at")) or ticket.created_at,
+            }
+            for turn in turns
+        ]
+        # A generated reply only stands in for a missing agent turn; it never
+        # rewrites a transcript that already has one.
+        if classification.reply and not ticket.conversations:
+            rows.append({
+                "id": str(uuid.uuid4()),
+                "ticket_id": ticket.id,
+                "role": "agent",
+                "content": classification.reply,
+                "confidence": classification.reply_confidence,
+                "created_at": ticket.created_at,
+            })
+        if ticket.resolution and not ticket.conversations:
+            rows.append({
+                "id": str(uuid.uuid4()),
+                "ticket_id": ticket.id,
+                "role": "human",
+                "content": f"[RESOLVED] {ticket.resolution}",
+                "confidence": None,
+                "created_at": ticket.resolved_at or ticket.created_at,
+            })
+        return rows
+
+    def _escalation(self, ticket: HistoricalTicket, classification: Classification) -> dict:
+        # Tickets still escalated come back unassigned, so they join the
+        # human queue on the next start; closed ones carry their resolution.
+        return {
+            "id": str(uuid.uuid5(IMPORT_NAMESPACE, f"escalation:{ticket.id}")),
+            "ticket_id": ticket.id,
+            "reason": ticket.escalation_reason or "Imported escalation",
+            "context_package": {
+                "intent": classification.intent,
+                "confidence": classification.confidence,
+                "routed_to": classification.domain,
+                "imported": True,
+            },
+            "human_assignee": None,
+            "resolution": ticket.resolution if ticket.status == TicketStatus.RESOLVED.value else None,
+            "feedback_captured": False,
+            "created_at": ticket.created_at,
+        }
+
+    def _events(self, ticket: HistoricalTicket, classification: Classification) -> list[dict]:
+        opened_as = TicketStatus.ESCALATED.value if ticket.escalated else TicketStatus.IN_PROGRESS.value
+        events = [{
+            "at": ticket.created_at,
+            "domain": classification.domain,
+            "intent": classification.intent,
+            "status": opened_as,
+            "tickets_created": 1,
+            "escalations": int(ticket.escalated),
+            "confidence": classification.reply_confidence,
+        }]
+        if ticket.status == TicketStatus.RESOLVED.value and ticket.resolved_at:
+            events.append({
+                "at": ticket.resolved_at,
+                "domain": classification.domain,
+                "intent": classification.intent,
+                "status": TicketStatus.RESOLVED.value,
+                "resolutions": 1,
+                "resolution_seconds": (ticket.resolved_at - ticket.created_at).total_seconds(),
+            })
+        return events
+
+
+_SOURCES = {source.value for source in TicketSource}
+
+
+def _domain(intent: str) -> str:
+    try:
+        return DOMAIN_MAPPING.get(IntentCategory(intent), "general")
+    except ValueError:
+        return "general"
+
+
+async def rebuild_customer_profiles(session: AsyncSession, customer_ids: Iterable[str]) -> None:
+    customer_ids = list(customer_ids)
+    await session.execute(delete(CustomerProfile).where(CustomerProfile.customer_id.in_(customer_ids)))
+    await session.run_sync(lambda sync_session: backfill_customer_profiles(sync_session.connection(), customer_ids))
@@ -0,0 +1,136 @@
+from dataclasses import dataclass
+from functools import lru_cache
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+DEFAULT_RESOLUTION = 101
+
+
+@dataclass
+class CalibrationTable:
+    # Calibrated success probability at evenly spaced raw scores on [0, 1].
+    values: np.ndarray
+    method: str = "isotonic"
+    samples: int = 0
+
+    def apply(self, score: float) -> float:
+        last = len(self.values) - 1
+        position = min(max(score, 0.0), 1.0) * last
+        index = min(int(position), last - 1)
+        lower = self.values[index]
+        return float(lower + (self.values[index + 1] - lower) * (position - index))
+
+    def apply_batch(self, scores: np.ndarray) -> np.ndarray:
+        last = len(self.values) - 1
+        position = np.clip(np.asarray(scores, dtype=np.float64), 0.0, 1.0) * last
+        index = np.minimum(position.astype(np.int64), last - 1)
+        lower = self.values[index]
+        return lower + (self.values[index + 1] - lower) * (position - index)
+
+    def save(self, path: Path) -> None:
+        Path(path).write_text(json.dumps({
+            "method": self.method,
+            "samples": self.samples,
+            "values": [round(float(v), 6) for v in self.values],
+        }))
+
+    @classmethod
+    def load(cls, path: Path) -> "CalibrationTable":
+        data = json.loads(Path(path).read_text())
+        return cls(
+            values=np.asarray(data["values"], dtype=np.float64),
+            method=data.get("method", "isotonic"),
+            samples=data.get("samples", 0),
+        )
+
+
+def fit_isotonic(
+    scores: np.ndarray,
+    outcomes: np.ndarray,
+    resolution: int = DEFAULT_RESOLUTION,
+) -> CalibrationTable:
+    scores, outcomes = _validate(scores, outcomes)
+    grid = np.linspace(0.0, 1.0, resolution)
+
+    bins = np.rint(scores * (resolution - 1)).astype(np.int64)
+    counts = np.bincount(bins, minlength=resolution).astype(np.float64)
+    successes = np.bincount(bins, weights=outcomes, minlength=resolution)
+    occupied = np.flatnonzero(counts)
+
+    fitted = _pool_adjacent_violators(successes[occupied] / counts[occupied], counts[occupied])
+    values = np.interp(grid, grid[occupied], fitted)
+    return CalibrationTable(values=values, method="isotonic", samples=len(scores))
+
+
+def fit_platt(
+    scores: np.ndarray,
+    outcomes: np.ndarray,
+    resolution: int = DEFAULT_RESOLUTION,
+    iterations: int = 50,
+) -> CalibrationTable:
+    scores, outcomes = _validate(scores, outcomes)
+
+    positives = outcomes.sum()
+    negatives = len(outcomes) - positives
+    targets = np.where(outcomes > 0, (positives + 1) / (positives + 2), 1 / (negatives + 2))
+
+    features = np.column_stack([scores, np.ones_like(scores)])
+    params = np.zeros(2)
+    for _ in range(iterations):
+        probs = 1 / (1 + np.exp(-features @ params))
+        gradient = features.T @ (probs - targets)
+        hessian = (features * (probs * (1 - probs))[:, None]).T @ features + 1e-9 * np.eye(2)
+        step = np.linalg.solve(hessian, gradient)
+        params -= step
+        if np.abs(step).max() < 1e-10:
+            break
+
+    # A negative slope would invert the ordering of raw scores; fall back to flat.
+    if params[0] < 0:
+        params = np.array([0.0, np.log(targets.mean() / (1 - targets.mean()))])
+
+    grid = np.linspace(0.0, 1.0, resolution)
+    values = 1 / (1 + np.exp(-(params[0] * grid + params[1])))
+    return CalibrationTable(values=values, method="platt", samples=len(scores))
+
+
+def _validate(scores: np.ndarray, outcomes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    scores = np.clip(np.asarray(scores, dtype=np.float64), 0.0, 1.0)
+    outcomes = np.asarray(outcomes, dtype=np.float64)
+    if scores.shape != outcomes.shape or scores.ndim != 1:
+        raise ValueError("scores and outcomes must be 1-D arrays of equal length")
+    if len(scores) == 0:
+        raise ValueError("Cannot fit calibration without samples")
+    return scores, outcomes
+
+
+def _pool_adjacent_violators(means: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    block_means: list[float] = []
+    block_weights: list[float] = []
+    block_sizes: list[int] = []
+
+    for mean, weight in zip(means.tolist(), weights.tolist()):
+        block_means.append(mean)
+        block_weights.append(weight)
+        block_sizes.append(1)
+        while len(block_means) > 1 and block_means[-2] > block_means[-1]:
+            weight = block_weights[-2] + block_weights[-1]
+            mean = (block_means[-2] * block_weights[-2] + block_means[-1] * block_weights[-1]) / weight
+            size = block_sizes[-2] + block_sizes[-1]
+            del block_means[-1], block_weights[-1], block_sizes[-1]
+            block_means[-1], block_weights[-1], block_sizes[-1] = mean, weight, size
+
+    return np.repeat(block_means, block_sizes)
+
+
+@lru_cache(maxsize=1)
+def load_default_calibration() -> Optional[CalibrationTable]:
+    path = os.getenv("CONFIDENCE_CALIBRATION_PATH")
+    if not path or not Path(path).exists():
+        return None
+    return CalibrationTable.load(Path(path))
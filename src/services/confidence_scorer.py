@@ -1,4 +1,9 @@
 from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from .calibration import CalibrationTable
 
 
 @dataclass
@@ -8,6 +13,26 @@ class ConfidenceBreakdown:
     sentiment_risk: float
     complexity_factor: float
     overall: float
+    calibrated: Optional[float] = None
+
+    @property
+    def decision_score(self) -> float:
+        return self.overall if self.calibrated is None else self.calibrated
+
+
+@dataclass
+class ConfidenceBatch:
+    intent_clarity: np.ndarray
+    response_certainty: np.ndarray
+    sentiment_risk: np.ndarray
+    complexity_factor: np.ndarray
+    overall: np.ndarray
+    calibrated: Optional[np.ndarray]
+    escalate: np.ndarray
+    caveat: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.overall)
 
 
 class ConfidenceScorer:
@@ -24,6 +49,9 @@ class ConfidenceScorer:
         "escalate": 0.70,
     }
 
+    def __init__(self, calibration: Optional[CalibrationTable] = None):
+        self.calibration = calibration
+
     def calculate(
         self,
         intent_confidence: float,
@@ -48,6 +76,54 @@ class ConfidenceScorer:
             sentiment_risk=sentiment_risk,
             complexity_factor=complexity_factor,
             overall=overall,
+            calibrated=self.calibration.apply(overall) if self.calibration else None,
+        )
+
+    def calculate_batch(
+        self,
+        intent_confidence: np.ndarray,
+        response_certainty: np.ndarray,
+        sentiment: np.ndarray,
+        question_count: np.ndarray | int = 1,
+    ) -> ConfidenceBatch:
+        intent_clarity, response_certainty, sentiment, question_count = np.broadcast_arrays(
+            np.asarray(intent_confidence, dtype=np.float64),
+            np.asarray(response_certainty, dtype=np.float64),
+            np.asarray(sentiment, dtype=np.float64),
+            np.asarray(question_count),
+        )
+
+        # fmax mirrors the scalar max(0.3, x), which also ignores NaN.
+        sentiment_risk = np.where(sentiment >= 0, 1.0, np.fmax(0.3, 1.0 + sentiment))
+        complexity_factor = np.select(
+            [question_count <= 1, question_count == 2, question_count == 3],
+            [1.0, 0.85, 0.7],
+            default=0.5,
+        )
+
+        # Same operation order as calculate() so results match bit for bit.
+        overall = (
+            self.WEIGHTS["intent_clarity"] * intent_clarity
+            + self.WEIGHTS["response_certainty"] * response_certainty
+            + self.WEIGHTS["sentiment_risk"] * sentiment_risk
+            + self.WEIGHTS["complexity_factor"] * complexity_factor
+        )
+
+        calibrated = self.calibration.apply_batch(overall) if self.calibration else None
+        decision = overall if calibrated is None else calibrated
+
+        return ConfidenceBatch(
+            intent_clarity=intent_clarity.copy(),
+            response_certainty=response_certainty.copy(),
+            sentiment_risk=sentiment_risk,
+            complexity_factor=complexity_factor,
+            overall=overall,
+            calibrated=calibrated,
+            escalate=decision < self.THRESHOLDS["escalate"],
+            caveat=(
+                (decision >= self.THRESHOLDS["respond_with_caveat"])
+                & (decision < self.THRESHOLDS["auto_respond"])
+            ),
         )
 
     def _calculate_sentiment_risk(self, sentiment: float) -> float:
@@ -66,10 +142,10 @@ class ConfidenceScorer:
             return 0.5
 
     def should_escalate(self, breakdown: ConfidenceBreakdown) -> bool:
-        return breakdown.overall < self.THRESHOLDS["escalate"]
+        return breakdown.decision_score < self.THRESHOLDS["escalate"]
 
     def should_add_caveat(self, breakdown: ConfidenceBreakdown) -> bool:
         return (
-            breakdown.overall >= self.THRESHOLDS["respond_with_caveat"]
-            and breakdown.overall < self.THRESHOLDS["auto_respond"]
+            breakdown.decision_score >= self.THRESHOLDS["respond_with_caveat"]
+            and breakdown.decision_score < self.THRESHOLDS["auto_respond"]
         )
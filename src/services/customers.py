@@ -0,0 +1,164 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from typing import Awaitable, Callable, Iterator, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.database import CustomerProfile
+from src.services.metrics import CACHE_HITS, CACHE_MISSES
+
+
+RECENT_INTENTS = 5
+
+
+@dataclass
+class CustomerContext:
+    customer_id: str
+    ticket_count: int = 0
+    open_tickets: int = 0
+    resolved_tickets: int = 0
+    escalation_count: int = 0
+    recent_intents: list[str] = field(default_factory=list)
+    last_sentiment: Optional[float] = None
+    last_contact_at: Optional[datetime] = None
+
+    @classmethod
+    def from_row(cls, row: CustomerProfile) -> "CustomerContext":
+        return cls(**{f.name: getattr(row, f.name) for f in fields(cls)})
+
+    @property
+    def is_repeat(self) -> bool:
+        return self.ticket_count > 1
+
+    def to_context(self) -> dict:
+        return {
+            "ticket_count": self.ticket_count,
+            "open_tickets": self.open_tickets,
+            "resolved_tickets": self.resolved_tickets,
+            "escalation_count": self.escalation_count,
+            "recent_intents": list(self.recent_intents),
+            "last_sentiment": self.last_sentiment,
+            "last_contact_at": self.last_contact_at.isoformat() if self.last_contact_at else None,
+        }
+
+
+@dataclass
+class ProfileEvent:
+    customer_id: str
+    at: datetime
+    tickets_created: int = 0
+    tickets_resolved: int = 0
+    escalations: int = 0
+    intent: Optional[str] = None
+    sentiment: Optional[float] = None
+
+    def apply(self, profile) -> None:
+        # Works on both the ORM row and the cached CustomerContext, so the
+        # cache is advanced with exactly the change that was written.
+        profile.ticket_count = (profile.ticket_count or 0) + self.tickets_created
+        profile.open_tickets = max(0, (profile.open_tickets or 0) + self.tickets_created - self.tickets_resolved)
+        profile.resolved_tickets = (profile.resolved_tickets or 0) + self.tickets_resolved
+        profile.escalation_count = (profile.escalation_count or 0) + self.escalations
+        if self.tickets_created and self.intent:
+            profile.recent_intents = [self.intent, *(profile.recent_intents or [])][:RECENT_INTENTS]
+        if self.sentiment is not None:
+            profile.last_sentiment = self.sentiment
+        if self.tickets_created or self.sentiment is not None:
+            profile.last_contact_at = self.at
+
+
+class CustomerProfileCache:
+    def __init__(self, max_size: int = 10_000):
+        self.max_size = max_size
+        self._profiles: OrderedDict[str, CustomerContext] = OrderedDict()
+        self._writes: dict[str, int] = {}
+        self._loads: dict[str, int] = {}
+        self._epochs: dict[str, int] = {}
+        # Called with the customer id before a miss reads the database, so
+        # deferred writes for that customer can be flushed first.
+        self.before_load: Optional[Callable[[str], Awaitable[None]]] = None
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    async def get(self, session: AsyncSession, customer_id: str) -> CustomerContext:
+        profile = self._profiles.get(customer_id)
+        if profile is not None:
+            CACHE_HITS.inc(cache="customer_profile")
+            self._profiles.move_to_end(customer_id)
+            return profile
+
+        CACHE_MISSES.inc(cache="customer_profile")
+        epoch = self._epochs.get(customer_id, 0)
+        self._loads[customer_id] = self._loads.get(customer_id, 0) + 1
+        try:
+            if self.before_load is not None:
+                await self.before_load(customer_id)
+            row = await session.get(CustomerProfile, customer_id)
+        finally:
+            self._loads[customer_id] -= 1
+        profile = CustomerContext.from_row(row) if row else CustomerContext(customer_id=customer_id)
+
+        # A load that overlapped a write may or may not have seen it, so
+        # only cache rows read while the customer had no write in flight.
+        if not self._writes.get(customer_id) and self._epochs.get(customer_id, 0) == epoch:
+            self._store(profile)
+        self._forget(customer_id)
+        return profile
+
+    @contextmanager
+    def writing(self, event: ProfileEvent) -> Iterator[None]:
+        customer_id = event.customer_id
+        self._writes[customer_id] = self._writes.get(customer_id, 0) + 1
+        self._epochs[customer_id] = self._epochs.get(customer_id, 0) + 1
+        try:
+            yield
+        except BaseException:
+            self._profiles.pop(customer_id, None)
+            raise
+        else:
+            profile = self._profiles.get(customer_id)
+            if profile is not None:
+                event.apply(profile)
+        finally:
+            self._writes[customer_id] -= 1
+            self._epochs[customer_id] += 1
+            self._forget(customer_id)
+
+    def invalidate(self, customer_id: str) -> None:
+        self._profiles.pop(customer_id, None)
+
+    def clear(self) -> None:
+        self._profiles.clear()
+
+    def _store(self, profile: CustomerContext) -> None:
+        self._profiles[profile.customer_id] = profile
+        self._profiles.move_to_end(profile.customer_id)
+        while len(self._profiles) > self.max_size:
+            self._profiles.popitem(last=False)
+
+    def _forget(self, customer_id: str) -> None:
+        if not self._writes.get(customer_id) and not self._loads.get(customer_id):
+            self._writes.pop(customer_id, None)
+            self._loads.pop(customer_id, None)
+            self._epochs.pop(customer_id, None)
+
+
+async def record_profile_event(session: AsyncSession, event: ProfileEvent) -> None:
+    row = await session.get(CustomerProfile, event.customer_id)
+    if row is None:
+        row = CustomerProfile(
+            customer_id=event.customer_id,
+            ticket_count=0,
+            open_tickets=0,
+            resolved_tickets=0,
+            escalation_count=0,
+            recent_intents=[],
+        )
+        session.add(row)
+    event.apply(row)
+
+
+profile_cache = CustomerProfileCache()
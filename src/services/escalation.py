@@ -0,0 +1,207 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+
+from sortedcontainers import SortedList
+from sqlalchemy import and_, case, func, literal, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.database import Escalation, Ticket
+from src.models.ticket import TicketStatus
+
+
+DOMAIN_WEIGHTS = {
+    "billing": 5.0,
+    "account": 5.0,
+    "technical": 0.0,
+    "general": 0.0,
+}
+
+# Priority points gained per hour of waiting; at 10/hour a medium ticket
+# that has waited an hour ties with a fresh high-urgency one.
+AGING_PER_HOUR = 10.0
+
+
+@dataclass
+class QueueEntry:
+    escalation_id: str
+    ticket_id: str
+    domain: str
+    priority: int
+    created_at: datetime
+    key: tuple[float, str] = field(init=False, compare=False)
+
+    def __post_init__(self):
+        self.key = (0.0, self.escalation_id)
+
+    def wait_seconds(self, now: Optional[datetime] = None) -> float:
+        return ((now or datetime.utcnow()) - self.created_at).total_seconds()
+
+
+def _waiting() -> tuple:
+    return (
+        Ticket.status == TicketStatus.ESCALATED.value,
+        Escalation.human_assignee.is_(None),
+        Escalation.resolution.is_(None),
+    )
+
+
+class EscalationManager:
+    def __init__(self, domain_weights: dict[str, float] = DOMAIN_WEIGHTS, aging_per_hour: float = AGING_PER_HOUR):
+        self.domain_weights = domain_weights
+        self.aging_per_second = aging_per_hour / 3600
+        self._entries: dict[str, QueueEntry] = {}
+        # SortedList keeps inserts, removals and rank lookups O(log n); a
+        # plain sorted list pays an O(n) memmove for each of the first two.
+        self._queue: SortedList = SortedList()
+        self._by_domain: dict[str, SortedList] = {}
+        self._by_escalation: dict[str, QueueEntry] = {}
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def __contains__(self, ticket_id: str) -> bool:
+        return ticket_id in self._entries
+
+    def score(self, entry: QueueEntry, now: Optional[datetime] = None) -> float:
+        static = entry.priority + self.domain_weights.get(entry.domain, 0.0)
+        return static + self.aging_per_second * entry.wait_seconds(now)
+
+    def _sort_key(self, entry: QueueEntry) -> tuple[float, str]:
+        # Every entry ages at the same rate, so ordering by
+        # aging_rate * created_ts - static_score never changes after insert
+        # and the queue stays sorted without rescoring.
+        # created_at is naive UTC; timestamp() on a naive datetime would read
+        # it as local time and shift every key by the host's offset.
+        created_at = entry.created_at
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        static = entry.priority + self.domain_weights.get(entry.domain, 0.0)
+        return (self.aging_per_second * created_at.timestamp() - static, entry.escalation_id)
+
+    def add(self, entry: QueueEntry) -> int:
+        existing = self._entries.get(entry.ticket_id)
+        if existing is not None:
+            return self.position(entry.ticket_id)
+        entry.key = self._sort_key(entry)
+        self._entries[entry.ticket_id] = entry
+        self._by_escalation[entry.escalation_id] = entry
+        self._queue.add(entry.key)
+        self._by_domain.setdefault(entry.domain, SortedList()).add(entry.key)
+        return self.position(entry.ticket_id)
+
+    def remove(self, ticket_id: str) -> Optional[QueueEntry]:
+        entry = self._entries.pop(ticket_id, None)
+        if entry is None:
+            return None
+        del self._by_escalation[entry.escalation_id]
+        self._queue.discard(entry.key)
+        self._by_domain[entry.domain].discard(entry.key)
+        return entry
+
+    def _keys(self, domain: Optional[str]) -> SortedList:
+        if domain is None:
+            return self._queue
+        return self._by_domain.get(domain) or SortedList()
+
+    def position(self, ticket_id: str, domain: Optional[str] = None) -> Optional[int]:
+        entry = self._entries.get(ticket_id)
+        if entry is None:
+            return None
+        keys = self._keys(domain)
+        return keys.bisect_left(entry.key) + 1
+
+    def peek(self, domain: Optional[str] = None) -> Optional[QueueEntry]:
+        keys = self._keys(domain)
+        return self._by_escalation[keys[0][1]] if keys else None
+
+    def entries(self, limit: int = 50, domain: Optional[str] = None) -> list[QueueEntry]:
+        keys = self._keys(domain)
+        return [self._by_escalation[escalation_id] for _, escalation_id in keys.islice(0, limit)]
+
+    def oldest_wait_seconds(self, domain: Optional[str] = None, now: Optional[datetime] = None) -> float:
+        waiting = [e for e in self._entries.values() if domain is None or e.domain == domain]
+        return max((e.wait_seconds(now) for e in waiting), default=0.0)
+
+    def depth_by_domain(self) -> dict[str, int]:
+        return {domain: len(keys) for domain, keys in self._by_domain.items() if keys}
+
+    def _sort_key_sql(self):
+        # _sort_key computed by SQLite, for ranking without loading the queue.
+        weight = (
+            case(self.domain_weights, value=Ticket.routed_to, else_=0.0) if self.domain_weights else literal(0.0)
+        )
+        created_ts = (func.julianday(Escalation.created_at) - 2440587.5) * 86400.0
+        return self.aging_per_second * created_ts - (Ticket.priority + weight)
+
+    async def queue_position(self, session: AsyncSession, escalation_id: str) -> Optional[int]:
+        # Position of a committed escalation among everything waiting in
+        # SQLite, so workers that don't share this queue agree on it.
+        key = self._sort_key_sql()
+        waiting = (
+            select(key).select_from(Escalation).join(Ticket, Ticket.id == Escalation.ticket_id).where(*_waiting())
+        )
+        own = (await session.execute(waiting.where(Escalation.id == escalation_id))).scalar_one_or_none()
+        if own is None:
+            return None
+        ahead = await session.execute(
+            select(func.count())
+            .select_from(Escalation)
+            .join(Ticket, Ticket.id == Escalation.ticket_id)
+            .where(*_waiting(), or_(key < own, and_(key == own, Escalation.id < escalation_id)))
+        )
+        return ahead.scalar_one() + 1
+
+    async def reload(self, session: AsyncSession) -> int:
+        # Replaces the in-memory queue with what SQLite holds now; used when
+        # other worker processes escalate and claim tickets too.
+        self._entries.clear()
+        self._by_escalation.clear()
+        self._queue.clear()
+        self._by_domain.clear()
+        return await self.load(session)
+
+    async def load(self, session: AsyncSession) -> int:
+        result = await session.execute(
+            select(Escalation.id, Escalation.ticket_id, Escalation.created_at, Ticket.routed_to, Ticket.priority)
+            .join(Ticket, Ticket.id == Escalation.ticket_id)
+            .where(*_waiting())
+            .order_by(Escalation.created_at)
+        )
+        for escalation_id, ticket_id, created_at, domain, priority in result:
+            self.add(QueueEntry(
+                escalation_id=escalation_id,
+                ticket_id=ticket_id,
+                domain=domain or "unknown",
+                priority=priority,
+                created_at=created_at,
+            ))
+        return len(self)
+
+    async def claim(
+        self,
+        session: AsyncSession,
+        assignee: str,
+        domain: Optional[str] = None,
+    ) -> Optional[QueueEntry]:
+        while (entry := self.peek(domain)) is not None:
+            # Conditional update so two workers (or processes) can't both
+            # take the same escalation. The entry stays queued until the
+            # claim is committed, so a failed claim loses nothing.
+            result = await session.execute(
+                update(Escalation)
+                .where(Escalation.id == entry.escalation_id, Escalation.human_assignee.is_(None))
+                .values(human_assignee=assignee)
+            )
+            if result.rowcount == 1:
+                await session.execute(
+                    update(Ticket).where(Ticket.id == entry.ticket_id).values(assigned_to=assignee)
+                )
+                await session.commit()
+                self.remove(entry.ticket_id)
+                return entry
+            # Claimed elsewhere since it was queued.
+            await session.rollback()
+            self.remove(entry.ticket_id)
+        return None
+
@@ -0,0 +1,117 @@
+from collections import defaultdict
+import json
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.archive import TranscriptArchive
+from src.models.database import ArchivedTranscript, Conversation, Escalation, Ticket
+from src.models.repository import TicketFilter, decode_cursor, encode_cursor, filter_tickets
+
+
+def _isoformat(value) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def ticket_document(
+    ticket: Ticket,
+    conversations: list[Conversation],
+    escalations: list[Escalation],
+) -> dict:
+    return {
+        "id": ticket.id,
+        "source": ticket.source,
+        "customer_id": ticket.customer_id,
+        "subject": ticket.subject,
+        "body": ticket.body,
+        "sentiment": ticket.sentiment,
+        "urgency": ticket.urgency,
+        "intent": ticket.intent,
+        "intent_confidence": ticket.intent_confidence,
+        "status": ticket.status,
+        "assigned_to": ticket.assigned_to,
+        "routed_to": ticket.routed_to,
+        "priority": ticket.priority,
+        "metadata": ticket.metadata_,
+        "created_at": _isoformat(ticket.created_at),
+        "resolved_at": _isoformat(ticket.resolved_at),
+        "conversations": [
+            {
+                "id": c.id,
+                "role": c.role,
+                "content": c.content,
+                "confidence": c.confidence,
+                "created_at": _isoformat(c.created_at),
+            }
+            for c in conversations
+        ],
+        "escalations": [
+            {
+                "id": e.id,
+                "reason": e.reason,
+                "context_package": e.context_package,
+                "human_assignee": e.human_assignee,
+                "resolution": e.resolution,
+                "created_at": _isoformat(e.created_at),
+            }
+            for e in escalations
+        ],
+        "cursor": encode_cursor(ticket.created_at, ticket.id),
+    }
+
+
+async def _children(session: AsyncSession, model, ticket_ids: list[str]) -> dict[str, list]:
+    grouped = defaultdict(list)
+    result = await session.execute(
+        select(model)
+        .where(model.ticket_id.in_(ticket_ids))
+        .order_by(model.ticket_id, model.created_at, model.id)
+    )
+    for row in result.scalars():
+        grouped[row.ticket_id].append(row)
+    return grouped
+
+
+async def export_tickets(
+    session: AsyncSession,
+    filters: Optional[TicketFilter] = None,
+    cursor: Optional[str] = None,
+    archive: Optional[TranscriptArchive] = None,
+    chunk_size: int = 500,
+) -> AsyncIterator[dict]:
+    # Oldest first, so tickets created while an export runs land after the
+    # resume cursor instead of shifting pages.
+    query = (
+        filter_tickets(select(Ticket), filters or TicketFilter())
+        .order_by(Ticket.created_at, Ticket.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    if cursor:
+        query = query.where(tuple_(Ticket.created_at, Ticket.id) > tuple_(*decode_cursor(cursor)))
+
+    result = await session.stream(query)
+    async for tickets in result.scalars().partitions():
+        ticket_ids = [t.id for t in tickets]
+        conversations = await _children(session, Conversation, ticket_ids)
+        escalations = await _children(session, Escalation, ticket_ids)
+        if archive is not None:
+            entries = await session.execute(
+                select(ArchivedTranscript).where(ArchivedTranscript.ticket_id.in_(ticket_ids))
+            )
+            for entry in entries.scalars():
+                conversations[entry.ticket_id][:0] = await archive.load(entry)
+
+        for ticket in tickets:
+            yield ticket_document(ticket, conversations[ticket.id], escalations[ticket.id])
+
+
+async def export_ndjson(
+    session: AsyncSession,
+    filters: Optional[TicketFilter] = None,
+    cursor: Optional[str] = None,
+    archive: Optional[TranscriptArchive] = None,
+    chunk_size: int = 500,
+) -> AsyncIterator[str]:
+    async for document in export_tickets(session, filters, cursor, archive, chunk_size):
+        yield json.dumps(document, ensure_ascii=False, separators=(",", ":")) + "\n"
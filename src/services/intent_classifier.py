@@ -1,6 +1,11 @@
 from dataclasses import dataclass
 from enum import Enum
-import anthropic
+from typing import TYPE_CHECKING
+
+from .metrics import LLM_ERRORS
+
+if TYPE_CHECKING:
+    import anthropic
 
 
 class IntentCategory(str, Enum):
@@ -42,7 +47,9 @@ INTENT_CATEGORIES_DESC = """
 
 
 class IntentClassifier:
-    def __init__(self, client: anthropic.AsyncAnthropic):
+    model = "claude-3-haiku-20240307"
+
+    def __init__(self, client: "anthropic.AsyncAnthropic"):
         self.client = client
 
     async def classify(self, subject: str, body: str) -> Intent:
@@ -66,11 +73,17 @@ Be conservative with confidence scores:
 - 0.5-0.7: Somewhat ambiguous
 - Below 0.5: Very unclear"""
 
-        response = await self.client.messages.create(
-            model="claude-3-haiku-20240307",
-            max_tokens=200,
-            messages=[{"role": "user", "content": prompt}]
-        )
+        import anthropic
+
+        try:
+            response = await self.client.messages.create(
+                model=self.model,
+                max_tokens=200,
+                messages=[{"role": "user", "content": prompt}]
+            )
+        except anthropic.APIError as exc:
+            LLM_ERRORS.inc(model=self.model, error=type(exc).__name__)
+            raise
 
         return self._parse_response(response.content[0].text)
 
@@ -0,0 +1,276 @@
+import asyncio
+from dataclasses import dataclass
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.models.database import AppliedWrite
+from src.services.writes import WriteRecord
+
+
+logger = logging.getLogger(__name__)
+
+MARKER_DELETE_CHUNK = 500
+
+
+@dataclass
+class _Pending:
+    seq: int
+    segment: int
+    record: WriteRecord
+
+
+class WriteJournal:
+    def __init__(self, directory: str | Path, segment_bytes: int = 16 * 1024 * 1024, fsync: bool = True):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.segment = 0
+        self._file = None
+
+    def segments(self) -> list[int]:
+        return sorted(int(p.stem.split("-")[1]) for p in self.directory.glob("journal-*.jsonl"))
+
+    def path(self, segment: int) -> Path:
+        return self.directory / f"journal-{segment:08d}.jsonl"
+
+    def read(self) -> list[tuple[int, WriteRecord]]:
+        records = []
+        for segment in self.segments():
+            with open(self.path(segment), encoding="utf-8") as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        # Torn final line from a crash mid-append; that request
+                        # never got a response, so dropping it is safe.
+                        logger.warning("Ignoring partial journal entry in segment %d", segment)
+                        break
+                    records.append((segment, WriteRecord.from_json(line)))
+        return records
+
+    def open(self) -> None:
+        self.segment = max(self.segments(), default=0) + 1
+        self._file = open(self.path(self.segment), "a", encoding="utf-8")
+
+    def append(self, record: WriteRecord) -> None:
+        self.append_many([record])
+
+    def append_many(self, records: list[WriteRecord]) -> None:
+        self._file.write("".join(record.to_json() + "\n" for record in records))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    @property
+    def full(self) -> bool:
+        return self._file.tell() >= self.segment_bytes
+
+    def rotate(self) -> None:
+        self._file.close()
+        self.segment += 1
+        self._file = open(self.path(self.segment), "a", encoding="utf-8")
+
+    def discard(self, segment: int) -> None:
+        self.path(segment).unlink(missing_ok=True)
+
+    def dead_letter(self, record: WriteRecord) -> None:
+        with open(self.directory / "journal-failed.jsonl", "a", encoding="utf-8") as f:
+            f.write(record.to_json() + "\n")
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class WriteBehindWriter:
+    def __init__(
+        self,
+        journal: WriteJournal,
+        session_factory: async_sessionmaker,
+        max_batch: int = 256,
+        max_delay_ms: float = 50.0,
+        flush_timeout_ms: float = 5000.0,
+    ):
+        self.journal = journal
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self.flush_timeout = flush_timeout_ms / 1000
+        self.commits = 0
+        self.failed = 0
+        self._pending: list[_Pending] = []
+        self._appends: list[tuple[WriteRecord, asyncio.Future]] = []
+        self._segment_records: dict[int, list[str]] = {}
+        self._segment_open: dict[int, int] = {}
+        self._key_seq: dict[str, int] = {}
+        self._next_seq = 0
+        self._committed_seq = -1
+        self._wakeup = asyncio.Event()
+        self._progress = asyncio.Condition()
+        self._append_lock = asyncio.Lock()
+        self._drain_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def start(self) -> int:
+        replayed = self.journal.read()
+        for segment, record in replayed:
+            self._track(record, segment)
+        self.journal.open()
+        if replayed:
+            logger.info("Replaying %d journaled writes", len(replayed))
+            await self.drain()
+        self._task = asyncio.create_task(self._run())
+        return len(replayed)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.drain()
+        self.journal.close()
+
+    async def submit(self, record: WriteRecord) -> None:
+        written = asyncio.get_running_loop().create_future()
+        self._appends.append((record, written))
+        # Appends are serialized so a segment is only rotated (and later
+        # discarded) after every record written to it is being tracked.
+        # Whoever holds the lock writes everything queued while the previous
+        # fsync ran, so concurrent requests share one fsync per batch.
+        async with self._append_lock:
+            if self._appends:
+                batch, self._appends = self._appends, []
+                try:
+                    await asyncio.to_thread(self.journal.append_many, [r for r, _ in batch])
+                except Exception as exc:
+                    for _, future in batch:
+                        future.set_exception(exc)
+                else:
+                    for r, future in batch:
+                        self._track(r, self.journal.segment)
+                        future.set_result(None)
+                    if self.journal.full:
+                        self.journal.rotate()
+        await written
+        if len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+
+    async def flush(self, *keys: str) -> None:
+        # Raises asyncio.TimeoutError if the database stays unavailable for
+        # flush_timeout; the writes remain journaled and are applied later.
+        if keys:
+            target = max((self._key_seq.get(k, -1) for k in keys), default=-1)
+        else:
+            target = self._next_seq - 1
+        if target <= self._committed_seq:
+            return
+        self._wakeup.set()
+        async with self._progress:
+            await asyncio.wait_for(
+                self._progress.wait_for(lambda: self._committed_seq >= target), self.flush_timeout
+            )
+
+    async def drain(self) -> None:
+        while self._pending:
+            await self._commit_next()
+
+    def _track(self, record: WriteRecord, segment: int) -> None:
+        seq = self._next_seq
+        self._next_seq += 1
+        self._pending.append(_Pending(seq, segment, record))
+        self._segment_records.setdefault(segment, []).append(record.id)
+        self._segment_open[segment] = self._segment_open.get(segment, 0) + 1
+        for key in record.keys:
+            self._key_seq[key] = seq
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.max_delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.drain()
+            except OperationalError:
+                logger.warning("Write-behind drain failed, will retry", exc_info=True)
+
+    async def _commit_next(self) -> None:
+        async with self._drain_lock:
+            batch = self._pending[:self.max_batch]
+            if not batch:
+                return
+            try:
+                await self._commit([p.record for p in batch])
+            except OperationalError:
+                raise
+            except Exception:
+                # Isolate the bad record; transient errors still propagate
+                # and leave everything pending for the next attempt.
+                for item in batch:
+                    try:
+                        await self._commit([item.record])
+                    except OperationalError:
+                        raise
+                    except Exception:
+                        self._dead_letter(item.record)
+            await self._retire(batch)
+
+    async def _commit(self, records: list[WriteRecord]) -> None:
+        async with self.session_factory() as session:
+            ids = [r.id for r in records]
+            done = set((await session.execute(select(AppliedWrite.id).where(AppliedWrite.id.in_(ids)))).scalars())
+            for record in records:
+                if record.id in done:
+                    continue
+                await record.apply(session)
+                session.add(AppliedWrite(id=record.id))
+            await session.commit()
+        self.commits += 1
+
+    def _dead_letter(self, record: WriteRecord) -> None:
+        self.failed += 1
+        logger.error("Dropping journaled %s write %s after it failed to apply", record.kind, record.id, exc_info=True)
+        self.journal.dead_letter(record)
+
+    async def _retire(self, batch: list[_Pending]) -> None:
+        del self._pending[:len(batch)]
+        last_seq = batch[-1].seq
+
+        finished = []
+        for item in batch:
+            self._segment_open[item.segment] -= 1
+            if not self._segment_open[item.segment] and item.segment != self.journal.segment:
+                finished.append(item.segment)
+            for key in item.record.keys:
+                if self._key_seq.get(key, -1) <= last_seq:
+                    self._key_seq.pop(key, None)
+
+        for segment in dict.fromkeys(finished):
+            self.journal.discard(segment)
+            del self._segment_open[segment]
+            # applied_writes markers only guard replay of records still on
+            # disk; once the segment is gone its markers can go too.
+            ids = self._segment_records.pop(segment)
+            async with self.session_factory() as session:
+                for start in range(0, len(ids), MARKER_DELETE_CHUNK):
+                    chunk = ids[start:start + MARKER_DELETE_CHUNK]
+                    await session.execute(delete(AppliedWrite).where(AppliedWrite.id.in_(chunk)))
+                await session.commit()
+
+        async with self._progress:
+            self._committed_seq = last_seq
+            self._progress.notify_all()
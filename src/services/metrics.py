@@ -0,0 +1,366 @@
+import asyncio
+from bisect import bisect_left
+from contextlib import contextmanager
+import fcntl
+import json
+import logging
+import os
+from pathlib import Path
+from time import perf_counter
+from typing import Iterator, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_key", "_start")
+
+    def __init__(self, histogram: "Histogram", key: tuple[str, ...]):
+        self._histogram = histogram
+        self._key = key
+        self._start = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._histogram._observe(self._key, perf_counter() - self._start)
+
+
+class Counter:
+    def __init__(self, name: str, description: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels[n]) for n in self.label_names)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(str(labels[n]) for n in self.label_names), 0.0)
+
+    def reset(self) -> None:
+        self._values.clear()
+
+    def empty(self) -> "Counter":
+        return Counter(self.name, self.description, self.label_names)
+
+    def snapshot(self) -> list:
+        return [[list(key), value] for key, value in self._values.items()]
+
+    def merge(self, snapshot: list) -> None:
+        for key, value in snapshot:
+            key = tuple(key)
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} counter",
+        ]
+        for key, value in sorted(self._values.items()):
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., overflow count, sum]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        self._observe(tuple(str(labels[n]) for n in self.label_names), value)
+
+    def time(self, **labels: str) -> _Timer:
+        return _Timer(self, tuple(str(labels[n]) for n in self.label_names))
+
+    def _observe(self, key: tuple[str, ...], value: float) -> None:
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(tuple(str(labels[n]) for n in self.label_names))
+        return int(sum(series[:-1])) if series else 0
+
+    def quantile(self, q: float, **labels: str) -> float:
+        series = self._series.get(tuple(str(labels[n]) for n in self.label_names))
+        if not series:
+            return 0.0
+        total = sum(series[:-1])
+        rank = q * total
+        cumulative = 0.0
+        lower = 0.0
+        for bound, bucket_count in zip(self.buckets, series):
+            if bucket_count and cumulative + bucket_count >= rank:
+                return lower + (bound - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+            lower = bound
+        return self.buckets[-1]
+
+    def label_sets(self) -> list[dict[str, str]]:
+        return [dict(zip(self.label_names, key)) for key in sorted(self._series)]
+
+    def reset(self) -> None:
+        self._series.clear()
+
+    def empty(self) -> "Histogram":
+        return Histogram(self.name, self.description, self.label_names, self.buckets)
+
+    def snapshot(self) -> list:
+        return [[list(key), series] for key, series in self._series.items()]
+
+    def merge(self, snapshot: list) -> None:
+        width = len(self.buckets) + 2
+        for key, values in snapshot:
+            if len(values) != width:
+                # Written with different buckets by an older build.
+                continue
+            series = self._series.setdefault(tuple(key), [0.0] * width)
+            for i, value in enumerate(values):
+                series[i] += value
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for key, series in sorted(self._series.items()):
+            cumulative = 0.0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += bucket_count
+                le = 'le="' + _format_value(bound) + '"'
+                labels = _format_labels(self.label_names, key, le)
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(cumulative)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, Counter | Histogram] = {}
+
+    def counter(self, name: str, description: str, label_names: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, description, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, description, label_names, buckets))
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Counter | Histogram:
+        return self._metrics[name]
+
+    def reset(self) -> None:
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict[str, list]:
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def merged(self, snapshots: list[dict[str, list]]) -> "MetricsRegistry":
+        merged = MetricsRegistry()
+        for metric in self._metrics.values():
+            total = merged._register(metric.empty())
+            for snapshot in snapshots:
+                total.merge(snapshot.get(metric.name, []))
+        return merged
+
+
+registry = MetricsRegistry()
+
+RETIRED_FILE = "retired.json"
+
+
+@contextmanager
+def _locked(directory: Path, operation: int) -> Iterator[None]:
+    with open(directory / ".lock", "a") as lock:
+        fcntl.flock(lock, operation)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _read_snapshot(path: Path) -> Optional[dict[str, list]]:
+    try:
+        return json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_snapshot(path: Path, snapshot: dict[str, list]) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(snapshot))
+    os.replace(tmp, path)
+
+
+def _worker_file(directory: Path, pid: int) -> Path:
+    return directory / f"worker-{pid}.json"
+
+
+# Pre-forked workers each count into their own registry, and a scrape of the
+# shared port reaches whichever worker accepts it. Each worker therefore
+# writes its snapshot to a shared directory and /metrics sums them all. The
+# supervisor folds the files of exited workers into RETIRED_FILE, so
+# counters stay monotonic across worker recycling.
+class MultiprocessMetrics:
+    def __init__(
+        self,
+        directory: str | Path,
+        registry: MetricsRegistry = registry,
+        interval: float = 1.0,
+        pid: Optional[int] = None,
+    ):
+        self.directory = Path(directory)
+        self.registry = registry
+        self.interval = interval
+        self.path = _worker_file(self.directory, pid or os.getpid())
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.write()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.write()
+
+    def write(self) -> None:
+        _write_snapshot(self.path, self.registry.snapshot())
+
+    def render(self) -> str:
+        self.write()
+        with _locked(self.directory, fcntl.LOCK_SH):
+            snapshots = [_read_snapshot(path) for path in sorted(self.directory.glob("*.json"))]
+        return self.registry.merged([s for s in snapshots if s is not None]).render()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.write)
+            except OSError:
+                logger.warning("Writing metrics to %s failed, will retry", self.path, exc_info=True)
+
+
+def reset_metrics_directory(directory: str | Path) -> None:
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for path in directory.glob("*.json"):
+        path.unlink()
+
+
+def retire_worker_metrics(directory: str | Path, pid: int, registry: MetricsRegistry = registry) -> None:
+    # Counts written up to a crash are kept; anything after the last
+    # periodic write is lost.
+    directory = Path(directory)
+    path = _worker_file(directory, pid)
+    with _locked(directory, fcntl.LOCK_EX):
+        snapshot = _read_snapshot(path)
+        if snapshot is None:
+            return
+        retired = _read_snapshot(directory / RETIRED_FILE) or {}
+        _write_snapshot(directory / RETIRED_FILE, registry.merged([retired, snapshot]).snapshot())
+        path.unlink()
+
+STAGE_LATENCY = registry.histogram(
+    "support_stage_duration_seconds",
+    "Latency of ticket pipeline stages.",
+    ("stage",),
+)
+DB_WRITE_LATENCY = registry.histogram(
+    "support_db_write_duration_seconds",
+    "Latency of ticket persistence, including commit.",
+    ("operation",),
+)
+ESCALATIONS = registry.counter(
+    "support_escalations_total",
+    "Tickets escalated to a human agent.",
+    ("domain", "trigger"),
+)
+CACHE_HITS = registry.counter(
+    "support_cache_hits_total",
+    "Cache lookups served from memory.",
+    ("cache",),
+)
+CACHE_MISSES = registry.counter(
+    "support_cache_misses_total",
+    "Cache lookups that fell through to the backing store.",
+    ("cache",),
+)
+LLM_ERRORS = registry.counter(
+    "support_llm_errors_total",
+    "Errors returned by the LLM API.",
+    ("model", "error"),
+)
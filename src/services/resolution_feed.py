@@ -0,0 +1,98 @@
+import asyncio
+from datetime import datetime
+import logging
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.knowledge.resolutions import Resolution
+from src.models.database import Conversation, Ticket
+from src.models.ticket import TicketStatus
+
+
+logger = logging.getLogger(__name__)
+
+RESOLVED_PREFIX = "[RESOLVED] "
+
+
+# Tickets resolved since the last poll, read back from SQLite. With several
+# worker processes a resolution can't be handed to an in-process pipeline:
+# the one process that writes Chroma and every worker's similar-ticket index
+# each follow the tickets table instead, wherever the resolve landed.
+class ResolutionFeed:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        handle: Callable[[list[Resolution]], Awaitable[object]],
+        since: datetime,
+        interval: float = 5.0,
+        batch_size: int = 256,
+    ):
+        self.session_factory = session_factory
+        self.handle = handle
+        self.interval = interval
+        self.batch_size = batch_size
+        self._since = (since, "")
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def poll(self) -> int:
+        # The resolve handler writes the [RESOLVED] turn with the ticket's
+        # resolved_at, which picks the latest one if a ticket was reopened.
+        async with self.session_factory() as session:
+            rows = (await session.execute(
+                select(
+                    Ticket.id, Ticket.routed_to, Ticket.subject, Ticket.body,
+                    Ticket.intent, Ticket.resolved_at, Conversation.content,
+                )
+                .join(Conversation, Conversation.ticket_id == Ticket.id)
+                .where(
+                    Ticket.status == TicketStatus.RESOLVED.value,
+                    tuple_(Ticket.resolved_at, Ticket.id) > tuple_(*self._since),
+                    Conversation.role == "human",
+                    Conversation.created_at == Ticket.resolved_at,
+                    Conversation.content.startswith(RESOLVED_PREFIX),
+                )
+                .order_by(Ticket.resolved_at, Ticket.id)
+                .limit(self.batch_size)
+            )).all()
+        if not rows:
+            return 0
+
+        await self.handle([
+            Resolution(
+                ticket_id=ticket_id,
+                domain=domain or "unknown",
+                subject=subject,
+                body=body,
+                resolution=content[len(RESOLVED_PREFIX):],
+                intent=intent,
+                resolved_at=resolved_at,
+            )
+            for ticket_id, domain, subject, body, intent, resolved_at, content in rows
+        ])
+        self._since = (rows[-1].resolved_at, rows[-1].id)
+        return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                while await self.poll() == self.batch_size:
+                    pass
+            except Exception:
+                logger.warning("Polling for resolved tickets failed, will retry", exc_info=True)
+            await asyncio.sleep(self.interval)
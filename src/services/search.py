@@ -0,0 +1,117 @@
+from dataclasses import dataclass
+from datetime import datetime
+import html
+import re
+import secrets
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+HIGHLIGHT_OPEN = "<mark>"
+HIGHLIGHT_CLOSE = "</mark>"
+SNIPPET_TOKENS = 16
+
+# bm25 column weights: subject, content, ticket_id, kind
+SUBJECT_WEIGHT = 2.0
+CONTENT_WEIGHT = 1.0
+
+_TERM_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+
+@dataclass
+class SearchHit:
+    ticket_id: str
+    kind: str
+    subject: str
+    snippet: str
+    rank: float
+    status: str
+    role: Optional[str]
+    created_at: datetime
+
+
+def _markup(value: str, open_marker: str, close_marker: str) -> str:
+    # Subjects and snippets are customer text: escape it, then turn the FTS
+    # markers into tags. The markers carry a per-query nonce, so text that
+    # happens to contain marker-like characters can't produce a tag.
+    return html.escape(value).replace(open_marker, HIGHLIGHT_OPEN).replace(close_marker, HIGHLIGHT_CLOSE)
+
+
+def to_match_query(query: str) -> str:
+    # Every term becomes a quoted FTS phrase so user input such as
+    # "E-1042" or "can't" is never parsed as FTS5 syntax. A trailing "*"
+    # is kept as a prefix match.
+    terms = []
+    for phrase, word in _TERM_RE.findall(query):
+        term = phrase or word
+        prefix = not phrase and term.endswith("*")
+        term = term.rstrip("*").replace('"', "").strip()
+        if term:
+            terms.append(f'"{term}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+_SEARCH_SQL = f"""
+SELECT
+    s.ticket_id,
+    s.kind,
+    CASE s.kind WHEN 'ticket' THEN highlight(search_index, 0, :open, :close) ELSE t.subject END AS subject,
+    snippet(search_index, 1, :open, :close, '…', {SNIPPET_TOKENS}) AS snippet,
+    bm25(search_index, {SUBJECT_WEIGHT}, {CONTENT_WEIGHT}, 0.0, 0.0) AS rank,
+    t.status,
+    c.role,
+    COALESCE(c.created_at, t.created_at) AS created_at
+FROM search_index s
+JOIN tickets t ON t.id = s.ticket_id
+LEFT JOIN conversations c ON s.kind = 'conversation' AND c.rowid = (s.rowid - 1) / 2
+WHERE search_index MATCH :query {{filters}}
+ORDER BY rank, s.rowid
+LIMIT :limit OFFSET :offset
+"""
+
+
+async def search(
+    session: AsyncSession,
+    query: str,
+    kind: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> list[SearchHit]:
+    match = to_match_query(query)
+    if not match:
+        return []
+
+    nonce = secrets.token_hex(8)
+    open_marker, close_marker = f"\ue000{nonce}\ue001", f"\ue002{nonce}\ue003"
+    filters = ""
+    params = {
+        "query": match,
+        "open": open_marker,
+        "close": close_marker,
+        "limit": limit,
+        "offset": offset,
+    }
+    if kind is not None:
+        filters += " AND s.kind = :kind"
+        params["kind"] = kind
+    if status is not None:
+        filters += " AND t.status = :status"
+        params["status"] = status
+
+    result = await session.execute(text(_SEARCH_SQL.format(filters=filters)), params)
+    return [
+        SearchHit(
+            ticket_id=row.ticket_id,
+            kind=row.kind,
+            subject=_markup(row.subject, open_marker, close_marker),
+            snippet=_markup(row.snippet, open_marker, close_marker),
+            rank=row.rank,
+            status=row.status,
+            role=row.role,
+            created_at=datetime.fromisoformat(row.created_at),
+        )
+        for row in result
+    ]
@@ -0,0 +1,149 @@
+from dataclasses import dataclass
+import math
+import re
+
+from src.models.ticket import Urgency
+
+
+LEXICON = {
+    # negative
+    "angry": -0.8, "furious": -1.0, "livid": -1.0, "outraged": -1.0,
+    "terrible": -0.9, "awful": -0.9, "horrible": -0.9, "worst": -1.0,
+    "ridiculous": -0.8, "unacceptable": -0.9, "pathetic": -0.9, "useless": -0.8,
+    "frustrated": -0.7, "frustrating": -0.7, "annoyed": -0.6, "annoying": -0.6,
+    "disappointed": -0.6, "disappointing": -0.6, "upset": -0.6, "unhappy": -0.6,
+    "hate": -0.9, "scam": -1.0, "ripoff": -1.0, "fraud": -0.8, "stolen": -0.7,
+    "broken": -0.5, "wrong": -0.4, "bad": -0.5, "poor": -0.5, "slow": -0.3,
+    "fail": -0.4, "failed": -0.4, "failing": -0.4, "error": -0.3, "errors": -0.3,
+    "crash": -0.5, "crashes": -0.5, "crashing": -0.5, "stuck": -0.4,
+    "confused": -0.3, "confusing": -0.3, "problem": -0.3, "issue": -0.2,
+    "cancel": -0.3, "refund": -0.2, "waste": -0.7, "wasted": -0.7,
+    "again": -0.2, "still": -0.2,
+    # positive
+    "thanks": 0.5, "thank": 0.5, "appreciate": 0.6, "appreciated": 0.6,
+    "great": 0.7, "good": 0.4, "nice": 0.4, "love": 0.8, "awesome": 0.8,
+    "excellent": 0.8, "amazing": 0.8, "fantastic": 0.8, "perfect": 0.7,
+    "happy": 0.6, "glad": 0.5, "helpful": 0.6, "easy": 0.3, "works": 0.3,
+    "resolved": 0.4, "fixed": 0.4, "please": 0.1,
+}
+
+NEGATORS = frozenset({
+    "not", "no", "never", "nothing", "none", "nobody", "neither", "nor",
+    "hardly", "barely", "without", "cannot",
+})
+
+INTENSIFIERS = {
+    "very": 1.4, "really": 1.3, "extremely": 1.6, "so": 1.2, "totally": 1.4,
+    "absolutely": 1.5, "completely": 1.4, "incredibly": 1.5, "super": 1.3,
+    "slightly": 0.6, "somewhat": 0.7, "little": 0.7,
+}
+
+URGENCY_PHRASES = {
+    Urgency.CRITICAL: (
+        "outage", "is down", "are down", "production down", "site down",
+        "data loss", "lost all", "security breach", "breach", "hacked",
+        "compromised", "lawsuit", "legal action",
+    ),
+    Urgency.HIGH: (
+        "urgent", "urgently", "asap", "immediately", "emergency", "right now",
+        "as soon as possible", "deadline", "locked out", "can't access",
+        "cannot access", "can't log in", "cannot log in", "charged twice",
+        "unauthorized",
+    ),
+    Urgency.LOW: (
+        "no rush", "whenever", "just curious", "just wondering", "when you get a chance",
+        "feature request", "suggestion", "would be nice",
+    ),
+}
+
+NEGATION_WINDOW = 3
+NEGATION_FACTOR = -0.5
+NORMALIZATION_ALPHA = 4.0
+
+_TOKEN_RE = re.compile(r"[a-z]+(?:'[a-z]+)?|!")
+
+
+@dataclass
+class SentimentResult:
+    sentiment: float
+    urgency: Urgency
+
+
+class SentimentAnalyzer:
+    def __init__(
+        self,
+        lexicon: dict[str, float] = LEXICON,
+        urgency_phrases: dict[Urgency, tuple[str, ...]] = URGENCY_PHRASES,
+    ):
+        self.lexicon = lexicon
+        self._urgency_levels: dict[str, Urgency] = {}
+        for level in (Urgency.LOW, Urgency.HIGH, Urgency.CRITICAL):
+            for phrase in urgency_phrases.get(level, ()):
+                if phrase:
+                    self._urgency_levels[phrase] = level
+        phrases = sorted(self._urgency_levels, key=len, reverse=True)
+        self._urgency_re = (
+            re.compile(r"\b(?:" + "|".join(re.escape(p) for p in phrases) + r")\b") if phrases else None
+        )
+
+    def analyze(self, subject: str, body: str) -> SentimentResult:
+        text = f"{subject}\n{body}"
+        sentiment = self.score_sentiment(text)
+        return SentimentResult(sentiment=sentiment, urgency=self.score_urgency(text, sentiment))
+
+    def analyze_batch(self, tickets: list[tuple[str, str]]) -> list[SentimentResult]:
+        analyze = self.analyze
+        return [analyze(subject, body) for subject, body in tickets]
+
+    def score_sentiment(self, text: str) -> float:
+        lexicon = self.lexicon
+        total = 0.0
+        scale = 1.0
+        negated_for = 0
+        exclamations = 0
+
+        for token in _TOKEN_RE.findall(text.lower()):
+            if token == "!":
+                exclamations += 1
+                continue
+            if token in NEGATORS or token.endswith("n't"):
+                negated_for = NEGATION_WINDOW
+                continue
+            if token in INTENSIFIERS:
+                scale *= INTENSIFIERS[token]
+                continue
+
+            weight = lexicon.get(token)
+            if weight is not None:
+                if negated_for:
+                    weight *= NEGATION_FACTOR
+                total += weight * scale
+            scale = 1.0
+            if negated_for:
+                negated_for -= 1
+
+        if total and exclamations:
+            total *= 1.0 + 0.1 * min(exclamations, 4)
+
+        shouting = sum(1 for word in text.split() if len(word) > 3 and word.isupper())
+        if total < 0 and shouting:
+            total *= 1.0 + 0.15 * min(shouting, 4)
+
+        return max(-1.0, min(1.0, total / math.sqrt(total * total + NORMALIZATION_ALPHA)))
+
+    def score_urgency(self, text: str, sentiment: float = 0.0) -> Urgency:
+        found = set()
+        if self._urgency_re is not None:
+            found = {self._urgency_levels[m.group()] for m in self._urgency_re.finditer(text.lower())}
+        if Urgency.CRITICAL in found:
+            return Urgency.CRITICAL
+        if Urgency.HIGH in found:
+            return Urgency.HIGH
+        if sentiment <= -0.6:
+            return Urgency.HIGH
+        if Urgency.LOW in found:
+            return Urgency.LOW
+        return Urgency.MEDIUM
+
+
+default_analyzer = SentimentAnalyzer()
@@ -0,0 +1,219 @@
+from dataclasses import dataclass
+from datetime import datetime
+import logging
+from typing import Optional
+
+import numpy as np
+
+from src.services.metrics import STAGE_LATENCY
+
+
+logger = logging.getLogger(__name__)
+
+RESOLVED_TICKETS_COLLECTION = "resolved_tickets"
+
+
+class VectorIndex:
+    def __init__(self, dim: int = 0, capacity: int = 1024):
+        self.dim = dim
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        # Optional per-row label (a domain, say), kept row-aligned with the
+        # vectors so filtering on it is one vectorized comparison.
+        self._labels = np.empty(capacity, dtype=object)
+        self._ids: list[str] = []
+        self._rows: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._rows
+
+    @property
+    def ids(self) -> list[str]:
+        return list(self._ids)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors[:len(self._ids)]
+
+    @property
+    def labels(self) -> np.ndarray:
+        return self._labels[:len(self._ids)]
+
+    def add(self, item_id: str, vector: np.ndarray, label: Optional[str] = None) -> None:
+        self.add_many([item_id], np.asarray(vector, dtype=np.float32).reshape(1, -1), [label])
+
+    def add_many(self, item_ids: list[str], vectors: np.ndarray, labels: Optional[list[Optional[str]]] = None) -> None:
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+        if not self.dim:
+            self.dim = vectors.shape[1]
+            capacity = max(len(self._vectors), len(item_ids))
+            self._vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+            self._labels = np.empty(capacity, dtype=object)
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dimensional vectors, got {vectors.shape[1]}")
+
+        if labels is None:
+            labels = [None] * len(item_ids)
+        for item_id, vector, label in zip(item_ids, vectors, labels):
+            row = self._rows.get(item_id)
+            if row is None:
+                row = len(self._ids)
+                if row == len(self._vectors):
+                    size = max(2 * row, 1)
+                    grown = np.zeros((size, self.dim), dtype=np.float32)
+                    grown[:row] = self._vectors
+                    self._vectors = grown
+                    grown_labels = np.empty(size, dtype=object)
+                    grown_labels[:row] = self._labels[:row]
+                    self._labels = grown_labels
+                self._ids.append(item_id)
+                self._rows[item_id] = row
+            self._vectors[row] = vector
+            self._labels[row] = label
+
+    def remove(self, item_id: str) -> None:
+        row = self._rows.pop(item_id, None)
+        if row is None:
+            return
+        last = len(self._ids) - 1
+        if row != last:
+            moved = self._ids[last]
+            self._vectors[row] = self._vectors[last]
+            self._labels[row] = self._labels[last]
+            self._ids[row] = moved
+            self._rows[moved] = row
+        self._labels[last] = None
+        self._ids.pop()
+
+    def search(self, vector: np.ndarray, k: int, mask: Optional[np.ndarray] = None) -> list[tuple[str, float]]:
+        count = len(self._ids)
+        if not count or k <= 0:
+            return []
+        query = _normalize(np.asarray(vector, dtype=np.float32).reshape(1, -1))[0]
+        scores = self._vectors[:count] @ query
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+        k = min(k, count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self._ids[i], float(scores[i])) for i in top if scores[i] != -np.inf]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+@dataclass
+class SimilarTicket:
+    ticket_id: str
+    subject: str
+    resolution: str
+    domain: str
+    score: float
+    resolved_at: Optional[str] = None
+
+    def to_context(self) -> dict:
+        return {
+            "ticket_id": self.ticket_id,
+            "subject": self.subject,
+            "resolution": self.resolution,
+            "domain": self.domain,
+            "score": round(self.score, 4),
+            "resolved_at": self.resolved_at,
+        }
+
+
+class SimilarTicketIndex:
+    def __init__(self, knowledge_base, collection: str = RESOLVED_TICKETS_COLLECTION, min_score: float = 0.3):
+        self.kb = knowledge_base
+        self.collection = collection
+        self.min_score = min_score
+        self.index = VectorIndex()
+        self._metadata: dict[str, dict] = {}
+
+    async def load(self) -> int:
+        ids, embeddings, metadatas = await self.kb.get_embeddings(self.collection)
+        if ids:
+            self.index.add_many(ids, embeddings, [(meta or {}).get("domain") for meta in metadatas])
+            self._metadata.update(zip(ids, metadatas))
+        return len(ids)
+
+    async def add_resolution(
+        self,
+        ticket_id: str,
+        subject: str,
+        body: str,
+        resolution: str,
+        domain: str,
+        resolved_at: Optional[datetime] = None,
+    ) -> None:
+        await self.add_resolutions([(ticket_id, subject, body, resolution, domain, resolved_at)])
+
+    async def add_resolutions(
+        self,
+        resolutions: list[tuple[str, str, str, str, str, Optional[datetime]]],
+        persist: bool = True,
+    ) -> None:
+        if not resolutions:
+            return
+        ids, texts, metadatas = [], [], []
+        for ticket_id, subject, body, resolution, domain, resolved_at in resolutions:
+            ids.append(ticket_id)
+            texts.append(f"{subject}\n{body}")
+            metadatas.append({
+                "subject": subject,
+                "resolution": resolution,
+                "domain": domain,
+                "resolved_at": resolved_at.isoformat() if resolved_at else "",
+            })
+        embeddings = await self.kb.embed(texts)
+        # Workers in multi-worker mode only update their own copy; a single
+        # writer process persists the same resolutions to Chroma.
+        if persist:
+            await self.kb.upsert_embeddings(
+                self.collection,
+                ids=ids,
+                embeddings=embeddings,
+                documents=texts,
+                metadatas=metadatas,
+            )
+        self.index.add_many(ids, embeddings, [meta["domain"] for meta in metadatas])
+        self._metadata.update(zip(ids, metadatas))
+
+    def latest_resolved_at(self) -> Optional[datetime]:
+        stamps = [meta.get("resolved_at") for meta in self._metadata.values() if meta and meta.get("resolved_at")]
+        return datetime.fromisoformat(max(stamps)) if stamps else None
+
+    async def similar(
+        self,
+        text: str,
+        k: int = 3,
+        domain: Optional[str] = None,
+        exclude: Optional[str] = None,
+    ) -> list[SimilarTicket]:
+        if not len(self.index):
+            return []
+        with STAGE_LATENCY.time(stage="similar_tickets"):
+            query = (await self.kb.embed([text]))[0]
+            mask = None
+            if domain is not None:
+                mask = self.index.labels == domain
+            hits = self.index.search(query, k + (exclude is not None), mask=mask)
+
+        results = []
+        for ticket_id, score in hits:
+            if ticket_id == exclude or score < self.min_score:
+                continue
+            meta = self._metadata.get(ticket_id, {})
+            results.append(SimilarTicket(
+                ticket_id=ticket_id,
+                subject=meta.get("subject", ""),
+                resolution=meta.get("resolution", ""),
+                domain=meta.get("domain", "unknown"),
+                score=score,
+                resolved_at=meta.get("resolved_at") or None,
+            ))
+        return results[:k]
@@ -0,0 +1,119 @@
+from dataclasses import dataclass, field
+import re
+
+
+DEFAULT_HEDGE_PHRASES = (
+    "i'm not sure",
+    "i don't know",
+    "i cannot",
+    "unable to",
+    "might be",
+    "could be",
+    "possibly",
+    "i think",
+    "i believe",
+)
+
+
+@dataclass
+class HedgeScan:
+    hits: dict[str, list[int]] = field(default_factory=dict)
+
+    @property
+    def count(self) -> int:
+        return len(self.hits)
+
+    @property
+    def total_hits(self) -> int:
+        return sum(len(positions) for positions in self.hits.values())
+
+
+def _overlaps(phrases: tuple[str, ...]) -> bool:
+    # True when one phrase can share characters with another match, so the
+    # leftmost regex scan and plain substring presence could disagree.
+    for a in phrases:
+        for b in phrases:
+            if a is b:
+                continue
+            if b in a or any(a.endswith(b[:k]) for k in range(1, min(len(a), len(b)))):
+                return True
+    return False
+
+
+def _trie_pattern(phrases: tuple[str, ...]) -> str:
+    trie: dict = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        optional = "" in node
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if optional else group
+
+    return build(trie)
+
+
+class HedgeDetector:
+    def __init__(self, phrases: tuple[str, ...] = DEFAULT_HEDGE_PHRASES):
+        self.phrases = tuple(dict.fromkeys(p.lower() for p in phrases if p))
+        self.max_length = max((len(p) for p in self.phrases), default=0)
+        self._pattern = re.compile(_trie_pattern(self.phrases)) if self.phrases else None
+        self._overlapping = _overlaps(self.phrases)
+
+    def count(self, text: str) -> int:
+        # Presence-only check: CPython's substring search on one lowered copy
+        # is faster than a regex alternation when positions aren't needed.
+        # It only agrees with scan() when no two phrases can overlap;
+        # otherwise dedupe the regex's matched strings.
+        lower_text = text.lower()
+        if self._overlapping:
+            return len(set(self._pattern.findall(lower_text)))
+        return sum(1 for phrase in self.phrases if phrase in lower_text)
+
+    def scan(self, text: str) -> HedgeScan:
+        scan = HedgeScan()
+        if self._pattern is not None:
+            for match in self._pattern.finditer(text.lower()):
+                scan.hits.setdefault(match.group(), []).append(match.start())
+        return scan
+
+    def stream(self) -> "HedgeStream":
+        return HedgeStream(self)
+
+
+class HedgeStream:
+    def __init__(self, detector: HedgeDetector):
+        self.detector = detector
+        self.result = HedgeScan()
+        self._tail = ""
+        self._offset = 0
+
+    def feed(self, chunk: str) -> None:
+        pattern = self.detector._pattern
+        if pattern is None or not chunk:
+            return
+
+        buffer = self._tail + chunk.lower()
+        for match in pattern.finditer(buffer):
+            # Matches that end inside the carried-over tail were already
+            # recorded when that text was fed.
+            if match.end() > len(self._tail):
+                self.result.hits.setdefault(match.group(), []).append(self._offset + match.start())
+
+        keep = min(len(buffer), self.detector.max_length - 1)
+        self._offset += len(buffer) - keep
+        self._tail = buffer[len(buffer) - keep:]
+
+    def finish(self) -> HedgeScan:
+        return self.result
+
+
+default_detector = HedgeDetector()
@@ -0,0 +1,113 @@
+import asyncio
+from dataclasses import dataclass
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WarmupStep:
+    name: str
+    run: Callable[[], Awaitable[None]]
+    # Optional steps are attempted but never hold back readiness; whatever
+    # they prepare is otherwise loaded on first use.
+    required: bool = True
+    status: str = "pending"
+    seconds: Optional[float] = None
+    error: Optional[str] = None
+    attempts: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "status": self.status,
+            "required": self.required,
+            "attempts": self.attempts,
+            "seconds": round(self.seconds, 3) if self.seconds is not None else None,
+            "error": self.error,
+        }
+
+
+# Runs the slow part of startup (heavy imports, model and index loading) in
+# the background, one step at a time, so the server answers liveness probes
+# immediately and reports readiness once every required step has finished.
+# A required step that fails is retried with exponential backoff, since the
+# usual causes (Chroma's store still being mounted, a slow model download)
+# are transient; only after the last retry does the warm-up give up.
+class Warmup:
+    def __init__(self, steps: list[WarmupStep], retries: int = 4, backoff: float = 1.0, max_backoff: float = 30.0):
+        self.steps = steps
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return all(step.status == "done" for step in self.steps if step.required)
+
+    @property
+    def failed(self) -> bool:
+        return any(step.status == "failed" for step in self.steps if step.required)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def wait(self) -> bool:
+        if self._task is not None:
+            await asyncio.shield(self._task)
+        return self.ready
+
+    async def run(self) -> None:
+        for step in self.steps:
+            if self.failed:
+                step.status = "skipped"
+                continue
+            started = time.perf_counter()
+            await self._run_step(step)
+            step.seconds = time.perf_counter() - started
+
+    async def _run_step(self, step: WarmupStep) -> None:
+        delay = self.backoff
+        while True:
+            step.status = "running"
+            step.attempts += 1
+            try:
+                await step.run()
+            except Exception as exc:
+                step.error = f"{type(exc).__name__}: {exc}"
+                if step.required and step.attempts <= self.retries:
+                    logger.warning(
+                        "Warm-up step %s failed (attempt %d), retrying in %.1fs",
+                        step.name, step.attempts, delay, exc_info=True,
+                    )
+                    step.status = "retrying"
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.max_backoff)
+                    continue
+                step.status = "failed"
+                log = logger.error if step.required else logger.warning
+                log("Warm-up step %s failed", step.name, exc_info=True)
+            else:
+                step.status = "done"
+                step.error = None
+            return
+
+    def status(self) -> dict:
+        done = sum(step.status == "done" for step in self.steps)
+        return {
+            "ready": self.ready,
+            "progress": f"{done}/{len(self.steps)}",
+            "steps": {step.name: step.to_dict() for step in self.steps},
+        }
@@ -0,0 +1,88 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+import json
+from typing import Any, Optional
+import uuid
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.database import Base
+from src.services import analytics
+from src.services.customers import ProfileEvent, record_profile_event
+
+
+_MODELS = {mapper.class_.__tablename__: mapper.class_ for mapper in Base.registry.mappers}
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _decode(obj: dict) -> Any:
+    if len(obj) == 1 and "$dt" in obj:
+        return datetime.fromisoformat(obj["$dt"])
+    return obj
+
+
+# A request's database changes as an ordered list of plain-data operations,
+# so the same record can be committed inline, handed to the group writer, or
+# appended to the write-behind journal and replayed after a crash.
+@dataclass
+class WriteRecord:
+    kind: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    ops: list[dict] = field(default_factory=list)
+    keys: list[str] = field(default_factory=list)
+
+    def insert(self, model: type[Base], **values) -> "WriteRecord":
+        self.ops.append({"op": "insert", "table": model.__tablename__, "values": values})
+        return self
+
+    def update(self, model: type[Base], row_id: str, **values) -> "WriteRecord":
+        self.ops.append({"op": "update", "table": model.__tablename__, "id": row_id, "values": values})
+        return self
+
+    def analytics_event(self, **values) -> "WriteRecord":
+        self.ops.append({"op": "analytics", "values": values})
+        return self
+
+    def profile_event(self, event: ProfileEvent) -> "WriteRecord":
+        self.ops.append({"op": "profile", "values": vars(event).copy()})
+        self.touch(customer=event.customer_id)
+        return self
+
+    def touch(self, ticket: Optional[str] = None, customer: Optional[str] = None) -> "WriteRecord":
+        for key in (ticket and f"ticket:{ticket}", customer and f"customer:{customer}"):
+            if key and key not in self.keys:
+                self.keys.append(key)
+        return self
+
+    async def apply(self, session: AsyncSession) -> None:
+        for op in self.ops:
+            kind = op["op"]
+            if kind == "insert":
+                session.add(_MODELS[op["table"]](**op["values"]))
+            elif kind == "update":
+                model = _MODELS[op["table"]]
+                await session.execute(update(model).where(model.id == op["id"]).values(**op["values"]))
+            elif kind == "analytics":
+                await analytics.record_event(session, **op["values"])
+            elif kind == "profile":
+                await record_profile_event(session, ProfileEvent(**op["values"]))
+            else:
+                raise ValueError(f"Unknown write operation: {kind}")
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"kind": self.kind, "id": self.id, "ops": self.ops, "keys": self.keys},
+            default=_encode,
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_json(cls, line: str) -> "WriteRecord":
+        data = json.loads(line, object_hook=_decode)
+        return cls(kind=data["kind"], id=data["id"], ops=data["ops"], keys=data["keys"])
@@ -0,0 +1,68 @@
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from src.api import main
+from src.api.main import app
+from src.models.database import get_db, init_db
+from src.models.storage import StorageConfig, configure_engine
+from src.models.ticket import AgentResponse
+from src.services.customers import profile_cache
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db")
+    configure_engine(engine, StorageConfig())
+    await init_db(engine)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def api_client(session_factory):
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    profile_cache.clear()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.pop(get_db, None)
+
+
+class FakeAgent:
+    def __init__(self, response: AgentResponse):
+        self.response = response
+
+    async def handle(self, ticket, conversation_history=None) -> AgentResponse:
+        return self.response
+
+
+class FakeRouter:
+    def __init__(self, domain: str = "billing"):
+        self.domain = domain
+        self.last_ticket = None
+        self.response = AgentResponse(
+            message="Here is how to fix it.",
+            confidence=0.9,
+            intent="billing.refund_request",
+        )
+
+    async def route(self, ticket, conversation_history=None):
+        self.last_ticket = ticket
+        ticket.intent = self.response.intent
+        return self.response, self.domain
+
+    def get_agent_for_domain(self, domain: str) -> FakeAgent:
+        return FakeAgent(self.response)
+
+
+@pytest.fixture
+def fake_router(monkeypatch):
+    router = FakeRouter()
+    monkeypatch.setattr(main, "router", router)
+    return router
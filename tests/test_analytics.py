@@ -0,0 +1,47 @@
+import pytest
+
+from src.models.database import Ticket
+
+
+def make_ticket(ticket_id: str, status: str, confidence: float, routed_to: str | None) -> Ticket:
+    return Ticket(
+        id=ticket_id,
+        source="api",
+        customer_id="customer",
+        subject="Subject",
+        body="Body",
+        status=status,
+        intent_confidence=confidence,
+        routed_to=routed_to,
+        metadata_={"routed_to": routed_to} if routed_to else {},
+    )
+
+
+@pytest.mark.asyncio
+async def test_summary_aggregates_in_sql(api_client, session_factory):
+    async with session_factory() as session:
+        session.add_all([
+            make_ticket("t1", "open", 0.9, "billing"),
+            make_ticket("t2", "resolved", 0.8, "billing"),
+            make_ticket("t3", "resolved", 0.7, "technical"),
+            make_ticket("t4", "escalated", 0.4, "account"),
+            make_ticket("t5", "in_progress", 0.6, None),
+        ])
+        await session.commit()
+
+    response = await api_client.get("/analytics/summary")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_tickets"] == 5
+    assert data["open_tickets"] == 1
+    assert data["resolved_tickets"] == 2
+    assert data["escalated_tickets"] == 1
+    assert data["auto_resolved_rate"] == pytest.approx(0.4)
+    assert data["avg_confidence"] == pytest.approx(0.68)
+    assert data["tickets_by_domain"] == {"billing": 2, "technical": 1, "account": 1, "unknown": 1}
+
+
+@pytest.mark.asyncio
+async def test_summary_empty(api_client):
+    response = await api_client.get("/analytics/summary")
+    assert response.json()["total_tickets"] == 0
@@ -0,0 +1,173 @@
+import asyncio
+from datetime import datetime
+import json
+
+import pytest
+from sqlalchemy import func, select
+
+from src.models.database import AnalyticsRollup, Conversation, CustomerProfile, Escalation, Ticket
+from src.models.ticket import AgentResponse
+from src.services.backfill import BackfillCheckpoint, TicketBackfill, read_tickets
+from src.services.escalation import EscalationManager
+from src.services.intent_classifier import Intent, IntentCategory
+
+
+class FakeClassifier:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def classify(self, subject, body):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.001)
+        self.active -= 1
+        return Intent(IntentCategory.BILLING_REFUND_REQUEST, 0.8, "")
+
+
+class FakeRouter:
+    def __init__(self):
+        self.classifier = FakeClassifier()
+
+    async def route(self, ticket, conversation_history=None):
+        intent = await self.classifier.classify(ticket.subject, ticket.body)
+        ticket.intent = intent.category.value
+        ticket.intent_confidence = intent.confidence
+        return AgentResponse(message="Refund issued.", confidence=0.7, intent=ticket.intent), "billing"
+
+
+def write_jsonl(path, count: int):
+    with open(path, "w") as f:
+        for i in range(count):
+            f.write(json.dumps({
+                "id": f"h{i}",
+                "customer_id": f"c{i % 3}",
+                "subject": "Refund",
+                "body": "I was charged twice, this is unacceptable!",
+                "status": "resolved",
+                "created_at": f"2023-03-0{1 + i % 5}T10:00:00Z",
+                "resolved_at": f"2023-03-0{1 + i % 5}T12:00:00Z",
+                "resolution": "Refunded the duplicate charge.",
+            }) + "\n")
+
+
+async def count(session_factory, model) -> int:
+    async with session_factory() as session:
+        return (await session.execute(select(func.count()).select_from(model))).scalar_one()
+
+
+def test_reads_csv_rows(tmp_path):
+    path = tmp_path / "tickets.csv"
+    path.write_text(
+        "id,customer_id,subject,body,status,created_at,escalated,conversations\n"
+        'a1,c1,Login,Locked out,escalated,2023-01-02 09:30:00,,"[{""role"": ""customer"", ""content"": ""help""}]"\n'
+    )
+    (ticket,) = read_tickets(path)
+
+    assert ticket.escalated is True
+    assert ticket.created_at == datetime(2023, 1, 2, 9, 30)
+    assert ticket.conversations == [{"role": "customer", "content": "help"}]
+
+
+@pytest.mark.asyncio
+async def test_rows_without_an_id_import_once(session_factory, tmp_path):
+    path = tmp_path / "tickets.csv"
+    path.write_text(
+        "customer_id,subject,body,status,created_at\n"
+        "c1,Login,Locked out,resolved,2023-01-02 09:30:00\n"
+        "c1,Login,Locked out again,resolved,2023-01-02 09:30:00\n"
+    )
+    first, second = read_tickets(path)
+    assert first.id != second.id
+    assert [t.id for t in read_tickets(path)] == [first.id, second.id]
+
+    assert await TicketBackfill(session_factory).run(read_tickets(path)) == 2
+    assert await TicketBackfill(session_factory).run(read_tickets(path)) == 0
+    assert await count(session_factory, Ticket) == 2
+
+
+@pytest.mark.asyncio
+async def test_escalated_tickets_get_an_escalation(session_factory, tmp_path):
+    path = tmp_path / "tickets.jsonl"
+    path.write_text("\n".join(json.dumps(row) for row in [
+        {"id": "e1", "customer_id": "c1", "subject": "Locked", "body": "Help", "status": "escalated",
+         "created_at": "2023-01-02T09:30:00", "escalation_reason": "VIP"},
+        {"id": "e2", "customer_id": "c1", "subject": "Locked", "body": "Help", "status": "resolved", "escalated": "yes",
+         "created_at": "2023-01-02T09:30:00", "resolved_at": "2023-01-02T11:00:00", "resolution": "Unlocked."},
+        {"id": "e3", "customer_id": "c1", "subject": "Locked", "body": "Help", "status": "resolved",
+         "created_at": "2023-01-02T09:30:00"},
+    ]) + "\n")
+    await TicketBackfill(session_factory).run(read_tickets(path))
+
+    async with session_factory() as session:
+        escalations = {e.ticket_id: e for e in (await session.execute(select(Escalation))).scalars()}
+        manager = EscalationManager()
+        assert await manager.load(session) == 1
+    assert set(escalations) == {"e1", "e2"}
+    assert escalations["e1"].reason == "VIP"
+    assert escalations["e2"].resolution == "Unlocked."
+    assert manager.peek().ticket_id == "e1"
+
+
+@pytest.mark.asyncio
+async def test_backfill_classifies_with_bounded_concurrency(session_factory, tmp_path):
+    path = tmp_path / "tickets.jsonl"
+    write_jsonl(path, 25)
+    router = FakeRouter()
+    backfill = TicketBackfill(session_factory, router=router, generate=False, concurrency=4)
+
+    assert await backfill.run(read_tickets(path), chunk_size=10) == 25
+    assert router.classifier.peak <= 4
+    assert await count(session_factory, Ticket) == 25
+    # Customer turn plus the resolution note; no generated reply.
+    assert await count(session_factory, Conversation) == 50
+
+    async with session_factory() as session:
+        rollup = (await session.execute(
+            select(func.sum(AnalyticsRollup.tickets_created), func.sum(AnalyticsRollup.resolutions))
+        )).one()
+        profile = await session.get(CustomerProfile, "c0")
+        ticket = await session.get(Ticket, "h0")
+    assert tuple(rollup) == (25, 25)
+    assert profile.ticket_count == 9
+    assert ticket.routed_to == "billing"
+    assert ticket.sentiment < 0
+
+
+@pytest.mark.asyncio
+async def test_generation_adds_agent_turn(session_factory, tmp_path):
+    path = tmp_path / "tickets.jsonl"
+    write_jsonl(path, 2)
+    await TicketBackfill(session_factory, router=FakeRouter()).run(read_tickets(path))
+
+    async with session_factory() as session:
+        roles = (await session.execute(
+            select(Conversation.role).where(Conversation.ticket_id == "h0").order_by(Conversation.created_at)
+        )).scalars().all()
+    assert sorted(roles) == ["agent", "customer", "human"]
+
+
+@pytest.mark.asyncio
+async def test_resume_skips_checkpointed_and_existing_rows(session_factory, tmp_path):
+    path = tmp_path / "tickets.jsonl"
+    write_jsonl(path, 12)
+    checkpoint_path = tmp_path / "tickets.checkpoint"
+
+    await TicketBackfill(session_factory).run(list(read_tickets(path))[:7], chunk_size=5)
+    BackfillCheckpoint(checkpoint_path, rows_done=5, imported=5).save()
+
+    router = FakeRouter()
+    checkpoint = BackfillCheckpoint.load(checkpoint_path)
+    imported = await TicketBackfill(session_factory, router=router, generate=False).run(
+        read_tickets(path), chunk_size=5, checkpoint=checkpoint
+    )
+
+    assert imported == 5
+    assert router.classifier.calls == 5
+    assert BackfillCheckpoint.load(checkpoint_path).rows_done == 12
+    assert await count(session_factory, Ticket) == 12
+    async with session_factory() as session:
+        created = (await session.execute(select(func.sum(AnalyticsRollup.tickets_created)))).scalar_one()
+    assert created == 12
@@ -0,0 +1,103 @@
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from src.models.database import Base, Ticket, Conversation, Escalation
+from src.models.outcomes import load_outcomes
+from src.services.calibration import CalibrationTable, fit_isotonic, fit_platt
+from src.services.confidence_scorer import ConfidenceScorer
+
+
+@pytest.fixture
+def samples():
+    rng = np.random.default_rng(1)
+    scores = rng.uniform(0.3, 1.0, 5000)
+    outcomes = (rng.uniform(0, 1, 5000) < scores ** 3).astype(float)
+    return scores, outcomes
+
+
+@pytest.mark.parametrize("fit", [fit_isotonic, fit_platt])
+def test_fit_is_monotone(fit, samples):
+    table = fit(*samples)
+    assert len(table.values) == 101
+    assert np.all(np.diff(table.values) >= 0)
+    assert table.apply(0.95) > table.apply(0.5)
+
+
+def test_isotonic_tracks_observed_rate(samples):
+    table = fit_isotonic(*samples)
+    assert table.apply(0.9) == pytest.approx(0.9 ** 3, abs=0.08)
+
+
+def test_apply_batch_matches_scalar(samples):
+    table = fit_isotonic(*samples)
+    scores = np.linspace(-0.1, 1.1, 257)
+    batch = table.apply_batch(scores)
+    assert [table.apply(float(s)) for s in scores] == batch.tolist()
+
+
+def test_save_and_load_round_trip(tmp_path, samples):
+    table = fit_isotonic(*samples)
+    path = tmp_path / "calibration.json"
+    table.save(path)
+    loaded = CalibrationTable.load(path)
+    assert loaded.samples == table.samples
+    np.testing.assert_allclose(loaded.values, table.values, atol=1e-6)
+
+
+def test_scorer_uses_calibrated_score():
+    table = CalibrationTable(values=np.linspace(0.0, 0.5, 101))
+    scorer = ConfidenceScorer(calibration=table)
+    result = scorer.calculate(
+        intent_confidence=0.95,
+        response_certainty=0.9,
+        sentiment=0.5,
+        question_count=1,
+    )
+    assert result.overall >= 0.85
+    assert result.calibrated < 0.5
+    assert scorer.should_escalate(result)
+
+    batch = scorer.calculate_batch([0.95], [0.9], [0.5])
+    assert batch.calibrated[0] == result.calibrated
+    assert batch.escalate.tolist() == [True]
+
+
+@pytest.mark.asyncio
+async def test_load_outcomes_labels_tickets():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        tickets = [
+            ("t-ok", "resolved"),
+            ("t-human", "resolved"),
+            ("t-esc", "escalated"),
+            ("t-open", "in_progress"),
+        ]
+        for ticket_id, status in tickets:
+            session.add(Ticket(
+                id=ticket_id, source="api", customer_id="c", subject="s", body="b", status=status,
+            ))
+            session.add(Conversation(
+                id=f"{ticket_id}-a", ticket_id=ticket_id, role="agent", content="x", confidence=0.8,
+            ))
+        session.add(Escalation(id="t-human-esc", ticket_id="t-human", reason="manual"))
+        await session.commit()
+
+        scores, outcomes = await load_outcomes(session)
+
+    await engine.dispose()
+    assert len(scores) == 3
+    assert sorted(outcomes.tolist()) == [0.0, 0.0, 1.0]
+
+
+def test_scoring_does_not_import_database():
+    code = "import sys, src.services.confidence_scorer; print('src.models.database' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
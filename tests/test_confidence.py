@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 from src.services.confidence_scorer import ConfidenceScorer
 
 
@@ -74,3 +75,34 @@ def test_caveat_threshold(scorer):
     )
     assert not scorer.should_escalate(result)
     assert scorer.should_add_caveat(result)
+
+
+def test_batch_matches_scalar(scorer):
+    rng = np.random.default_rng(0)
+    n = 2000
+    intent = rng.uniform(0, 1, n)
+    certainty = rng.uniform(0.3, 1, n)
+    sentiment = rng.uniform(-1, 1, n)
+    questions = rng.integers(0, 6, n)
+
+    batch = scorer.calculate_batch(intent, certainty, sentiment, questions)
+
+    assert len(batch) == n
+    for i in range(n):
+        scalar = scorer.calculate(
+            intent_confidence=float(intent[i]),
+            response_certainty=float(certainty[i]),
+            sentiment=float(sentiment[i]),
+            question_count=int(questions[i]),
+        )
+        assert batch.sentiment_risk[i] == scalar.sentiment_risk
+        assert batch.complexity_factor[i] == scalar.complexity_factor
+        assert batch.overall[i] == scalar.overall
+        assert batch.escalate[i] == scorer.should_escalate(scalar)
+        assert batch.caveat[i] == scorer.should_add_caveat(scalar)
+
+
+def test_batch_broadcasts_scalar_question_count(scorer):
+    batch = scorer.calculate_batch([0.9, 0.4], [0.9, 0.5], [0.5, -0.5])
+    assert batch.complexity_factor.tolist() == [1.0, 1.0]
+    assert batch.escalate.tolist() == [False, True]
@@ -0,0 +1,89 @@
+from datetime import datetime
+
+import pytest
+
+from src.agents.specialists.billing_agent import BillingAgent
+from src.models.database import CustomerProfile
+from src.services.customers import CustomerContext, CustomerProfileCache, ProfileEvent, record_profile_event
+
+
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def test_events_accumulate_profile():
+    profile = CustomerContext(customer_id="c1")
+    for intent in ["a", "b", "c", "d", "e", "f"]:
+        ProfileEvent("c1", NOW, tickets_created=1, intent=intent, sentiment=-0.2).apply(profile)
+    ProfileEvent("c1", NOW, escalations=1, sentiment=-0.7).apply(profile)
+    ProfileEvent("c1", NOW, tickets_resolved=1).apply(profile)
+
+    assert profile.ticket_count == 6
+    assert profile.open_tickets == 5
+    assert profile.resolved_tickets == 1
+    assert profile.escalation_count == 1
+    assert profile.recent_intents == ["f", "e", "d", "c", "b"]
+    assert profile.last_sentiment == -0.7
+
+
+@pytest.mark.asyncio
+async def test_cache_is_bounded_and_tracks_writes(session_factory):
+    cache = CustomerProfileCache(max_size=2)
+    async with session_factory() as session:
+        event = ProfileEvent("c1", NOW, tickets_created=1, intent="billing.refund_request")
+        assert (await cache.get(session, "c1")).ticket_count == 0
+        with cache.writing(event):
+            await record_profile_event(session, event)
+            await session.commit()
+        assert (await cache.get(session, "c1")).ticket_count == 1
+
+        await cache.get(session, "c2")
+        await cache.get(session, "c3")
+        assert len(cache) == 2
+
+        row = await session.get(CustomerProfile, "c1")
+        assert row.ticket_count == 1
+        assert row.recent_intents == ["billing.refund_request"]
+
+
+@pytest.mark.asyncio
+async def test_load_overlapping_write_is_not_cached(session_factory):
+    cache = CustomerProfileCache()
+    event = ProfileEvent("c1", NOW, tickets_created=1)
+    async with session_factory() as reader, session_factory() as writer:
+        with cache.writing(event):
+            profile = await cache.get(reader, "c1")
+            await record_profile_event(writer, event)
+            await writer.commit()
+        assert profile.ticket_count == 0
+        assert len(cache) == 0
+        assert (await cache.get(reader, "c1")).ticket_count == 1
+
+
+def test_prompt_includes_customer_history():
+    agent = BillingAgent(client=None)
+    prompt = agent._build_system_prompt([], {"ticket_count": 3, "open_tickets": 1, "recent_intents": ["billing.refund_request"]})
+    assert "Previous tickets: 3" in prompt
+    assert "billing.refund_request" in prompt
+    assert "CUSTOMER HISTORY" not in agent._build_system_prompt([], {"ticket_count": 0})
+
+
+@pytest.mark.asyncio
+async def test_repeat_customer_gets_context(api_client, fake_router):
+    payload = {"customer_id": "repeat", "subject": "Refund", "body": "Please refund me."}
+    await api_client.post("/tickets", json=payload)
+    assert fake_router.last_ticket.customer_context is None
+
+    fake_router.response = fake_router.response.model_copy(update={"confidence": 0.4, "should_escalate": True})
+    second = (await api_client.post("/tickets", json=payload)).json()
+    assert fake_router.last_ticket.customer_context["ticket_count"] == 1
+
+    ticket = (await api_client.get(f"/tickets/{second['ticket_id']}")).json()
+    assert ticket["escalation"] is not None
+
+    await api_client.post(f"/tickets/{second['ticket_id']}/resolve", json={"resolution": "Done"})
+    await api_client.post("/tickets", json=payload)
+    context = fake_router.last_ticket.customer_context
+    assert context["ticket_count"] == 2
+    assert context["escalation_count"] == 1
+    assert context["open_tickets"] == 1
+    assert context["recent_intents"] == ["billing.refund_request"] * 2
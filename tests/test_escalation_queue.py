@@ -0,0 +1,192 @@
+from datetime import datetime, timedelta, timezone
+import time
+
+import pytest
+
+from src.api import main
+from src.models.database import Escalation, Ticket
+from src.services.escalation import EscalationManager, QueueEntry
+
+
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def entry(ticket_id: str, priority: int, minutes_ago: float = 0, domain: str = "technical") -> QueueEntry:
+    return QueueEntry(
+        escalation_id=f"{ticket_id}-esc",
+        ticket_id=ticket_id,
+        domain=domain,
+        priority=priority,
+        created_at=NOW - timedelta(minutes=minutes_ago),
+    )
+
+
+def test_orders_by_priority_and_ages_waiting_tickets():
+    manager = EscalationManager(aging_per_hour=10.0)
+    manager.add(entry("medium-old", 10, minutes_ago=90))
+    manager.add(entry("high-new", 20))
+    manager.add(entry("medium-new", 10))
+    manager.add(entry("billing-medium", 10, domain="billing"))
+
+    order = [e.ticket_id for e in manager.entries()]
+    assert order == ["medium-old", "high-new", "billing-medium", "medium-new"]
+    scores = [manager.score(e, NOW) for e in manager.entries()]
+    assert scores == sorted(scores, reverse=True)
+
+    assert manager.position("medium-new") == 4
+    assert manager.position("medium-new", domain="technical") == 3
+    assert manager.position("missing") is None
+
+
+def test_add_is_idempotent_per_ticket_and_remove_updates_positions():
+    manager = EscalationManager()
+    manager.add(entry("a", 30))
+    manager.add(entry("b", 20))
+    assert manager.add(QueueEntry("b-esc-2", "b", "technical", 39, NOW)) == 2
+    assert len(manager) == 2
+
+    manager.remove("a")
+    assert manager.position("b") == 1
+    assert manager.depth_by_domain() == {"technical": 1}
+    assert manager.remove("a") is None
+
+
+
+def test_sort_key_reads_created_at_as_utc(monkeypatch):
+    manager = EscalationManager(aging_per_hour=3600.0)
+    key = manager._sort_key(entry("a", 0))
+    assert key[0] == pytest.approx(NOW.replace(tzinfo=timezone.utc).timestamp())
+
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    try:
+        assert manager._sort_key(entry("a", 0)) == key
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+
+@pytest.mark.asyncio
+async def test_failed_claim_keeps_entry_queued():
+    class FailingSession:
+        async def execute(self, statement):
+            raise RuntimeError("database is locked")
+
+    manager = EscalationManager()
+    manager.add(entry("a", 10))
+    with pytest.raises(RuntimeError):
+        await manager.claim(FailingSession(), "bob")
+    assert manager.peek().ticket_id == "a"
+    assert len(manager) == 1
+
+async def seed(session_factory):
+    async with session_factory() as session:
+        for ticket_id, priority, minutes_ago, assignee in [
+            ("t1", 10, 5, None), ("t2", 30, 1, None), ("t3", 20, 2, "alice"),
+        ]:
+            session.add(Ticket(
+                id=ticket_id, source="api", customer_id="c1", subject="S", body="B",
+                status="escalated", routed_to="technical", priority=priority,
+            ))
+            session.add(Escalation(
+                id=f"{ticket_id}-esc", ticket_id=ticket_id, reason="r", context_package={},
+                human_assignee=assignee, created_at=datetime.utcnow() - timedelta(minutes=minutes_ago),
+            ))
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_load_and_claim(session_factory):
+    await seed(session_factory)
+    manager = EscalationManager()
+    async with session_factory() as session:
+        assert await manager.load(session) == 2
+
+        claimed = await manager.claim(session, "bob")
+        assert claimed.ticket_id == "t2"
+
+        # Claimed elsewhere since load: skipped, not handed out twice.
+        await session.execute(Escalation.__table__.update().values(human_assignee="carol"))
+        await session.commit()
+        assert await manager.claim(session, "bob") is None
+
+    async with session_factory() as session:
+        ticket = await session.get(Ticket, "t2")
+        escalation = await session.get(Escalation, "t2-esc")
+        assert ticket.assigned_to == "bob"
+        assert escalation.human_assignee == "carol"
+
+
+@pytest.mark.asyncio
+async def test_queue_position_in_sql_matches_memory_order(session_factory):
+    await seed(session_factory)
+    async with session_factory() as session:
+        session.add(Ticket(
+            id="t4", source="api", customer_id="c1", subject="S", body="B",
+            status="escalated", routed_to="billing", priority=10,
+        ))
+        session.add(Escalation(
+            id="t4-esc", ticket_id="t4", reason="r", context_package={}, created_at=datetime.utcnow(),
+        ))
+        await session.commit()
+
+        memory = EscalationManager()
+        await memory.load(session)
+        manager = EscalationManager()
+        for e in memory.entries():
+            assert await manager.queue_position(session, e.escalation_id) == memory.position(e.ticket_id)
+        assert await manager.queue_position(session, "t3-esc") is None
+    assert len(manager) == 0
+
+
+@pytest.mark.asyncio
+async def test_escalation_endpoints(api_client, fake_router, monkeypatch):
+    monkeypatch.setattr(main, "escalation_manager", EscalationManager())
+    payload = {"customer_id": "c1", "subject": "Refund", "body": "Please refund me."}
+    first = (await api_client.post("/tickets", json=payload)).json()
+    second = (await api_client.post("/tickets", json=payload)).json()
+
+    escalated = (await api_client.post(f"/tickets/{first['ticket_id']}/escalate", json={"reason": "VIP"})).json()
+    assert escalated["queue_position"] == 1
+    escalated = (await api_client.post(f"/tickets/{second['ticket_id']}/escalate", json={"reason": "VIP"})).json()
+    assert escalated["queue_position"] == 2
+
+    backlog = (await api_client.get("/escalations/backlog")).json()
+    assert backlog["total"] == 2
+    assert backlog["by_domain"] == {"billing": 2}
+    assert [e["ticket_id"] for e in backlog["entries"]] == [first["ticket_id"], second["ticket_id"]]
+
+    claimed = (await api_client.post("/escalations/claim", json={"assignee": "alice"})).json()
+    assert claimed["ticket_id"] == first["ticket_id"]
+    ticket = (await api_client.get(f"/tickets/{first['ticket_id']}")).json()
+    assert ticket["ticket"]["assigned_to"] == "alice"
+
+    await api_client.post(f"/tickets/{second['ticket_id']}/resolve", json={"resolution": "Done"})
+    assert (await api_client.post("/escalations/claim", json={"assignee": "alice"})).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_multi_worker_queue_is_read_from_sqlite(api_client, fake_router, session_factory, monkeypatch):
+    monkeypatch.setattr(main, "escalation_manager", EscalationManager())
+    monkeypatch.setattr(main, "multi_worker", True)
+    # Escalated and later claimed by other worker processes.
+    await seed(session_factory)
+
+    backlog = (await api_client.get("/escalations/backlog")).json()
+    assert [e["ticket_id"] for e in backlog["entries"]] == ["t2", "t1"]
+
+    async with session_factory() as session:
+        await session.execute(
+            Escalation.__table__.update().where(Escalation.id == "t2-esc").values(human_assignee="carol")
+        )
+        await session.commit()
+    claimed = (await api_client.post("/escalations/claim", json={"assignee": "bob"})).json()
+    assert claimed["ticket_id"] == "t1"
+    assert (await api_client.get("/escalations/backlog")).json()["total"] == 0
+
+    # Escalating ranks in SQL without reloading this worker's queue.
+    payload = {"customer_id": "c1", "subject": "Refund", "body": "Please refund me."}
+    ticket = (await api_client.post("/tickets", json=payload)).json()
+    escalated = (await api_client.post(f"/tickets/{ticket['ticket_id']}/escalate", json={"reason": "VIP"})).json()
+    assert escalated["queue_position"] == 1
+    assert len(main.escalation_manager) == 0
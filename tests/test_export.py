@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+import json
+
+import pytest
+
+from src.api import main
+from src.models.archive import TranscriptArchive, archive_resolved
+from src.models.database import Conversation, Escalation, Ticket
+from src.models.repository import TicketFilter
+from src.services.export import export_tickets
+
+
+START = datetime(2024, 1, 1, 12, 0, 0)
+
+
+async def seed(session_factory, count: int = 7):
+    async with session_factory() as session:
+        for i in range(count):
+            ticket_id = f"t{i}"
+            session.add(Ticket(
+                id=ticket_id, source="api", customer_id="c1", subject=f"S{i}", body="B",
+                status="resolved" if i % 2 else "escalated",
+                created_at=START + timedelta(hours=i),
+                resolved_at=START + timedelta(hours=i, minutes=30) if i % 2 else None,
+            ))
+            for j in range(2):
+                session.add(Conversation(
+                    id=f"{ticket_id}-m{j}", ticket_id=ticket_id, role="customer" if j == 0 else "agent",
+                    content=f"turn {j}", created_at=START + timedelta(hours=i, minutes=j),
+                ))
+            if i % 2 == 0:
+                session.add(Escalation(
+                    id=f"{ticket_id}-esc", ticket_id=ticket_id, reason="Low confidence",
+                    context_package={}, created_at=START + timedelta(hours=i),
+                ))
+        await session.commit()
+
+
+async def collect(session_factory, **kwargs) -> list[dict]:
+    async with session_factory() as session:
+        return [doc async for doc in export_tickets(session, **kwargs)]
+
+
+@pytest.mark.asyncio
+async def test_export_streams_children_in_chunks(session_factory):
+    await seed(session_factory)
+    documents = await collect(session_factory, chunk_size=3)
+
+    assert [d["id"] for d in documents] == [f"t{i}" for i in range(7)]
+    assert all(len(d["conversations"]) == 2 for d in documents)
+    assert [len(d["escalations"]) for d in documents] == [1, 0, 1, 0, 1, 0, 1]
+
+
+@pytest.mark.asyncio
+async def test_export_filters_and_resumes(session_factory):
+    await seed(session_factory)
+    filters = TicketFilter(status="resolved", created_after=START + timedelta(hours=2))
+    first = await collect(session_factory, filters=filters, chunk_size=2)
+    assert [d["id"] for d in first] == ["t3", "t5"]
+
+    rest = await collect(session_factory, filters=filters, cursor=first[0]["cursor"])
+    assert [d["id"] for d in rest] == ["t5"]
+
+
+@pytest.mark.asyncio
+async def test_export_includes_archived_turns(session_factory, tmp_path):
+    await seed(session_factory, count=2)
+    archive = TranscriptArchive(tmp_path)
+    async with session_factory() as session:
+        await archive_resolved(session, archive, START + timedelta(days=1))
+
+    documents = await collect(session_factory, archive=archive)
+    assert [c["id"] for c in documents[1]["conversations"]] == ["t1-m0", "t1-m1"]
+
+
+@pytest.mark.asyncio
+async def test_export_endpoint(api_client, session_factory, monkeypatch):
+    await seed(session_factory)
+    monkeypatch.setattr(main, "transcript_archive", None)
+
+    response = await api_client.get("/export/tickets", params={"status": "escalated"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [d["id"] for d in lines] == ["t0", "t2", "t4", "t6"]
+
+    response = await api_client.get("/export/tickets", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
@@ -0,0 +1,215 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+
+from src.api import main
+from src.models.database import AppliedWrite, Conversation, Ticket
+from src.services.customers import profile_cache
+from src.services.journal import WriteBehindWriter, WriteJournal
+from src.services.writes import WriteRecord
+
+
+def ticket_record(ticket_id: str) -> WriteRecord:
+    record = WriteRecord("create_ticket").touch(ticket=ticket_id)
+    record.insert(
+        Ticket,
+        id=ticket_id,
+        source="api",
+        customer_id="cust-1",
+        subject="Subject",
+        body="Body",
+        status="open",
+        created_at=datetime(2024, 5, 1, 12, 30),
+    )
+    return record
+
+
+async def count(session_factory, model) -> int:
+    async with session_factory() as session:
+        return (await session.execute(select(func.count()).select_from(model))).scalar_one()
+
+
+@pytest_asyncio.fixture
+async def write_behind(session_factory, tmp_path, monkeypatch):
+    writer = WriteBehindWriter(WriteJournal(tmp_path / "journal", fsync=False), session_factory)
+    await writer.start()
+    monkeypatch.setattr(main, "write_behind", writer)
+    monkeypatch.setattr(profile_cache, "before_load", main.flush_customer_writes)
+    yield writer
+    await writer.stop()
+
+
+def test_record_round_trips_through_json():
+    record = ticket_record("t-1").update(Ticket, "t-1", status="resolved")
+    restored = WriteRecord.from_json(record.to_json())
+
+    assert restored == record
+    assert restored.ops[0]["values"]["created_at"] == datetime(2024, 5, 1, 12, 30)
+
+
+@pytest.mark.asyncio
+async def test_flush_waits_for_commit(session_factory, tmp_path):
+    writer = WriteBehindWriter(WriteJournal(tmp_path, fsync=False), session_factory, max_delay_ms=10_000)
+    await writer.start()
+    try:
+        await writer.submit(ticket_record("t-1"))
+        assert await count(session_factory, Ticket) == 0
+
+        await writer.flush("ticket:t-1")
+        assert await count(session_factory, Ticket) == 1
+        assert writer.pending == 0
+    finally:
+        await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submits_share_an_fsync(session_factory, tmp_path, monkeypatch):
+    journal = WriteJournal(tmp_path, fsync=False)
+    writer = WriteBehindWriter(journal, session_factory, max_delay_ms=10_000)
+    batches = []
+    append_many = journal.append_many
+    monkeypatch.setattr(journal, "append_many", lambda records: batches.append(len(records)) or append_many(records))
+    await writer.start()
+    try:
+        await asyncio.gather(*(writer.submit(ticket_record(f"t-{i}")) for i in range(10)))
+        assert sum(batches) == 10
+        assert len(batches) < 10
+        assert writer.pending == 10
+        assert len(journal.read()) == 10
+    finally:
+        await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_flush_times_out_when_database_is_unavailable(session_factory, tmp_path, monkeypatch):
+    writer = WriteBehindWriter(
+        WriteJournal(tmp_path, fsync=False), session_factory, max_delay_ms=10_000, flush_timeout_ms=50
+    )
+    await writer.start()
+    try:
+        await writer.submit(ticket_record("t-1"))
+
+        async def locked(records):
+            raise OperationalError("INSERT", {}, Exception("database is locked"))
+
+        monkeypatch.setattr(writer, "_commit", locked)
+        with pytest.raises(asyncio.TimeoutError):
+            await writer.flush("ticket:t-1")
+        assert writer.pending == 1
+    finally:
+        monkeypatch.undo()
+        await writer.stop()
+    assert await count(session_factory, Ticket) == 1
+
+
+@pytest.mark.asyncio
+async def test_replay_after_crash_applies_once(session_factory, tmp_path):
+    committed = ticket_record("t-1")
+    journal = WriteJournal(tmp_path, fsync=False)
+    journal.open()
+    journal.append(committed)
+    journal.append(ticket_record("t-2"))
+    journal.close()
+
+    # The first record reached the database before the crash, the second did not.
+    async with session_factory() as session:
+        await committed.apply(session)
+        session.add(AppliedWrite(id=committed.id))
+        await session.commit()
+
+    writer = WriteBehindWriter(WriteJournal(tmp_path, fsync=False), session_factory)
+    assert await writer.start() == 2
+    await writer.stop()
+
+    assert await count(session_factory, Ticket) == 2
+    assert writer.failed == 0
+
+
+@pytest.mark.asyncio
+async def test_torn_tail_is_ignored(session_factory, tmp_path):
+    journal = WriteJournal(tmp_path, fsync=False)
+    journal.open()
+    journal.append(ticket_record("t-1"))
+    journal.close()
+    with open(journal.path(1), "a", encoding="utf-8") as f:
+        f.write(ticket_record("t-2").to_json()[:40])
+
+    writer = WriteBehindWriter(WriteJournal(tmp_path, fsync=False), session_factory)
+    assert await writer.start() == 1
+    await writer.stop()
+
+    assert await count(session_factory, Ticket) == 1
+
+
+@pytest.mark.asyncio
+async def test_finished_segments_are_discarded(session_factory, tmp_path):
+    journal = WriteJournal(tmp_path, segment_bytes=1, fsync=False)
+    writer = WriteBehindWriter(journal, session_factory)
+    await writer.start()
+    try:
+        for i in range(3):
+            await writer.submit(ticket_record(f"t-{i}"))
+        await writer.flush()
+        assert journal.segments() == [journal.segment]
+        assert await count(session_factory, AppliedWrite) == 0
+    finally:
+        await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_bad_record_is_dead_lettered(session_factory, tmp_path):
+    writer = WriteBehindWriter(WriteJournal(tmp_path, fsync=False), session_factory)
+    await writer.start()
+    try:
+        await writer.submit(ticket_record("t-1"))
+        await writer.submit(ticket_record("t-1"))
+        await writer.submit(ticket_record("t-2"))
+        await writer.flush()
+    finally:
+        await writer.stop()
+
+    assert writer.failed == 1
+    assert await count(session_factory, Ticket) == 2
+    assert (tmp_path / "journal-failed.jsonl").read_text().count("\n") == 1
+
+
+@pytest.mark.asyncio
+async def test_api_reads_its_own_deferred_writes(api_client, fake_router, write_behind, session_factory):
+    response = await api_client.post("/tickets", json={
+        "source": "api",
+        "customer_id": "cust-1",
+        "subject": "Refund",
+        "body": "Please refund my last invoice.",
+    })
+    ticket_id = response.json()["ticket_id"]
+
+    detail = (await api_client.get(f"/tickets/{ticket_id}")).json()
+    assert [c["role"] for c in detail["conversations"]] == ["customer", "agent"]
+
+    await api_client.post(f"/tickets/{ticket_id}/message", json={"content": "Any update?"})
+    profile_cache.clear()
+    await api_client.post("/tickets", json={
+        "source": "api",
+        "customer_id": "cust-1",
+        "subject": "Another",
+        "body": "Second ticket.",
+    })
+
+    assert fake_router.last_ticket.customer_context["ticket_count"] == 1
+    await write_behind.flush()
+    assert await count(session_factory, Conversation) == 6
+
+
+@pytest.mark.asyncio
+async def test_api_answers_503_when_pending_writes_time_out(api_client, fake_router, write_behind, monkeypatch):
+    response = await api_client.post("/tickets", json={"customer_id": "cust-1", "subject": "Refund", "body": "Help"})
+
+    async def timeout(*keys):
+        raise asyncio.TimeoutError
+
+    monkeypatch.setattr(write_behind, "flush", timeout)
+    assert (await api_client.get(f"/tickets/{response.json()['ticket_id']}")).status_code == 503
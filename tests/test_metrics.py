@@ -0,0 +1,96 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from src.api.main import app
+from src.services.metrics import (
+    MetricsRegistry,
+    MultiprocessMetrics,
+    reset_metrics_directory,
+    retire_worker_metrics,
+)
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    histogram = registry.histogram("stage_seconds", "Stage latency.", ("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="retrieval")
+    histogram.observe(0.5, stage="retrieval")
+    histogram.observe(3.0, stage="retrieval")
+
+    text = registry.render()
+    assert 'stage_seconds_bucket{stage="retrieval",le="0.1"} 1' in text
+    assert 'stage_seconds_bucket{stage="retrieval",le="1"} 2' in text
+    assert 'stage_seconds_bucket{stage="retrieval",le="+Inf"} 3' in text
+    assert 'stage_seconds_count{stage="retrieval"} 3' in text
+    assert histogram.count(stage="retrieval") == 3
+
+
+def test_timer_records_observation(registry):
+    histogram = registry.histogram("db_seconds", "DB latency.", ("operation",))
+    with histogram.time(operation="commit"):
+        pass
+    assert histogram.count(operation="commit") == 1
+
+
+def test_counter_render(registry):
+    counter = registry.counter("escalations_total", "Escalations.", ("trigger",))
+    counter.inc(trigger="auto")
+    counter.inc(2, trigger="auto")
+    assert counter.value(trigger="auto") == 3
+    assert "# TYPE escalations_total counter" in registry.render()
+    assert 'escalations_total{trigger="auto"} 3' in registry.render()
+
+
+def test_duplicate_metric_rejected(registry):
+    registry.counter("dup_total", "Dup.")
+    with pytest.raises(ValueError):
+        registry.counter("dup_total", "Dup.")
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "support_stage_duration_seconds" in response.text
+
+
+def worker_registry(escalations: int, latency: float) -> MetricsRegistry:
+    registry = MetricsRegistry()
+    registry.counter("escalations_total", "Escalations.", ("trigger",)).inc(escalations, trigger="auto")
+    registry.histogram("stage_seconds", "Stage latency.", ("stage",), buckets=(0.1, 1.0)).observe(
+        latency, stage="retrieval"
+    )
+    return registry
+
+
+def test_multiprocess_metrics_sum_every_worker(tmp_path):
+    first = MultiprocessMetrics(tmp_path, worker_registry(2, 0.05), pid=101)
+    second = MultiprocessMetrics(tmp_path, worker_registry(3, 0.5), pid=102)
+    first.write()
+
+    text = second.render()
+    assert 'escalations_total{trigger="auto"} 5' in text
+    assert 'stage_seconds_bucket{stage="retrieval",le="0.1"} 1' in text
+    assert 'stage_seconds_count{stage="retrieval"} 2' in text
+
+
+def test_retired_worker_metrics_stay_counted(tmp_path):
+    first = MultiprocessMetrics(tmp_path, worker_registry(2, 0.05), pid=101)
+    second = MultiprocessMetrics(tmp_path, worker_registry(3, 0.5), pid=102)
+    first.write()
+    second.write()
+
+    retire_worker_metrics(tmp_path, 101, registry=worker_registry(0, 0.0))
+    retire_worker_metrics(tmp_path, 101, registry=worker_registry(0, 0.0))
+    assert not (tmp_path / "worker-101.json").exists()
+    assert 'escalations_total{trigger="auto"} 5' in second.render()
+
+    reset_metrics_directory(tmp_path)
+    assert list(tmp_path.glob("*.json")) == []
@@ -0,0 +1,157 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.models.database import init_db
+from src.models.migrations import MIGRATIONS
+
+
+LEGACY_SCHEMA = [
+    "CREATE TABLE tickets (id VARCHAR(36) PRIMARY KEY, source VARCHAR(50), customer_id VARCHAR(100), "
+    "subject TEXT, body TEXT, sentiment FLOAT, urgency VARCHAR(20), intent VARCHAR(100), "
+    "intent_confidence FLOAT, status VARCHAR(50), assigned_to VARCHAR(100), metadata JSON, "
+    "created_at DATETIME, resolved_at DATETIME)",
+    "CREATE TABLE conversations (id VARCHAR(36) PRIMARY KEY, ticket_id VARCHAR(36) REFERENCES tickets(id), "
+    "role VARCHAR(20), content TEXT, confidence FLOAT, created_at DATETIME)",
+    "CREATE TABLE escalations (id VARCHAR(36) PRIMARY KEY, ticket_id VARCHAR(36) REFERENCES tickets(id), "
+    "reason TEXT, context_package JSON, human_assignee VARCHAR(100), resolution TEXT, "
+    "feedback_captured BOOLEAN, created_at DATETIME)",
+    "INSERT INTO tickets (id, status, customer_id, metadata) VALUES ('legacy', 'open', 'c1', '{}')",
+    "INSERT INTO tickets (id, status, customer_id, urgency, sentiment, metadata) "
+    "VALUES ('routed', 'escalated', 'c2', 'high', -1.0, '{\"routed_to\": \"billing\"}')",
+]
+
+
+async def query_plan(conn, sql: str) -> str:
+    rows = (await conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+@pytest_asyncio.fixture
+async def legacy_engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/support.db")
+    async with engine.begin() as conn:
+        for statement in LEGACY_SCHEMA:
+            await conn.execute(text(statement))
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_migrations_upgrade_existing_database_in_place(legacy_engine):
+    await init_db(legacy_engine)
+
+    async with legacy_engine.connect() as conn:
+        versions = (await conn.execute(text("SELECT version FROM schema_version ORDER BY version"))).scalars().all()
+        assert versions == [m.version for m in MIGRATIONS]
+        rows = (await conn.execute(text("SELECT id, routed_to, priority FROM tickets ORDER BY id"))).all()
+        assert [tuple(r) for r in rows] == [("legacy", None, 10), ("routed", "billing", 29)]
+
+
+@pytest.mark.asyncio
+async def test_migrations_are_idempotent(legacy_engine):
+    await init_db(legacy_engine)
+    await init_db(legacy_engine)
+
+    async with legacy_engine.connect() as conn:
+        count = (await conn.execute(text("SELECT COUNT(*) FROM schema_version"))).scalar_one()
+    assert count == len(MIGRATIONS)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sql,index", [
+    ("SELECT * FROM conversations WHERE ticket_id = 'x' ORDER BY created_at", "ix_conversations_ticket_created"),
+    ("SELECT * FROM escalations WHERE ticket_id = 'x'", "ix_escalations_ticket"),
+    ("SELECT * FROM tickets WHERE status = 'escalated' ORDER BY created_at", "ix_tickets_status_created"),
+    ("SELECT * FROM tickets WHERE customer_id = 'c1' ORDER BY created_at", "ix_tickets_customer_created"),
+    ("SELECT * FROM tickets WHERE routed_to = 'billing' ORDER BY created_at DESC, id DESC", "ix_tickets_routed_created"),
+    ("SELECT * FROM tickets ORDER BY created_at DESC, id DESC LIMIT 50", "ix_tickets_created"),
+    (
+        "SELECT * FROM tickets WHERE status = 'escalated' ORDER BY priority DESC, created_at, id LIMIT 50",
+        "ix_tickets_status_priority",
+    ),
+])
+async def test_hot_queries_use_indexes(legacy_engine, sql, index):
+    await init_db(legacy_engine)
+
+    async with legacy_engine.connect() as conn:
+        plan = await query_plan(conn, sql)
+    assert f"USING INDEX {index}" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.asyncio
+async def test_analytics_summary_uses_covering_index(legacy_engine):
+    await init_db(legacy_engine)
+
+    async with legacy_engine.connect() as conn:
+        plan = await query_plan(
+            conn,
+            "SELECT status, routed_to, COUNT(*), SUM(intent_confidence) FROM tickets GROUP BY status, routed_to",
+        )
+    assert "USING COVERING INDEX ix_tickets_status_routed" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.asyncio
+async def test_migration_backfills_profiles(legacy_engine):
+    async with legacy_engine.begin() as conn:
+        await conn.execute(text(
+            "INSERT INTO tickets (id, status, customer_id, intent, sentiment, metadata, created_at) VALUES "
+            "('t1', 'resolved', 'c9', 'billing.refund_request', -0.2, '{}', '2024-01-01 10:00:00'), "
+            "('t2', 'escalated', 'c9', 'technical.bug_report', -0.8, '{}', '2024-01-02 10:00:00')"
+        ))
+        await conn.execute(text("INSERT INTO escalations (id, ticket_id, reason) VALUES ('e1', 't2', 'r')"))
+    await init_db(legacy_engine)
+
+    async with legacy_engine.connect() as conn:
+        row = (await conn.execute(text(
+            "SELECT ticket_count, open_tickets, resolved_tickets, escalation_count, recent_intents, last_sentiment "
+            "FROM customer_profiles WHERE customer_id = 'c9'"
+        ))).one()
+    assert tuple(row[:4]) == (2, 1, 1, 1)
+    assert row[4] == '["technical.bug_report","billing.refund_request"]'
+    assert row[5] == -0.8
+
+
+@pytest.mark.asyncio
+async def test_migration_backfills_rollups_before_first_live_hour(legacy_engine):
+    async with legacy_engine.begin() as conn:
+        await conn.execute(text(
+            "INSERT INTO tickets (id, status, customer_id, intent, intent_confidence, metadata, created_at, resolved_at) "
+            "VALUES ('t1', 'resolved', 'c9', 'billing.refund_request', 0.8, '{\"routed_to\": \"billing\"}', "
+            "'2024-01-01 10:05:00', '2024-01-01 12:05:00'), "
+            "('t2', 'escalated', 'c9', 'billing.refund_request', 0.4, '{\"routed_to\": \"billing\"}', "
+            "'2024-01-01 10:30:00', NULL)"
+        ))
+        await conn.execute(text(
+            "INSERT INTO escalations (id, ticket_id, reason, created_at) VALUES ('e1', 't2', 'r', '2024-01-01 10:30:00')"
+        ))
+        await conn.execute(text(
+            "INSERT INTO conversations (id, ticket_id, role, content, created_at) "
+            "VALUES ('m1', 't1', 'customer', 'Any update?', '2024-01-01 11:00:00')"
+        ))
+        await conn.execute(text(
+            "CREATE TABLE analytics_rollups (hour DATETIME, domain VARCHAR(50), intent VARCHAR(100), "
+            "status VARCHAR(50), tickets_created INTEGER, messages INTEGER, escalations INTEGER, resolutions INTEGER, "
+            "confidence_sum FLOAT, confidence_count INTEGER, resolution_seconds_sum FLOAT, "
+            "PRIMARY KEY (hour, domain, intent, status))"
+        ))
+        await conn.execute(text(
+            "INSERT INTO analytics_rollups VALUES "
+            "('2024-01-01 12:00:00.000000', 'billing', 'billing.refund_request', 'resolved', 0, 0, 0, 1, 0, 0, 7200)"
+        ))
+    await init_db(legacy_engine)
+
+    async with legacy_engine.connect() as conn:
+        rows = (await conn.execute(text(
+            "SELECT hour, status, tickets_created, messages, escalations, resolutions, confidence_sum, confidence_count "
+            "FROM analytics_rollups ORDER BY hour, status"
+        ))).all()
+    assert [tuple(r) for r in rows] == [
+        ("2024-01-01 10:00:00.000000", "escalated", 1, 0, 1, 0, pytest.approx(0.4), 1),
+        ("2024-01-01 10:00:00.000000", "in_progress", 1, 0, 0, 0, pytest.approx(0.8), 1),
+        ("2024-01-01 11:00:00.000000", "in_progress", 0, 1, 0, 0, 0.0, 0),
+        ("2024-01-01 12:00:00.000000", "resolved", 0, 0, 0, 1, 0.0, 0),
+    ]
@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from src.models.database import Conversation, Escalation, Ticket
+from src.models.repository import TicketRepository, decode_cursor, encode_cursor
+
+
+async def seed(session_factory, turns: int = 5, escalations: int = 2):
+    start = datetime(2024, 1, 1, 12, 0, 0)
+    async with session_factory() as session:
+        session.add(Ticket(id="t1", source="api", customer_id="c1", subject="S", body="B", created_at=start))
+        for i in range(turns):
+            session.add(Conversation(
+                id=f"m{i}",
+                ticket_id="t1",
+                role="customer" if i % 2 == 0 else "agent",
+                content=f"turn {i}",
+                created_at=start + timedelta(minutes=i),
+            ))
+        for i in range(escalations):
+            session.add(Escalation(
+                id=f"e{i}",
+                ticket_id="t1",
+                reason=f"reason {i}",
+                context_package={},
+                created_at=start + timedelta(hours=i),
+            ))
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_page_loads_in_one_statement(session_factory):
+    await seed(session_factory)
+    statements = []
+
+    async with session_factory() as session:
+        engine = session.bind.sync_engine
+        listener = lambda *args: statements.append(args[2])
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            page = await TicketRepository(session).get_with_conversations("t1", limit=3)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+    assert len(statements) == 1
+    assert [c.id for c in page.conversations] == ["m0", "m1", "m2"]
+    assert [e.id for e in page.escalations] == ["e0", "e1"]
+    assert page.next_cursor is not None
+
+
+@pytest.mark.asyncio
+async def test_cursor_walks_all_turns(session_factory):
+    await seed(session_factory, turns=7)
+    seen = []
+    cursor = None
+    async with session_factory() as session:
+        repo = TicketRepository(session)
+        while True:
+            page = await repo.get_with_conversations("t1", limit=3, cursor=cursor)
+            seen.extend(c.id for c in page.conversations)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+    assert seen == [f"m{i}" for i in range(7)]
+
+
+@pytest.mark.asyncio
+async def test_missing_ticket_and_bad_cursor(session_factory):
+    async with session_factory() as session:
+        repo = TicketRepository(session)
+        assert await repo.get_with_conversations("nope") is None
+        with pytest.raises(ValueError):
+            await repo.get_with_conversations("t1", cursor="not-a-cursor")
+
+
+def test_cursor_round_trip():
+    created = datetime(2024, 5, 1, 8, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(created, "abc|def")) == (created, "abc|def")
+
+
+@pytest.mark.asyncio
+async def test_get_ticket_endpoint_paginates(api_client, session_factory):
+    await seed(session_factory, turns=4)
+
+    first = (await api_client.get("/tickets/t1", params={"limit": 3})).json()
+    assert [c["content"] for c in first["conversations"]] == ["turn 0", "turn 1", "turn 2"]
+    assert len(first["escalations"]) == 2
+    assert first["escalation"]["reason"] == "reason 1"
+
+    second = (await api_client.get("/tickets/t1", params={"limit": 3, "cursor": first["next_cursor"]})).json()
+    assert [c["content"] for c in second["conversations"]] == ["turn 3"]
+    assert second["next_cursor"] is None
+
+    assert (await api_client.get("/tickets/t1", params={"cursor": "garbage"})).status_code == 400
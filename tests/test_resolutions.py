@@ -0,0 +1,213 @@
+from datetime import datetime, timedelta
+import threading
+
+import numpy as np
+import pytest
+
+from src.api import main
+from src.knowledge import KnowledgeBase, KnowledgeIngester, Resolution, ResolutionPipeline
+from src.services.resolution_feed import ResolutionFeed
+
+
+class FakeKnowledgeBase:
+    def __init__(self):
+        self.collections: dict[str, dict[str, tuple[np.ndarray, str]]] = {}
+        self.embed_calls = 0
+
+    async def embed(self, texts):
+        self.embed_calls += 1
+        vectors = np.zeros((len(texts), 8), dtype=np.float32)
+        for row, text in enumerate(texts):
+            answer = text.rsplit("A:", 1)[-1].lower()
+            vectors[row, 0] = "refund" in answer
+            vectors[row, 1] = "reinstall" in answer
+            vectors[row, 2] = "password" in answer
+            vectors[row, 3] = 0.1
+        return vectors
+
+    async def nearest_scores(self, collection, embeddings):
+        stored = [v for v, _ in self.collections.get(collection, {}).values()]
+        if not stored:
+            return [0.0] * len(embeddings)
+        matrix = np.stack(stored)
+        matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+        unit = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return list((unit @ matrix.T).max(axis=1))
+
+    async def upsert_embeddings(self, collection, ids, embeddings, documents, metadatas):
+        coll = self.collections.setdefault(collection, {})
+        for item_id, vector, document in zip(ids, embeddings, documents):
+            coll[item_id] = (vector, document)
+
+
+def resolution(ticket_id: str, answer: str, domain: str = "billing") -> Resolution:
+    return Resolution(
+        ticket_id=ticket_id,
+        domain=domain,
+        subject="Help needed",
+        body="Something is wrong with my account.",
+        resolution=answer,
+    )
+
+
+def test_resolution_document_is_question_answer():
+    doc = resolution("t1", "Issued a refund.").to_document()
+    assert doc.content == "Q: Help needed\nSomething is wrong with my account.\nA: Issued a refund."
+    assert doc.source == "resolution:t1"
+    assert doc.metadata["ticket_id"] == "t1"
+
+
+@pytest.mark.asyncio
+async def test_batch_dedupes_within_batch_and_against_collection():
+    kb = FakeKnowledgeBase()
+    pipeline = ResolutionPipeline(KnowledgeIngester(kb))
+
+    ingested = await pipeline.process_batch([
+        resolution("t1", "Issued a refund."),
+        resolution("t2", "Processed the refund again."),
+        resolution("t3", "Reinstall the app.", domain="technical"),
+    ])
+    assert ingested == 2
+    assert pipeline.duplicates == 1
+    assert set(kb.collections) == {"billing_knowledge", "technical_knowledge"}
+
+    assert await pipeline.process_batch([resolution("t4", "Refund sent."), resolution("t5", "Reset the password.")]) == 1
+    assert len(kb.collections["billing_knowledge"]) == 2
+    assert pipeline.duplicates == 2
+
+
+@pytest.mark.asyncio
+async def test_knowledge_base_nearest_scores(tmp_path):
+    kb = KnowledgeBase(persist_directory=str(tmp_path))
+    query = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], dtype=np.float32)
+    assert await kb.nearest_scores("billing_knowledge", query) == [0.0, 0.0]
+
+    await KnowledgeIngester(kb).upsert_documents(
+        [resolution("t1", "Refund.").to_document()], "billing_knowledge", query[:1]
+    )
+    scores = await kb.nearest_scores("billing_knowledge", query)
+    assert scores[0] == pytest.approx(1.0, abs=1e-5)
+    assert scores[1] == pytest.approx(0.0, abs=1e-5)
+
+
+
+@pytest.mark.asyncio
+async def test_knowledge_base_calls_chroma_off_the_event_loop(tmp_path, monkeypatch):
+    kb = KnowledgeBase(persist_directory=str(tmp_path))
+    loop_thread = threading.get_ident()
+    threads = []
+    real = KnowledgeBase.get_or_create_collection
+
+    def spy(self, name):
+        coll = real(self, name)
+        for method in ("count", "query", "upsert"):
+            original = getattr(coll, method)
+
+            def call(*args, _original=original, **kwargs):
+                threads.append(threading.get_ident())
+                return _original(*args, **kwargs)
+
+            monkeypatch.setattr(coll, method, call, raising=False)
+        return coll
+
+    monkeypatch.setattr(KnowledgeBase, "get_or_create_collection", spy)
+    query = np.array([[1.0, 0.0, 0.0]], dtype=np.float32)
+    await KnowledgeIngester(kb).upsert_documents(
+        [resolution("t1", "Refund.").to_document()], "billing_knowledge", query
+    )
+    await kb.nearest_scores("billing_knowledge", query)
+    assert len(threads) == 3
+    assert loop_thread not in threads
+
+@pytest.mark.asyncio
+async def test_worker_batches_submissions():
+    kb = FakeKnowledgeBase()
+    pipeline = ResolutionPipeline(KnowledgeIngester(kb), batch_size=8, max_delay=0.05)
+    await pipeline.start()
+    for i, answer in enumerate(["Refund issued.", "Reinstall it.", "Reset the password."]):
+        assert pipeline.submit(resolution(f"t{i}", answer))
+    await pipeline.stop()
+
+    assert pipeline.ingested == 3
+    assert kb.embed_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_submissions_before_start_are_kept():
+    pipeline = ResolutionPipeline(None, max_delay=0.01)
+    assert pipeline.submit(resolution("t1", "Refund issued."))
+
+    kb = FakeKnowledgeBase()
+    pipeline.ingester = KnowledgeIngester(kb)
+    await pipeline.start()
+    await pipeline.stop()
+    assert pipeline.ingested == 1
+    (stored,) = kb.collections["billing_knowledge"].values()
+    assert stored[1].endswith("A: Refund issued.")
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_instead_of_blocking():
+    pipeline = ResolutionPipeline(KnowledgeIngester(FakeKnowledgeBase()), max_pending=1)
+    assert pipeline.submit(resolution("t1", "Refund."))
+    assert not pipeline.submit(resolution("t2", "Refund."))
+
+
+@pytest.mark.asyncio
+async def test_resolve_queues_resolution(api_client, fake_router, monkeypatch):
+    pipeline = ResolutionPipeline(KnowledgeIngester(FakeKnowledgeBase()))
+    monkeypatch.setattr(main, "resolution_pipeline", pipeline)
+
+    created = (await api_client.post("/tickets", json={"customer_id": "c1", "subject": "Refund", "body": "Help"})).json()
+    await api_client.post(f"/tickets/{created['ticket_id']}/resolve", json={"resolution": "Refunded."})
+
+    queued = pipeline._queue.get_nowait()
+    assert queued.ticket_id == created["ticket_id"]
+    assert queued.collection == "billing_knowledge"
+    assert queued.resolution == "Refunded."
+
+
+@pytest.mark.asyncio
+async def test_batch_indexes_similar_tickets_for_every_domain():
+    class Recorder:
+        def __init__(self):
+            self.added = []
+
+        async def add_resolutions(self, resolutions):
+            self.added.extend(resolutions)
+
+    kb = FakeKnowledgeBase()
+    similar = Recorder()
+    pipeline = ResolutionPipeline(KnowledgeIngester(kb), similar_tickets=similar)
+
+    assert await pipeline.process_batch([resolution("t1", "Refund."), resolution("t2", "Escalated.", domain="unknown")]) == 1
+    assert [r[0] for r in similar.added] == ["t1", "t2"]
+    assert set(kb.collections) == {"billing_knowledge"}
+
+
+@pytest.mark.asyncio
+async def test_feed_follows_resolved_tickets(api_client, fake_router, session_factory):
+    batches = []
+
+    async def handle(resolutions):
+        batches.append(resolutions)
+
+    feed = ResolutionFeed(session_factory, handle, since=datetime.utcnow() - timedelta(minutes=1), batch_size=2)
+    ids = []
+    for i in range(3):
+        created = (await api_client.post("/tickets", json={"customer_id": "c1", "subject": f"Refund {i}", "body": "Help"})).json()
+        ids.append(created["ticket_id"])
+    await api_client.post(f"/tickets/{ids[0]}/resolve", json={"resolution": "Refunded once."})
+    await api_client.post(f"/tickets/{ids[0]}/resolve", json={"resolution": "Refunded again."})
+    await api_client.post(f"/tickets/{ids[2]}/resolve", json={"resolution": "Sent the invoice."})
+
+    assert await feed.poll() == 2
+    assert await feed.poll() == 0
+    (batch,) = batches
+    assert [(r.ticket_id, r.resolution) for r in batch] == [(ids[0], "Refunded again."), (ids[2], "Sent the invoice.")]
+    assert batch[0].collection == "billing_knowledge"
+    assert batch[0].resolved_at is not None
+
+    await api_client.post(f"/tickets/{ids[1]}/resolve", json={"resolution": "Done."})
+    assert await feed.poll() == 1
+    assert batches[-1][0].ticket_id == ids[1]
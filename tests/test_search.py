@@ -0,0 +1,89 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+from src.models.database import Conversation, Ticket
+from src.services.search import search, to_match_query
+
+
+async def seed(session_factory):
+    async with session_factory() as session:
+        session.add(Ticket(
+            id="t1", source="api", customer_id="c1", status="escalated",
+            subject="Sync fails with E-1042", body="The nightly export stops halfway.",
+        ))
+        session.add(Ticket(
+            id="t2", source="api", customer_id="c2", status="resolved",
+            subject="Invoice question", body="Why was I charged twice?",
+        ))
+        session.add(Conversation(
+            id="m1", ticket_id="t2", role="agent",
+            content="Error E-1042 means the API token expired; rotate it in settings.",
+            created_at=datetime(2024, 1, 1),
+        ))
+        await session.commit()
+
+
+def test_match_query_quotes_user_input():
+    assert to_match_query('E-1042 "token expired" refund*') == '"E-1042" "token expired" "refund"*'
+    assert to_match_query('say "hi') == '"say" "hi"'
+    assert to_match_query("   ") == ""
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_and_highlights(session_factory):
+    await seed(session_factory)
+    async with session_factory() as session:
+        hits = await search(session, "E-1042")
+
+    assert [(h.ticket_id, h.kind) for h in hits] == [("t1", "ticket"), ("t2", "conversation")]
+    assert hits[0].subject == "Sync fails with <mark>E-1042</mark>"
+    assert hits[1].role == "agent"
+    assert hits[1].subject == "Invoice question"
+    assert "<mark>E-1042</mark>" in hits[1].snippet
+
+
+@pytest.mark.asyncio
+async def test_highlights_escape_customer_markup(session_factory):
+    async with session_factory() as session:
+        session.add(Ticket(
+            id="x1", source="api", customer_id="c1", status="open",
+            subject='<img src=x onerror=alert(1)> refund \ue000</mark>',
+            body="<script>alert('refund')</script>",
+        ))
+        await session.commit()
+        hits = await search(session, "refund")
+
+    assert hits[0].subject == "&lt;img src=x onerror=alert(1)&gt; <mark>refund</mark> \ue000&lt;/mark&gt;"
+    assert "<script>" not in hits[0].snippet
+    assert "&lt;script&gt;alert(&#x27;<mark>refund</mark>&#x27;)&lt;/script&gt;" in hits[0].snippet
+
+
+@pytest.mark.asyncio
+async def test_index_follows_updates_and_deletes(session_factory):
+    await seed(session_factory)
+    async with session_factory() as session:
+        await session.execute(text("UPDATE conversations SET content = 'rotated token' WHERE id = 'm1'"))
+        await session.execute(text("DELETE FROM tickets WHERE id = 't1'"))
+        await session.commit()
+
+        assert await search(session, "E-1042") == []
+        assert [h.ticket_id for h in await search(session, "rotated")] == ["t2"]
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint_filters_and_pages(api_client, session_factory):
+    await seed(session_factory)
+
+    conversation_only = (await api_client.get("/search", params={"q": "E-1042", "kind": "conversation"})).json()
+    assert [r["ticket_id"] for r in conversation_only["results"]] == ["t2"]
+
+    first = (await api_client.get("/search", params={"q": "1042", "limit": 1})).json()
+    assert len(first["results"]) == 1 and first["next_offset"] == 1
+    second = (await api_client.get("/search", params={"q": "1042", "limit": 1, "offset": 1})).json()
+    assert second["next_offset"] is None
+    assert second["results"][0]["ticket_id"] != first["results"][0]["ticket_id"]
+
+    escalated = (await api_client.get("/search", params={"q": "1042", "status": "escalated"})).json()
+    assert [r["ticket_id"] for r in escalated["results"]] == ["t1"]
@@ -0,0 +1,53 @@
+import pytest
+
+from src.models.ticket import Urgency
+from src.services.sentiment import SentimentAnalyzer
+
+
+@pytest.fixture
+def analyzer():
+    return SentimentAnalyzer()
+
+
+def test_angry_ticket_is_negative(analyzer):
+    result = analyzer.analyze("Charged twice AGAIN", "This is absolutely unacceptable, worst service ever!!")
+    assert result.sentiment < -0.6
+    assert result.urgency == Urgency.HIGH
+
+
+def test_grateful_ticket_is_positive(analyzer):
+    result = analyzer.analyze("Love the product", "Thanks, the new editor is great.")
+    assert result.sentiment > 0.3
+    assert result.urgency == Urgency.MEDIUM
+
+
+def test_negation_flips_polarity(analyzer):
+    assert analyzer.score_sentiment("I am happy") > 0
+    assert analyzer.score_sentiment("I am not happy") < 0
+    assert analyzer.score_sentiment("This isn't terrible") > analyzer.score_sentiment("This is terrible")
+
+
+def test_neutral_text_scores_zero(analyzer):
+    assert analyzer.score_sentiment("How do I export my projects as JSON?") == 0.0
+
+
+@pytest.mark.parametrize("text,urgency", [
+    ("Production down for our whole team", Urgency.CRITICAL),
+    ("I think my account was hacked", Urgency.CRITICAL),
+    ("Need this fixed ASAP", Urgency.HIGH),
+    ("No rush, just curious about dark mode", Urgency.LOW),
+    ("Question about invoices", Urgency.MEDIUM),
+])
+def test_urgency(analyzer, text, urgency):
+    assert analyzer.analyze(text, "").urgency == urgency
+
+
+def test_batch_matches_single(analyzer):
+    tickets = [("Refund", "I want my money back, this is a scam"), ("Hi", "Thank you!")]
+    assert analyzer.analyze_batch(tickets) == [analyzer.analyze(s, b) for s, b in tickets]
+
+
+def test_no_urgency_phrases():
+    analyzer = SentimentAnalyzer(urgency_phrases={})
+    assert analyzer.analyze("Question about invoices", "").urgency == Urgency.MEDIUM
+    assert SentimentAnalyzer(urgency_phrases={Urgency.HIGH: ("",)}).analyze("Hi", "").urgency == Urgency.MEDIUM
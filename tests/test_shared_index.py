@@ -0,0 +1,155 @@
+import numpy as np
+import pytest
+
+from src.api.server import WRITER_SLOT, PreforkServer, ServerConfig
+from src.knowledge import KnowledgeBase
+from src.knowledge.shared_index import SharedIndex, StringTable
+
+
+def test_shared_index_round_trip(tmp_path):
+    vectors = np.array([[1.0, 0.0], [0.0, 2.0], [1.0, 1.0]], dtype=np.float32)
+    SharedIndex.write(
+        tmp_path / "billing",
+        ["a", "b", "c"],
+        vectors,
+        ["refunds", "invoices", "both"],
+        [{"source": "faq", "type": "refund"}, {"source": "docs", "type": "invoice"}, {"type": "refund"}],
+    )
+
+    index = SharedIndex.open(tmp_path / "billing")
+    assert isinstance(index.vectors, np.memmap)
+    assert len(index) == 3
+    assert list(index.ids) == ["a", "b", "c"]
+    assert index.metadatas[-1] == {"type": "refund"}
+    np.testing.assert_array_equal(index.vectors, vectors)
+
+    results = index.search(np.array([1.0, 0.1]), top_k=2)
+    assert [r["content"] for r in results] == ["refunds", "both"]
+    assert results[0]["source"] == "faq"
+    assert results[1]["source"] == "unknown"
+    assert results[0]["score"] == pytest.approx(1.0 / np.sqrt(1.01), abs=1e-5)
+
+    filtered = index.search(np.array([0.0, 1.0]), top_k=5, where={"type": "refund"})
+    assert [r["content"] for r in filtered] == ["both", "refunds"]
+
+    assert [r["content"] for r in index.search(np.array([1.0, 0.1]), top_k=2, exclude={"a"})] == ["both", "invoices"]
+
+
+def test_shared_index_write_replaces_previous(tmp_path):
+    SharedIndex.write(tmp_path / "c", ["a"], np.ones((1, 2)), ["old"], [{}])
+    SharedIndex.write(tmp_path / "c", ["b"], np.ones((1, 2)), ["new"], [{}])
+    assert list(SharedIndex.open(tmp_path / "c").documents) == ["new"]
+    assert not (tmp_path / "c.tmp").exists()
+
+
+def test_string_table(tmp_path):
+    strings = ["", "refund", "naïve", "", "多言語"]
+    StringTable.write(tmp_path / "t", strings)
+    table = StringTable.open(tmp_path / "t")
+    assert len(table) == 5
+    assert list(table) == strings
+    assert table[-1] == "多言語"
+    assert table[1:3] == ["refund", "naïve"]
+    with pytest.raises(IndexError):
+        table[5]
+
+    StringTable.write(tmp_path / "empty", ["", ""])
+    assert list(StringTable.open(tmp_path / "empty")) == ["", ""]
+
+
+@pytest.mark.asyncio
+async def test_knowledge_base_searches_attached_index(tmp_path, monkeypatch):
+    kb = KnowledgeBase(persist_directory=str(tmp_path / "chroma"))
+    await kb.upsert_embeddings(
+        "billing_knowledge",
+        ["r1", "r2"],
+        np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], dtype=np.float32),
+        ["Refunds take 5 days.", "Invoices are monthly."],
+        [{"source": "refunds.md"}, {"source": "invoices.md"}],
+    )
+    assert await kb.snapshot(tmp_path / "index") == 1
+
+    async def embed(texts):
+        return np.array([[0.1, 1.0, 0.0]], dtype=np.float32)
+
+    worker_kb = KnowledgeBase(persist_directory=str(tmp_path / "chroma"))
+    worker_kb.attach_snapshot(tmp_path / "index")
+    monkeypatch.setattr(worker_kb, "embed", embed)
+
+    results = await worker_kb.search("billing_knowledge", "when is my invoice", top_k=1)
+    assert results[0]["content"] == "Invoices are monthly."
+    assert results[0]["source"] == "invoices.md"
+
+
+@pytest.mark.asyncio
+async def test_upserts_after_attach_are_searchable(tmp_path, monkeypatch):
+    kb = KnowledgeBase(persist_directory=str(tmp_path / "chroma"))
+    await kb.upsert_embeddings(
+        "billing_knowledge",
+        ["r1", "r2"],
+        np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], dtype=np.float32),
+        ["Refunds take 5 days.", "Invoices are monthly."],
+        [{"source": "refunds.md"}, {"source": "invoices.md"}],
+    )
+    await kb.snapshot(tmp_path / "index")
+    kb.attach_snapshot(tmp_path / "index")
+
+    query = np.array([[0.0, 0.0, 1.0]], dtype=np.float32)
+
+    async def embed(texts):
+        return query
+
+    monkeypatch.setattr(kb, "embed", embed)
+    await kb.upsert_embeddings(
+        "billing_knowledge",
+        ["r1", "r3"],
+        np.array([[0.0, 0.6, 0.8], [0.0, 0.0, 1.0]], dtype=np.float32),
+        ["Refunds now take 3 days.", "Card payments settle overnight."],
+        [{"source": "refunds.md"}, {"source": "resolution:t9"}],
+    )
+
+    results = await kb.search("billing_knowledge", "when does my card settle", top_k=3)
+    assert [r["content"] for r in results] == [
+        "Card payments settle overnight.", "Refunds now take 3 days.", "Invoices are monthly.",
+    ]
+    assert results[0]["score"] == pytest.approx(1.0)
+    filtered = await kb.search("billing_knowledge", "refund", top_k=3, where={"source": "refunds.md"})
+    assert [r["content"] for r in filtered] == ["Refunds now take 3 days."]
+
+
+@pytest.mark.asyncio
+async def test_snapshot_restores_into_empty_store(tmp_path):
+    kb = KnowledgeBase(persist_directory=str(tmp_path / "source"))
+    embeddings = np.random.default_rng(0).normal(size=(5, 8)).astype(np.float32)
+    ids = [f"doc{i}" for i in range(5)]
+    await kb.upsert_embeddings(
+        "technical_knowledge", ids, embeddings, [f"answer {i}" for i in ids], [{"source": i} for i in ids]
+    )
+    assert await kb.snapshot(tmp_path / "snap") == 1
+
+    fresh = KnowledgeBase(persist_directory=str(tmp_path / "fresh"))
+    assert await fresh.restore_snapshot(tmp_path / "snap", batch_size=2) == 5
+    restored_ids, restored, metadatas = await fresh.get_embeddings("technical_knowledge")
+    order = [restored_ids.index(i) for i in ids]
+    np.testing.assert_allclose(restored[order], embeddings, rtol=1e-6)
+    assert metadatas[order[3]] == {"source": "doc3"}
+
+
+def test_server_config_from_env(monkeypatch):
+    monkeypatch.setenv("WEB_WORKERS", "3")
+    monkeypatch.setenv("WORKER_MAX_REQUESTS", "0")
+    config = ServerConfig.from_env()
+    assert config.workers == 3
+    assert config.max_requests == 0
+    assert config.port == 8000
+
+
+def test_multiple_workers_get_a_knowledge_writer():
+    assert PreforkServer(ServerConfig(workers=1)).slots() == [0]
+    assert PreforkServer(ServerConfig(workers=3)).slots() == [0, 1, 2, WRITER_SLOT]
+
+
+def test_write_behind_is_refused_with_several_workers(monkeypatch):
+    monkeypatch.setenv("DB_WRITE_BEHIND", "1")
+    with pytest.raises(RuntimeError, match="single worker"):
+        PreforkServer(ServerConfig(workers=2)).run()
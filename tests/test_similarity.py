@@ -0,0 +1,149 @@
+import hashlib
+import re
+import time
+
+import numpy as np
+import pytest
+
+from src.api import main
+from src.knowledge import KnowledgeBase, KnowledgeIngester, ResolutionPipeline
+from src.services.similarity import SimilarTicketIndex, VectorIndex
+
+
+DIM = 64
+
+
+def hash_embed(texts: list[str]) -> np.ndarray:
+    vectors = np.zeros((len(texts), DIM), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for token in re.findall(r"[a-z0-9]+", text.lower()):
+            vectors[row, int(hashlib.md5(token.encode()).hexdigest(), 16) % DIM] += 1.0
+    return vectors
+
+
+class FakeKnowledgeBase:
+    def __init__(self):
+        self.stored: dict[str, tuple[np.ndarray, dict]] = {}
+
+    async def embed(self, texts):
+        return hash_embed(texts)
+
+    async def upsert_embeddings(self, collection, ids, embeddings, documents, metadatas):
+        for item_id, vector, metadata in zip(ids, embeddings, metadatas):
+            self.stored[item_id] = (vector, metadata)
+
+    async def nearest_scores(self, collection, embeddings):
+        return [0.0] * len(embeddings)
+
+    async def get_embeddings(self, collection):
+        if not self.stored:
+            return [], np.empty((0, 0), dtype=np.float32), []
+        ids = list(self.stored)
+        return ids, np.stack([self.stored[i][0] for i in ids]), [self.stored[i][1] for i in ids]
+
+
+def test_vector_index_add_replace_remove():
+    index = VectorIndex(capacity=1)
+    index.add("a", np.array([1.0, 0.0]))
+    index.add("b", np.array([0.0, 1.0]))
+    index.add("c", np.array([1.0, 1.0]))
+    assert [i for i, _ in index.search(np.array([1.0, 0.1]), 2)] == ["a", "c"]
+
+    index.add("a", np.array([0.0, 2.0]))
+    assert index.search(np.array([0.0, 1.0]), 1)[0][0] in {"a", "b"}
+    assert len(index) == 3
+
+    index.remove("b")
+    assert "b" not in index and len(index) == 2
+    assert {i for i, _ in index.search(np.array([0.0, 1.0]), 5)} == {"a", "c"}
+
+    mask = np.array([i == "c" for i in index.ids])
+    assert [i for i, _ in index.search(np.array([0.0, 1.0]), 5, mask=mask)] == ["c"]
+
+    with pytest.raises(ValueError):
+        index.add("d", np.zeros(3))
+
+
+def test_vector_index_labels_stay_row_aligned():
+    index = VectorIndex(capacity=1)
+    index.add_many(["a", "b", "c"], np.eye(3), ["billing", "technical", "billing"])
+    index.remove("a")
+    assert dict(zip(index.ids, index.labels)) == {"c": "billing", "b": "technical"}
+
+    index.add("b", np.array([1.0, 0.0, 0.0]), "account")
+    hits = index.search(np.array([1.0, 0.0, 0.0]), 5, mask=index.labels == "account")
+    assert [i for i, _ in hits] == ["b"]
+
+
+def test_vector_index_lookup_is_fast():
+    rng = np.random.default_rng(0)
+    index = VectorIndex()
+    index.add_many([f"t{i}" for i in range(20_000)], rng.standard_normal((20_000, 384)))
+    query = rng.standard_normal(384)
+
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        index.search(query, 5)
+        timings.append(time.perf_counter() - start)
+    assert sorted(timings)[2] < 0.010
+
+
+@pytest.mark.asyncio
+async def test_similar_tickets_by_domain_and_reload():
+    kb = FakeKnowledgeBase()
+    index = SimilarTicketIndex(kb)
+    await index.add_resolution("t1", "Refund for double charge", "I was charged twice", "Refunded the duplicate", "billing")
+    await index.add_resolution("t2", "App crashes on login", "Crash after update", "Reinstall fixes it", "technical")
+
+    matches = await index.similar("charged twice need a refund", domain="billing")
+    assert [m.ticket_id for m in matches] == ["t1"]
+    assert matches[0].resolution == "Refunded the duplicate"
+    assert await index.similar("charged twice need a refund", domain="technical") == []
+    assert await index.similar("charged twice need a refund", exclude="t1") == []
+
+    reloaded = SimilarTicketIndex(kb)
+    assert await reloaded.load() == 2
+    assert (await reloaded.similar("login crash"))[0].ticket_id == "t2"
+
+
+@pytest.mark.asyncio
+async def test_knowledge_base_persists_embeddings(tmp_path):
+    kb = KnowledgeBase(persist_directory=str(tmp_path))
+    await kb.upsert_embeddings(
+        "resolved_tickets",
+        ids=["t1"],
+        embeddings=hash_embed(["refund"]),
+        documents=["refund"],
+        metadatas=[{"domain": "billing"}],
+    )
+    ids, vectors, metadatas = await kb.get_embeddings("resolved_tickets")
+    assert ids == ["t1"]
+    assert vectors.shape == (1, DIM)
+    assert metadatas == [{"domain": "billing"}]
+
+
+@pytest.mark.asyncio
+async def test_escalation_context_includes_similar_resolutions(api_client, fake_router, monkeypatch):
+    kb = FakeKnowledgeBase()
+    index = SimilarTicketIndex(kb)
+    pipeline = ResolutionPipeline(KnowledgeIngester(kb), max_delay=0.01, similar_tickets=index)
+    monkeypatch.setattr(main, "similar_tickets", index)
+    monkeypatch.setattr(main, "resolution_pipeline", pipeline)
+    payload = {"customer_id": "c1", "subject": "Refund", "body": "Charged twice for my invoice"}
+
+    first = (await api_client.post("/tickets", json=payload)).json()
+    await api_client.post(f"/tickets/{first['ticket_id']}/resolve", json={"resolution": "Refunded duplicate charge"})
+    # Indexing happens in the pipeline, not in the request.
+    assert len(index.index) == 0
+    await pipeline.start()
+    await pipeline.stop()
+    assert first["ticket_id"] in index.index
+
+    fake_router.response = fake_router.response.model_copy(update={"confidence": 0.4, "should_escalate": True})
+    second = (await api_client.post("/tickets", json=payload)).json()
+
+    ticket = (await api_client.get(f"/tickets/{second['ticket_id']}")).json()
+    similar = ticket["escalation"]["similar_resolved_tickets"]
+    assert [s["ticket_id"] for s in similar] == [first["ticket_id"]]
+    assert similar[0]["resolution"] == "Refunded duplicate charge"
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import IntegrityError
+
+from src.models.database import Ticket
+from src.models.storage import GroupCommitWriter, StorageConfig
+
+
+def make_ticket(ticket_id: str):
+    async def write(session):
+        session.add(Ticket(
+            id=ticket_id,
+            source="api",
+            customer_id="cust-1",
+            subject="Subject",
+            body="Body",
+            status="open",
+        ))
+    return write
+
+
+@pytest.mark.asyncio
+async def test_pragmas_applied(session_factory):
+    async with session_factory() as session:
+        journal_mode = (await session.execute(text("PRAGMA journal_mode"))).scalar_one()
+        busy_timeout = (await session.execute(text("PRAGMA busy_timeout"))).scalar_one()
+        synchronous = (await session.execute(text("PRAGMA synchronous"))).scalar_one()
+
+    assert journal_mode == "wal"
+    assert busy_timeout == 5000
+    assert synchronous == 1
+
+
+def test_config_from_env(monkeypatch):
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT_MS", "250")
+    monkeypatch.setenv("DB_GROUP_COMMIT", "true")
+    config = StorageConfig.from_env()
+    assert config.busy_timeout_ms == 250
+    assert config.group_commit is True
+    assert "PRAGMA busy_timeout=250" in config.pragmas()
+
+
+@pytest.mark.asyncio
+async def test_group_commit_batches_concurrent_writes(session_factory):
+    writer = GroupCommitWriter(session_factory, max_batch=64, max_delay_ms=20)
+    await writer.start()
+    try:
+        await asyncio.gather(*(writer.submit(make_ticket(f"t-{i}")) for i in range(20)))
+    finally:
+        await writer.stop()
+
+    assert writer.commits < 20
+    async with session_factory() as session:
+        assert (await session.execute(select(func.count()).select_from(Ticket))).scalar_one() == 20
+
+
+@pytest.mark.asyncio
+async def test_group_commit_isolates_failed_write(session_factory):
+    writer = GroupCommitWriter(session_factory, max_batch=64, max_delay_ms=20)
+    await writer.start()
+    try:
+        results = await asyncio.gather(
+            writer.submit(make_ticket("a")),
+            writer.submit(make_ticket("dup")),
+            writer.submit(make_ticket("dup")),
+            writer.submit(make_ticket("b")),
+            return_exceptions=True,
+        )
+    finally:
+        await writer.stop()
+
+    assert results[0] is None and results[1] is None and results[3] is None
+    assert isinstance(results[2], IntegrityError)
+    async with session_factory() as session:
+        ids = set((await session.execute(select(Ticket.id))).scalars())
+    assert ids == {"a", "dup", "b"}
+
+
+@pytest.mark.asyncio
+async def test_submit_requires_running_writer(session_factory):
+    writer = GroupCommitWriter(session_factory)
+    with pytest.raises(RuntimeError):
+        await writer.submit(make_ticket("x"))
+
+
+@pytest.mark.asyncio
+async def test_api_writes_through_group_writer(api_client, session_factory, fake_router, monkeypatch):
+    from src.models import database
+
+    writer = GroupCommitWriter(session_factory, max_delay_ms=20)
+    monkeypatch.setattr(database, "group_writer", writer)
+    await writer.start()
+    try:
+        payload = {"customer_id": "c1", "subject": "Refund", "body": "Please refund me."}
+        responses = await asyncio.gather(*(api_client.post("/tickets", json=payload) for _ in range(8)))
+    finally:
+        await writer.stop()
+
+    assert all(r.status_code == 200 for r in responses)
+    assert writer.commits < 8
+    ticket = await api_client.get(f"/tickets/{responses[0].json()['ticket_id']}")
+    assert len(ticket.json()["conversations"]) == 2
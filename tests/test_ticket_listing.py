@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models.database import Ticket
+from src.models.repository import TicketFilter, TicketRepository
+from src.models.ticket import ticket_priority
+
+
+START = datetime(2024, 1, 1)
+
+
+async def seed(session_factory):
+    async with session_factory() as session:
+        for i in range(10):
+            session.add(Ticket(
+                id=f"t{i}",
+                source="api",
+                customer_id=f"c{i % 2}",
+                subject=f"Ticket {i}",
+                body="Body",
+                intent="billing.refund_request" if i % 3 == 0 else "technical.bug_report",
+                status="escalated" if i % 2 == 0 else "in_progress",
+                routed_to="billing" if i % 3 == 0 else "technical",
+                priority=(i * 7) % 4 * 10,
+                created_at=START + timedelta(minutes=i // 2),
+            ))
+        await session.commit()
+
+
+def test_ticket_priority_orders_urgency_then_sentiment():
+    assert ticket_priority("critical", 0.5) > ticket_priority("high", -1.0)
+    assert ticket_priority("high", -0.8) > ticket_priority("high", 0.0)
+    assert ticket_priority("medium", 0.9) == 10
+
+
+@pytest.mark.asyncio
+async def test_keyset_pagination_walks_newest_first(session_factory):
+    await seed(session_factory)
+    seen = []
+    cursor = None
+    async with session_factory() as session:
+        repo = TicketRepository(session)
+        while True:
+            page = await repo.list_tickets(limit=3, cursor=cursor)
+            seen.extend(page.tickets)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+    assert len(seen) == 10
+    keys = [(t.created_at, t.id) for t in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_filters_combine(session_factory):
+    await seed(session_factory)
+    async with session_factory() as session:
+        page = await TicketRepository(session).list_tickets(TicketFilter(
+            status="escalated",
+            routed_to="billing",
+            created_after=START + timedelta(minutes=1),
+        ))
+
+    assert {t.id for t in page.tickets} == {"t6"}
+
+
+@pytest.mark.asyncio
+async def test_escalation_queue_orders_by_priority_then_age(session_factory):
+    await seed(session_factory)
+    async with session_factory() as session:
+        repo = TicketRepository(session)
+        first = await repo.escalation_queue(limit=2)
+        rest = await repo.escalation_queue(limit=10, cursor=first.next_cursor)
+
+    queue = first.tickets + rest.tickets
+    assert all(t.status == "escalated" for t in queue)
+    assert [(-t.priority, t.created_at, t.id) for t in queue] == sorted(
+        (-t.priority, t.created_at, t.id) for t in queue
+    )
+    assert len(queue) == 5
+    assert rest.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_list_endpoints(api_client, session_factory, fake_router):
+    await seed(session_factory)
+    created = (await api_client.post(
+        "/tickets", json={"customer_id": "c9", "subject": "Refund", "body": "Please refund me."}
+    )).json()
+
+    listed = (await api_client.get("/tickets", params={"customer_id": "c9"})).json()
+    assert [t["id"] for t in listed["tickets"]] == [created["ticket_id"]]
+    assert listed["tickets"][0]["routed_to"] == "billing"
+
+    paged = (await api_client.get("/tickets", params={"status": "in_progress", "limit": 2})).json()
+    assert len(paged["tickets"]) == 2 and paged["next_cursor"]
+
+    queue = (await api_client.get("/escalations/queue", params={"routed_to": "technical"})).json()
+    assert {t["id"] for t in queue["tickets"]} == {"t2", "t4", "t8"}
+
+    assert (await api_client.get("/tickets", params={"status": "bogus"})).status_code == 422
+    assert (await api_client.get("/tickets", params={"cursor": "bad"})).status_code == 400
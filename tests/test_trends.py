@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from src.models.database import AnalyticsRollup
+
+
+def ticket_payload(subject: str) -> dict:
+    return {"customer_id": "c1", "subject": subject, "body": "Please help with my invoice."}
+
+
+@pytest.mark.asyncio
+async def test_rollups_track_ticket_lifecycle(api_client, session_factory, fake_router):
+    first = (await api_client.post("/tickets", json=ticket_payload("Refund"))).json()
+    await api_client.post(f"/tickets/{first['ticket_id']}/message", json={"content": "Thanks!"})
+    await api_client.post(f"/tickets/{first['ticket_id']}/resolve", json={"resolution": "Refunded"})
+
+    fake_router.response = fake_router.response.model_copy(
+        update={"confidence": 0.5, "should_escalate": True}
+    )
+    await api_client.post("/tickets", json=ticket_payload("Dispute"))
+
+    async with session_factory() as session:
+        rows = (await session.execute(select(AnalyticsRollup))).scalars().all()
+    assert sum(r.tickets_created for r in rows) == 2
+    assert {r.status for r in rows} == {"in_progress", "resolved", "escalated"}
+
+    response = await api_client.get("/analytics/trends", params={"bucket_hours": 24})
+    assert response.status_code == 200
+    points = response.json()["points"]
+    assert len(points) == 1
+    point = points[0]
+    assert point["tickets_created"] == 2
+    assert point["messages"] == 1
+    assert point["escalations"] == 1
+    assert point["resolutions"] == 1
+    assert point["escalation_rate"] == pytest.approx(0.5)
+    assert point["avg_confidence"] == pytest.approx((0.9 + 0.9 + 0.5) / 3)
+    assert point["avg_resolution_seconds"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_trends_filters_by_domain_and_window(api_client, fake_router):
+    await api_client.post("/tickets", json=ticket_payload("Refund"))
+
+    other = await api_client.get("/analytics/trends", params={"domain": "technical"})
+    assert other.json()["points"] == []
+
+    past = datetime.utcnow() - timedelta(days=3)
+    window = {"start": past.isoformat(), "end": (past + timedelta(hours=2)).isoformat()}
+    assert (await api_client.get("/analytics/trends", params=window)).json()["points"] == []
+
+    invalid = {"start": past.isoformat(), "end": past.isoformat()}
+    assert (await api_client.get("/analytics/trends", params=invalid)).status_code == 400
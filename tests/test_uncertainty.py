@@ -0,0 +1,54 @@
+import pytest
+
+from src.services.uncertainty import DEFAULT_HEDGE_PHRASES, HedgeDetector
+
+
+@pytest.fixture
+def detector():
+    return HedgeDetector()
+
+
+def legacy_count(text: str) -> int:
+    lower = text.lower()
+    return sum(1 for p in DEFAULT_HEDGE_PHRASES if p in lower)
+
+
+@pytest.mark.parametrize("text", [
+    "Here is exactly how to fix it.",
+    "I think this might be a billing issue. I think so.",
+    "I'm not sure, but it could be POSSIBLY related. I believe we are unable to help.",
+    "I don't know. I cannot say.",
+])
+def test_count_matches_legacy_scan(detector, text):
+    assert detector.count(text) == legacy_count(text)
+    assert detector.scan(text).count == legacy_count(text)
+
+
+def test_scan_reports_positions(detector):
+    text = "I think so. Possibly. I think not."
+    scan = detector.scan(text)
+    assert scan.hits == {"i think": [0, 22], "possibly": [12]}
+    assert scan.total_hits == 3
+
+
+def test_stream_matches_full_scan_across_chunk_boundaries(detector):
+    text = "Well, I'm not sure. It might be the cache, or it could be DNS. I believe so."
+    expected = detector.scan(text).hits
+    for size in (1, 2, 3, 7, 50):
+        stream = detector.stream()
+        for i in range(0, len(text), size):
+            stream.feed(text[i:i + size])
+        assert stream.finish().hits == expected
+
+
+def test_count_does_not_double_count_overlapping_phrases():
+    detector = HedgeDetector(("not sure", "sure thing"))
+    text = "I'm not sure thing works."
+    assert detector.count(text) == detector.scan(text).count == 1
+    assert not HedgeDetector()._overlapping
+
+
+def test_custom_phrases():
+    detector = HedgeDetector(("Perhaps", "not certain"))
+    assert detector.count("Perhaps it works, I'm NOT CERTAIN.") == 2
+    assert HedgeDetector(()).scan("anything").count == 0
@@ -0,0 +1,131 @@
+import asyncio
+import subprocess
+import sys
+
+import pytest
+
+from src.api import main
+from src.services.warmup import Warmup, WarmupStep
+
+
+def step(name: str, calls: list, required: bool = True, fail: bool = False) -> WarmupStep:
+    async def run():
+        calls.append(name)
+        if fail:
+            raise RuntimeError(f"{name} broke")
+
+    return WarmupStep(name, run, required=required)
+
+
+@pytest.mark.asyncio
+async def test_warmup_runs_steps_in_order():
+    calls = []
+    warmup = Warmup([step("a", calls), step("b", calls), step("c", calls, required=False)])
+    assert not warmup.ready
+    assert warmup.status()["steps"]["a"]["status"] == "pending"
+
+    warmup.start()
+    assert await warmup.wait()
+    assert calls == ["a", "b", "c"]
+    status = warmup.status()
+    assert status["ready"] and status["progress"] == "3/3"
+    assert status["steps"]["b"]["seconds"] is not None
+
+
+@pytest.mark.asyncio
+async def test_optional_failure_does_not_block_readiness():
+    calls = []
+    warmup = Warmup([step("a", calls), step("embedder", calls, required=False, fail=True), step("b", calls)])
+    await warmup.run()
+
+    assert warmup.ready
+    assert calls == ["a", "embedder", "b"]
+    assert warmup.status()["steps"]["embedder"]["error"] == "RuntimeError: embedder broke"
+
+
+@pytest.mark.asyncio
+async def test_required_failure_skips_remaining_steps():
+    calls = []
+    warmup = Warmup([step("kb", calls, fail=True), step("router", calls)], retries=0)
+    await warmup.run()
+
+    assert not warmup.ready
+    assert calls == ["kb"]
+    assert warmup.status()["steps"]["router"]["status"] == "skipped"
+
+
+@pytest.mark.asyncio
+async def test_required_step_is_retried_with_backoff(monkeypatch):
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr("src.services.warmup.asyncio.sleep", sleep)
+    failures = [RuntimeError("store not mounted")] * 2
+
+    async def flaky():
+        if failures:
+            raise failures.pop()
+
+    warmup = Warmup([WarmupStep("kb", flaky)], retries=4, backoff=0.5)
+    await warmup.run()
+    assert warmup.ready
+    assert delays == [0.5, 1.0]
+    assert warmup.status()["steps"]["kb"]["attempts"] == 3
+    assert warmup.status()["steps"]["kb"]["error"] is None
+
+    calls = []
+    warmup = Warmup([step("kb", calls, fail=True), step("embedder", calls, required=False, fail=True)], retries=2)
+    await warmup.run()
+    assert warmup.failed
+    assert calls == ["kb"] * 3
+    assert delays[2:] == [1.0, 2.0]
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_running_warmup():
+    started = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(60)
+
+    warmup = Warmup([WarmupStep("slow", slow)])
+    warmup.start()
+    await started.wait()
+    await warmup.stop()
+    assert not warmup.ready
+
+
+@pytest.mark.asyncio
+async def test_ready_endpoint_reports_progress(api_client, monkeypatch):
+    calls = []
+    warmup = Warmup([step("knowledge_base", calls), step("router", calls)])
+    monkeypatch.setattr(main, "warmup", warmup)
+
+    response = await api_client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["progress"] == "0/2"
+    assert (await api_client.get("/health")).status_code == 200
+
+    await warmup.run()
+    response = await api_client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["ready"]
+
+
+@pytest.mark.asyncio
+async def test_ticket_endpoints_unavailable_until_router_loads(api_client, monkeypatch):
+    monkeypatch.setattr(main, "router", None)
+    response = await api_client.post(
+        "/tickets",
+        json={"source": "api", "customer_id": "c1", "subject": "Refund", "body": "Please refund me."},
+    )
+    assert response.status_code == 503
+
+
+def test_app_import_defers_heavy_modules():
+    code = "import sys, src.api.main; print('chromadb' in sys.modules, 'anthropic' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ["False", "False"]